@@ -9,11 +9,33 @@
 #              for the listing of vulnerable facilities in an ArcGIS Desktop tool form.  The tool then runs three analyses: create the risk radii,
 #              estimate residential population, and extract vulnerable facilities.  A project map is generated and exported to png
 #
+#              When run from the tool form, the floodplain, population, vulnerable facilities, and map stages run at the same time once the
+#              risk radii are created (stageScheduler.py).  The time taken by each stage and geoprocessing tool is saved to a JSON run
+#              profile next to the results text file (runProfile.py).
+#
+#              Population estimates and vulnerable facility distances can be saved for each facility location and risk radius (resultsCache.py).
+#              Running a facility again with an extra risk radius only calculates the new risk radius, and running it again with a corrected
+#              name, address, or chemical only creates the map and report again.  Running a facility again on the same day replaces the
+#              results in that day's project directory.
+#
+#              The map can be drawn directly from the risk radii, with the vulnerable facilities found, in place of the map document
+#              template (mapRenderer.py).
+#
+#              The results of each run can be added to the SARA results database (resultsDatabase.py) for queries across facilities.
+#
+#              The vulnerable facilities can be written to one Excel workbook (workbookWriter.py) in place of a spreadsheet for each layer and
+#              risk radius, the population surface estimate (populationSurface.py) can be reported with the Census block estimate, and the
+#              length or area of streams, pipelines, and municipalities within each risk radius can be reported (ringMeasures.py).  These
+#              options, and saving and recording the results, are unchecked on the tool form by default.
+#
+#              Each completed stage is recorded in a run manifest (SARA_Run_Manifest_PATTS_<PATTS ID>.json).  When a run fails or is
+#              interrupted, running it again on the same day with resume checked only runs the stages that were not completed.
+#
 # Author:      Patrick McKinney
 #
 # Created:     08/10/2016
 #
-# Updated:     05/9/2019
+# Updated:     10/18/2026
 #
 # Copyright:   (c) Cumberland County GIS 2019
 #
@@ -26,70 +48,222 @@
 #----------------------------------------------------------------------------------------------------------------------------------------------------------#
 
 # import modules
-import arcpy, os, datetime, riskRadius, populationEstimate, vulnerableFacilities, createMap, errorLogger
-
-try:
-    # User entered variables from ArcGIS tool
-    # name of SARA facility - string
-    sara_name = arcpy.GetParameterAsText(0)
-    # address of SARA facility - string
-    sara_address = arcpy.GetParameterAsText(1)
-    # PATTS ID - string
-    patts_id = arcpy.GetParameterAsText(2)
-    # checmial information - string
-    chem_info = arcpy.GetParameterAsText(3)
-    # latitude of SARA facility - double
-    lat = float(arcpy.GetParameterAsText(4))
-    # longitude of SARA facility - double
-    lon = float(arcpy.GetParameterAsText(5))
-    # Buffer distances for risk radii - double, multi-value
-    mrb_distances = arcpy.GetParameterAsText(6)
-    # Buffer units - string, drop-down list
-    mrb_units = arcpy.GetParameterAsText(7)
-    # Output directory for analysis reslts - folder
-    output_dir = arcpy.GetParameterAsText(8)
-
-    # get current date
-    date_today = datetime.date.today()
-    # formatted data YYYY-MM-DD
-    formatted_date = date_today.strftime("%Y-%m-%d")
-    # create sub-directory to store files
-    sub_dir = os.path.join(output_dir,formatted_date)
-    os.mkdir(sub_dir)
-    # add message
-    arcpy.AddMessage('\nCreated project directory at "{}"'.format(sub_dir))
-
-    # out file geodatabase nam
-    output_gdb_name = 'Analysis_Results_PATTS_{}'.format(patts_id)
-    # output file geodatabase
-    output_gdb = '{}.gdb'.format(os.path.join(sub_dir,output_gdb_name))
-    # create a text file in output location
-    results_text_file = r'{}\SARA_Analysis_Results_PATTS_{}.txt'.format(sub_dir,patts_id)
-
-    # create project file geodatabase
-    arcpy.CreateFileGDB_management(sub_dir, output_gdb_name, '10.0')
-    # add message to user
-    arcpy.AddMessage('\nCreated project file geodatabase "{}"'.format(output_gdb_name))
-
-    # Run multiple ring buffer (risk radii)
-    sara_site, risk_radii_output = riskRadius.createRiskRadii(lat,lon,patts_id,mrb_distances,mrb_units,output_gdb,results_text_file)
-
-    # Run census popluation estimate tool
-    populationEstimate.estimateCensusPopulation(risk_radii_output, patts_id, sub_dir, output_gdb, results_text_file)
-
-    # Run vulnerable facilities analysis tool
-    vulnerableFacilities.vulnerableFacilitiesAnalysis(risk_radii_output, sub_dir)
-
-    # Run map generation tool
-    createMap.createSaraMap(sara_site,risk_radii_output,sara_name,sara_address,patts_id,chem_info,sub_dir)
-# If an error occurs running geoprocessing tool(s) capture error and write message
-# handle error outside of Python system
-except EnvironmentError as e:
-    arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
-    # call error logger method
-    errorLogger.PrintException(e)
-# handle exception error
-except Exception as e:
-    arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
-    # call error logger method
-    errorLogger.PrintException(e)
\ No newline at end of file
+import arcpy, os, sys, datetime, multiprocessing, riskRadius, floodplainAnalysis, populationEstimate, vulnerableFacilities, createMap, errorLogger, stageScheduler, runProfile, resultsCache, resultsDatabase
+
+# stages of the SARA report, run in worker processes by stageScheduler.py
+def riskRadiiStage(values, text_file):
+    """Create the risk radii"""
+    sara_site, risk_radii = riskRadius.createRiskRadii(values['lat'], values['lon'], values['patts_id'], values['mrb_distances'], values['mrb_units'],
+                                                       values['output_gdb'], text_file, use_cache=True, use_flag_index=True, run_floodplain=False)
+    return {'sara_site': sara_site, 'risk_radii': risk_radii}
+
+def floodplainStage(values, text_file):
+    """Test whether the SARA facility is within a floodplain"""
+    arcpy.AddMessage('\nPerforming analysis to see if SARA facility is within a floodplain')
+    floodplain = floodplainAnalysis.intersectFloodplainTest(values['sara_site'], values['lon'], values['lat'], text_file, use_cache=True, use_flag_index=True)
+    return {'floodplain': floodplain}
+
+def populationStage(values, text_file):
+    """Estimate the population within each risk radius"""
+    ring_estimates = populationEstimate.estimateCensusPopulation(values['risk_radii'], values['patts_id'], values['sub_dir'], values['output_gdb'], text_file, nested_rings=True, single_pass=True, use_cache=True, results_cache=values['results_cache'], surface_estimate=values['surface_estimate'])
+    return {'ring_estimates': ring_estimates}
+
+def vulnerableFacilitiesStage(values, text_file):
+    """Find the vulnerable facilities within each risk radius"""
+    # one workbook for the SARA facility, or a spreadsheet for each layer and risk radius
+    export_formats = ('xlsx',) if values['workbook_output'] else ('xls',)
+    results = vulnerableFacilities.vulnerableFacilitiesAnalysis(values['risk_radii'], values['sub_dir'], proximity_engine=True, export_formats=export_formats, use_cache=True, results_cache=values['results_cache'],
+                                                                ring_measures=values['ring_measures'], results_text_file=text_file)
+    return {'facility_results': results}
+
+def mapStage(values, text_file):
+    """Create the project map"""
+    createMap.createSaraMap(values['sara_site'], values['risk_radii'], values['sara_name'], values['sara_address'], values['patts_id'], values['chem_info'], values['sub_dir'])
+
+def nativeMapStage(values, text_file):
+    """Draw the project map with the vulnerable facilities found"""
+    facilities = vulnerableFacilities.facilityLocations(values['facility_results'])
+    createMap.createSaraMap(values['sara_site'], values['risk_radii'], values['sara_name'], values['sara_address'], values['patts_id'], values['chem_info'], values['sub_dir'],
+                            native_renderer=True, facilities=facilities)
+
+# the risk radii are needed by every other stage, and the other stages are independent of each other
+report_stages = [
+    stageScheduler.Stage('risk_radii', riskRadiiStage, ['lat', 'lon', 'patts_id', 'mrb_distances', 'mrb_units', 'output_gdb'], ['sara_site', 'risk_radii']),
+    stageScheduler.Stage('floodplain', floodplainStage, ['sara_site', 'lat', 'lon'], ['floodplain']),
+    stageScheduler.Stage('population', populationStage, ['risk_radii', 'patts_id', 'sub_dir', 'output_gdb', 'results_cache', 'surface_estimate'], ['ring_estimates']),
+    stageScheduler.Stage('vulnerable_facilities', vulnerableFacilitiesStage, ['risk_radii', 'sub_dir', 'results_cache', 'workbook_output', 'ring_measures'], ['facility_results']),
+    stageScheduler.Stage('map', mapStage, ['sara_site', 'risk_radii', 'sara_name', 'sara_address', 'patts_id', 'chem_info', 'sub_dir'])
+]
+# the native map is drawn in well under a second, so it waits for the vulnerable facilities to draw them
+native_map_stages = report_stages[:-1] + [
+    stageScheduler.Stage('map', nativeMapStage, ['sara_site', 'risk_radii', 'sara_name', 'sara_address', 'patts_id', 'chem_info', 'sub_dir', 'facility_results'])
+]
+
+def saveToResultsDatabase(values, results_text_file):
+    """Add the results of a report to the results database (resultsDatabase.py).  A failure is reported as a warning, since the report is complete."""
+    try:
+        run_id = resultsDatabase.recordRun(values['patts_id'], values['sara_name'], values['sara_address'], values['chem_info'], values['lat'], values['lon'],
+                                           values['mrb_distances'], values['mrb_units'], values['sub_dir'], results_text_file, values.get('ring_estimates'),
+                                           values.get('floodplain'), values.get('facility_results'))
+        arcpy.AddMessage('\nAdded the results to the results database (run {})'.format(run_id))
+    except Exception as e:
+        arcpy.AddWarning('\nThe results could not be added to the results database: {}'.format(e))
+
+def createSaraReport(sara_name, sara_address, patts_id, chem_info, lat, lon, mrb_distances, mrb_units, output_dir, parallel_stages=False, profile_run=False, use_cprofile=False, use_results_cache=False, native_map=False, record_results=False, resume=False, project_dir=None, rerun_stages=None,
+                     workbook_output=False, surface_estimate=False, ring_measures=False):
+    """Run the SARA analyses for one facility and return the project sub-directory
+
+       parallel_stages = run the stages after the risk radii at the same time in worker processes (stageScheduler.py).
+                         Not available inside a batch worker process (batchReport.py).
+       profile_run = save the time taken by each stage and geoprocessing tool to SARA_Run_Profile_PATTS_<PATTS ID>.json (runProfile.py)
+       use_cprofile = also save cProfile statistics for every Python function call (.prof files).  Only used with profile_run.
+       use_results_cache = reuse the population estimates and vulnerable facility distances saved for this location and risk radii
+                           by earlier runs, and save the new ones (resultsCache.py)
+       native_map = draw the map from the risk radii with the vulnerable facilities found (mapRenderer.py), in place of the map document template
+       record_results = add the results to the SARA results database (resultsDatabase.py)
+       resume = skip the stages completed by an earlier run today with the same inputs and reference data, using the results saved in
+                SARA_Run_Manifest_PATTS_<PATTS ID>.json and the Checkpoints folder (stageScheduler.py)
+       project_dir = project directory of an earlier run to update, in place of a new directory for today
+       rerun_stages = names of the stages the changes to the reference data reach (changeDetection.py).  With resume and project_dir,
+                      only these stages and the stages using their outputs are run again.
+       workbook_output = write the vulnerable facilities to one Excel workbook for the SARA facility (workbookWriter.py), in place of
+                         a spreadsheet for each layer and risk radius
+       surface_estimate = also report the population surface estimate of each risk radius (populationSurface.py)
+       ring_measures = also report the length or area of streams, pipelines, and municipalities within each risk radius (ringMeasures.py)
+    """
+    # run profile file, once the project directory exists
+    profile_file = None
+    if profile_run:
+        runProfile.startRun(use_cprofile=use_cprofile)
+    try:
+        # get current date
+        date_today = datetime.date.today()
+        # formatted data YYYY-MM-DD
+        formatted_date = date_today.strftime("%Y-%m-%d")
+        # create sub-directory to store files, unless the tool has already been run today or an earlier run is being updated
+        sub_dir = project_dir if project_dir else os.path.join(output_dir,formatted_date)
+        if not os.path.exists(sub_dir):
+            os.mkdir(sub_dir)
+        # allow the results of an earlier run today to be overwritten
+        arcpy.env.overwriteOutput = True
+        # add message
+        arcpy.AddMessage('\nCreated project directory at "{}"'.format(sub_dir))
+        if profile_run:
+            profile_file = os.path.join(sub_dir, 'SARA_Run_Profile_PATTS_{}.json'.format(patts_id))
+            runProfile.current_run.output_folder = sub_dir
+
+        # out file geodatabase nam
+        output_gdb_name = 'Analysis_Results_PATTS_{}'.format(patts_id)
+        # output file geodatabase
+        output_gdb = '{}.gdb'.format(os.path.join(sub_dir,output_gdb_name))
+        # create a text file in output location
+        results_text_file = r'{}\SARA_Analysis_Results_PATTS_{}.txt'.format(sub_dir,patts_id)
+        # the analyses add to the text file, so start a new one when running again
+        if os.path.exists(results_text_file):
+            os.remove(results_text_file)
+
+        # create project file geodatabase
+        if not arcpy.Exists(output_gdb):
+            arcpy.CreateFileGDB_management(sub_dir, output_gdb_name, '10.0')
+            # add message to user
+            arcpy.AddMessage('\nCreated project file geodatabase "{}"'.format(output_gdb_name))
+
+        # results saved by earlier runs for this location
+        site_results = None
+        if use_results_cache:
+            site_results = resultsCache.loadSiteResults(lat, lon)
+
+        values = {'sara_name': sara_name, 'sara_address': sara_address, 'patts_id': patts_id, 'chem_info': chem_info, 'lat': lat, 'lon': lon,
+                  'mrb_distances': mrb_distances, 'mrb_units': mrb_units, 'sub_dir': sub_dir, 'output_gdb': output_gdb, 'results_cache': site_results,
+                  'workbook_output': workbook_output, 'surface_estimate': surface_estimate, 'ring_measures': ring_measures}
+        # record each completed stage, so a failed run can be resumed
+        manifest_file = os.path.join(sub_dir, 'SARA_Run_Manifest_PATTS_{}.json'.format(patts_id))
+        # Run the risk radii, floodplain, census population, vulnerable facilities, and map stages
+        values = stageScheduler.runStages(native_map_stages if native_map else report_stages, values, sub_dir, results_text_file, profile_file=profile_file,
+                                          parallel=parallel_stages, manifest_file=manifest_file, data_version=resultsCache.dataVersion(), resume=resume,
+                                          rerun_stages=rerun_stages)
+
+        # Add results to results database
+        if record_results:
+            saveToResultsDatabase(values, results_text_file)
+
+        # make project directory available to batch runs
+        return sub_dir
+    # error already reported by one of the analysis modules
+    except errorLogger.SaraToolError:
+        raise
+    # If an error occurs running geoprocessing tool(s) capture error and write message
+    # handle error outside of Python system
+    except EnvironmentError as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # handle exception error
+    except Exception as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # save the run profile, including for runs that fail
+    finally:
+        if profile_run:
+            run = runProfile.finishRun()
+            if run is not None and profile_file:
+                run.save(profile_file)
+                arcpy.AddMessage('\nRun profile saved to "{}"'.format(profile_file))
+
+if __name__ == '__main__':
+    try:
+        # worker processes must start python.exe rather than the ArcGIS application
+        if sys.platform.startswith('win'):
+            multiprocessing.set_executable(os.path.join(sys.exec_prefix, 'python.exe'))
+        # User entered variables from ArcGIS tool
+        # name of SARA facility - string
+        sara_name = arcpy.GetParameterAsText(0)
+        # address of SARA facility - string
+        sara_address = arcpy.GetParameterAsText(1)
+        # PATTS ID - string
+        patts_id = arcpy.GetParameterAsText(2)
+        # checmial information - string
+        chem_info = arcpy.GetParameterAsText(3)
+        # latitude of SARA facility - double
+        lat = float(arcpy.GetParameterAsText(4))
+        # longitude of SARA facility - double
+        lon = float(arcpy.GetParameterAsText(5))
+        # Buffer distances for risk radii - double, multi-value
+        mrb_distances = arcpy.GetParameterAsText(6)
+        # Buffer units - string, drop-down list
+        mrb_units = arcpy.GetParameterAsText(7)
+        # Output directory for analysis reslts - folder
+        output_dir = arcpy.GetParameterAsText(8)
+        # Save cProfile statistics with the run profile - boolean, optional
+        use_cprofile = arcpy.GetParameterAsText(9).lower() == 'true'
+        # Draw the map without the map document template - boolean, optional
+        native_map = arcpy.GetParameterAsText(10).lower() == 'true'
+        # Use the stages completed by an earlier run today - boolean, optional
+        resume = arcpy.GetParameterAsText(11).lower() == 'true'
+        # Reuse and save population estimates and vulnerable facility distances for this location - boolean, optional
+        use_results_cache = arcpy.GetParameterAsText(12).lower() == 'true'
+        # Add the results to the SARA results database - boolean, optional
+        record_results = arcpy.GetParameterAsText(13).lower() == 'true'
+        # Write the vulnerable facilities to one Excel workbook - boolean, optional
+        workbook_output = arcpy.GetParameterAsText(14).lower() == 'true'
+        # Report the population surface estimate - boolean, optional
+        surface_estimate = arcpy.GetParameterAsText(15).lower() == 'true'
+        # Report the length or area of streams, pipelines, and municipalities - boolean, optional
+        ring_measures = arcpy.GetParameterAsText(16).lower() == 'true'
+
+        # run analyses
+        createSaraReport(sara_name, sara_address, patts_id, chem_info, lat, lon, mrb_distances, mrb_units, output_dir, parallel_stages=True, profile_run=True, use_cprofile=use_cprofile,
+                         use_results_cache=use_results_cache, native_map=native_map, record_results=record_results, resume=resume, workbook_output=workbook_output,
+                         surface_estimate=surface_estimate, ring_measures=ring_measures)
+    # If an error occurs running geoprocessing tool(s) capture error and write message
+    # handle error outside of Python system
+    except EnvironmentError as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # handle exception error
+    except Exception as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
\ No newline at end of file
@@ -0,0 +1,262 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Analysis Service
+#
+# Purpose:     Answer risk radius questions for a SARA facility in seconds by keeping the reference layers loaded between requests.
+#
+# Summary:     A local HTTP service started from the command line (python analysisService.py [port] [workers]).  A pool of worker processes
+#              each load the Census block, building footprint, floodplain flag, and vulnerable facility snapshots once (dataCache.py,
+#              floodplainIndex.py) and answer requests with the same logic as riskRadius.py, floodplainAnalysis.py, populationEstimate.py, and
+#              vulnerableFacilities.py.  Snapshots are checked against the source data on every request and reloaded when the data changes.
+#
+#              POST /analyze    {"lat": 40.2015, "lon": -77.1894, "distances": "0.5;1", "units": "Miles", "patts": "12345"}
+#              GET  /health     service status, worker count, and the reference layers loaded
+#              GET  /metrics    request counts, errors, and response times
+#
+#              Requests are answered concurrently, up to one request for each worker process.  The service only listens on this computer.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, sys, json, time, threading, multiprocessing, errorLogger, dataCache, floodplainIndex, populationEstimate, proximityAnalysis, riskRings, vulnerableFacilities
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+# address the service listens on
+host = '127.0.0.1'
+port = 8642
+# seconds to wait for a worker to answer a request
+request_timeout = 300
+
+# reference data
+geodata_gdb = r'C:\GIS\Geodata.gdb'
+census_blocks = os.path.join(geodata_gdb, 'Regional_Census2010_Blocks_SPS')
+building_footprints = os.path.join(geodata_gdb, 'Building_Footprints_2008')
+floodplains = os.path.join(geodata_gdb, 'FEMA_Floodplains_2009')
+
+def warmWorker():
+    """Set up a worker process and load the reference layers before the first request"""
+    errorLogger.exit_on_error = False
+    arcpy.env.overwriteOutput = True
+    loadReferenceLayers()
+
+def loadReferenceLayers():
+    """Return the vulnerable facility snapshots and the feature count of each reference layer
+
+       Layers already loaded in this process are reused unless the source data has changed.
+    """
+    layer_counts = {}
+    layer_counts['Census_Blocks'] = len(dataCache.loadSnapshot(census_blocks))
+    layer_counts['Building_Footprints'] = len(floodplainIndex.loadFloodplainFlags(building_footprints, floodplains).flags)
+    snapshots = {}
+    for feature_class, layer_name, clause in vulnerableFacilities.vulnerable_layers:
+        snapshots[layer_name] = dataCache.loadSnapshot(os.path.join(geodata_gdb, feature_class), where_clause=clause)
+        layer_counts[layer_name] = len(snapshots[layer_name])
+    # end for
+    return snapshots, layer_counts
+
+def analyzeSite(request):
+    """Run the SARA analyses for a latitude and longitude and return the results as a dictionary (runs in a worker process)"""
+    start_time = time.time()
+    try:
+        lat = float(request['lat'])
+        lon = float(request['lon'])
+        rings = riskRings.fromLatLon(lat, lon, request['distances'], request.get('units', 'Feet'), str(request.get('patts', '')))
+        if not len(rings):
+            raise ValueError('no risk radius distances')
+    except (KeyError, TypeError, ValueError) as e:
+        return {'status': 'INVALID', 'message': 'Invalid request: {}'.format(e)}
+    try:
+        snapshots, layer_counts = loadReferenceLayers()
+        layer_names = [layer[1] for layer in vulnerableFacilities.vulnerable_layers]
+
+        # floodplain test for the building footprint containing the SARA facility
+        footprint_count, intersects_floodplain, flood_zones = floodplainIndex.footprintFloodplainStatus(rings.x, rings.y, building_footprints, floodplains)
+
+        # estimated population within each risk radius
+        risk_radii = rings.toFeatureClass(r'in_memory\Service_Risk_Radii')
+        ring_estimates = populationEstimate.estimateRingPopulations(risk_radii, 'in_memory', nested_rings=True, single_pass=True, keep_block_outputs=False, use_cache=True)
+        arcpy.Delete_management(risk_radii)
+        estimates = dict((float(estimate[0]), estimate) for estimate in ring_estimates)
+
+        # vulnerable facilities within each risk radius, nearest first
+        results = proximityAnalysis.findFacilitiesWithinRiskRadii(layer_names, rings, snapshots)
+
+        response_rings = []
+        for distance in rings.distances:
+            estimate = estimates.get(distance, (distance, rings.units, None, None))
+            facility_counts = dict((layer_name, len(proximityAnalysis.featuresWithinRing(results, layer_name, distance))) for layer_name in layer_names)
+            response_rings.append({'distance': distance, 'units': rings.units, 'population': estimate[2], 'households': estimate[3], 'facilities': facility_counts})
+        # end for
+        return {
+            'status': 'OK',
+            'patts': rings.patts,
+            'lat': lat,
+            'lon': lon,
+            'x': rings.x,
+            'y': rings.y,
+            'floodplain': {'building_footprints': footprint_count, 'intersects_floodplain': intersects_floodplain, 'flood_zones': flood_zones},
+            'risk_radii': response_rings,
+            'facilities': [{'layer': row['LAYER'], 'oid': int(row['OID']), 'risk_radius': float(row['BUFFDIST']), 'distance': round(float(row['DISTANCE']), 1)} for row in results],
+            'layers': layer_counts,
+            'worker': os.getpid(),
+            'seconds': round(time.time() - start_time, 3)
+        }
+    # report the error to the client and keep the worker running
+    except Exception as e:
+        return {'status': 'ERROR', 'message': str(e).strip(), 'worker': os.getpid(), 'seconds': round(time.time() - start_time, 3)}
+
+class ServiceMetrics(object):
+    """Request counts and response times, shared by the request threads"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end(self, seconds, succeeded):
+        with self.lock:
+            self.in_flight -= 1
+            self.requests += 1
+            if not succeeded:
+                self.errors += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def report(self):
+        with self.lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'requests': self.requests,
+                'errors': self.errors,
+                'in_flight': self.in_flight,
+                'mean_seconds': round(self.total_seconds / self.requests, 3) if self.requests else 0.0,
+                'max_seconds': round(self.max_seconds, 3)
+            }
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the analysis service"""
+    def sendJson(self, status, body):
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.sendJson(200, self.server.health())
+        elif self.path == '/metrics':
+            self.sendJson(200, self.server.metrics.report())
+        else:
+            self.sendJson(404, {'status': 'NOT_FOUND', 'message': 'Unknown path {}'.format(self.path)})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self.sendJson(404, {'status': 'NOT_FOUND', 'message': 'Unknown path {}'.format(self.path)})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            self.sendJson(400, {'status': 'INVALID', 'message': 'Request body must be JSON'})
+            return
+        result = self.server.analyze(request)
+        status = {'OK': 200, 'INVALID': 400}.get(result['status'], 500)
+        self.sendJson(status, result)
+
+class AnalysisServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handing each request to a pool of worker processes with the reference layers loaded"""
+    daemon_threads = True
+
+    def __init__(self, address, workers):
+        HTTPServer.__init__(self, address, AnalysisRequestHandler)
+        self.workers = workers
+        self.metrics = ServiceMetrics()
+        self.pool = multiprocessing.Pool(processes=workers, initializer=warmWorker)
+        # feature count of each reference layer, refreshed by each request
+        self.layer_counts = {}
+
+    def analyze(self, request):
+        """Run a request in a worker process and record its response time"""
+        self.metrics.begin()
+        start_time = time.time()
+        try:
+            result = self.pool.apply_async(analyzeSite, (request,)).get(request_timeout)
+        except multiprocessing.TimeoutError:
+            result = {'status': 'ERROR', 'message': 'The analysis did not finish within {} seconds'.format(request_timeout)}
+        self.metrics.end(time.time() - start_time, result['status'] == 'OK')
+        if 'layers' in result:
+            self.layer_counts = result['layers']
+        return result
+
+    def health(self):
+        return {'status': 'OK', 'workers': self.workers, 'layers': self.layer_counts, 'uptime_seconds': self.metrics.report()['uptime_seconds']}
+
+    def closePool(self):
+        self.pool.terminate()
+        self.pool.join()
+
+def runService(service_port=port, workers=None):
+    """Start the analysis service and answer requests until stopped (Ctrl+C)"""
+    if not workers:
+        workers = max(1, multiprocessing.cpu_count() - 1)
+    server = AnalysisServer((host, service_port), workers)
+    # load the reference layers before accepting requests
+    layers = server.pool.apply(loadReferenceLayers)[1]
+    server.layer_counts = layers
+    arcpy.AddMessage('\nSARA analysis service listening on http://{}:{} with {} worker processes'.format(host, service_port, workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        arcpy.AddMessage('\nStopping SARA analysis service')
+    finally:
+        server.server_close()
+        server.closePool()
+
+if __name__ == '__main__':
+    try:
+        # worker processes must start python.exe rather than the ArcGIS application
+        if sys.platform.startswith('win'):
+            multiprocessing.set_executable(os.path.join(sys.exec_prefix, 'python.exe'))
+        # port and number of worker processes - optional command line arguments
+        service_port = int(sys.argv[1]) if len(sys.argv) > 1 else port
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+        runService(service_port, workers)
+    # If an error occurs running geoprocessing tool(s) capture error and write message
+    # handle error outside of Python system
+    except EnvironmentError as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # handle exception error
+    except Exception as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
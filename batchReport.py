@@ -0,0 +1,273 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Batch Reporting Tool
+#
+# Purpose:     To run the SARA Reporting Tool for every facility listed in a table, spreading the facilities across a pool of worker processes.
+#
+# Summary:     User enters a CSV file or geodatabase table of SARA facilities, an output folder, and the number of worker processes.  Each facility
+#              is run through SARAReportTool.createSaraReport in its own output folder and scratch workspace.  A facility that fails is recorded in
+#              the batch summary and the remaining facilities continue to run, including a facility whose worker process stops (for
+#              example an ArcGIS crash) or that runs longer than facility_timeout.  Rows with the PATTS ID of an earlier row are not run,
+#              since each facility's output folder is named for its PATTS ID.  A batch summary (.csv) listing the status and elapsed time for each
+#              facility is written to the output folder.
+#
+#              The facilities table requires the following fields:
+#              NAME, ADDRESS, PATTS, CHEMICAL, LATITUDE, LONGITUDE, DISTANCES (separated by ;), UNITS
+#
+#              Maps can be drawn without the map document template (mapRenderer.py), which avoids map document locks when
+#              many facilities are mapped at the same time.
+#
+#              Running a batch again on the same day resumes each facility from its run manifest, so only the failed facilities and the
+#              stages they did not complete are run again.  A facility can also give the project folder of an earlier run and the stages
+#              to run again in it (changeDetection.py), so only the stages that changes to the reference data reach are run again.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, sys, csv, time, datetime, multiprocessing, errorLogger, csvFiles
+
+# fields required in the facilities table
+facility_fields = ['NAME', 'ADDRESS', 'PATTS', 'CHEMICAL', 'LATITUDE', 'LONGITUDE', 'DISTANCES', 'UNITS']
+# fields written to the batch summary
+summary_fields = ['PATTS', 'NAME', 'STATUS', 'ELAPSED_SECONDS', 'OUTPUT_DIR', 'MESSAGE']
+# seconds between checks of the facilities running in worker processes
+poll_seconds = 0.5
+# seconds a facility may run before it is recorded as failed (None for no limit)
+facility_timeout = 6 * 60 * 60
+# file in a facility's folder holding the process ID of the worker process running it
+pid_file_name = 'batch_worker.pid'
+
+def readFacilities(facilities_table):
+    """Read SARA facilities from a CSV file or geodatabase table into a list of dictionaries.  Each facility is run in a folder named
+       for its PATTS ID, so only the first row of a PATTS ID is kept.  Rows with the PATTS ID of an earlier row, or without a PATTS ID,
+       latitude, or longitude, are reported as warnings and not run."""
+    facilities = []
+    # CSV file
+    if facilities_table.lower().endswith('.csv'):
+        with csvFiles.openCsvFile(facilities_table, 'r') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                # ignore case and white space in column headings.  Missing cells are None, and extra cells are a list under None.
+                record = dict((key.strip().upper(), (value or '').strip()) for key, value in row.items()
+                              if key and (value is None or isinstance(value, (str, type(u'')))))
+                facilities.append(dict((field, record.get(field, '')) for field in facility_fields))
+    # geodatabase table or feature class
+    else:
+        with arcpy.da.SearchCursor(facilities_table, facility_fields) as cursor:
+            for row in cursor:
+                facilities.append(dict(zip(facility_fields, row)))
+    # rows with the PATTS ID of an earlier row would write over its reports
+    first_rows = {}
+    unique_facilities = []
+    for row_number, facility in enumerate(facilities, 1):
+        patts_id = str(facility['PATTS']).strip() if facility['PATTS'] is not None else ''
+        if not patts_id:
+            arcpy.AddWarning('\nRow {} of the facilities table has no PATTS ID and will not be run'.format(row_number))
+            continue
+        try:
+            float(facility['LATITUDE'])
+            float(facility['LONGITUDE'])
+        except (TypeError, ValueError):
+            arcpy.AddWarning('\nRow {} of the facilities table (PATTS ID {}) has no valid latitude and longitude and will not be run'.format(row_number, patts_id))
+            continue
+        if patts_id in first_rows:
+            arcpy.AddWarning('\nRow {} of the facilities table has the same PATTS ID ({}) as row {} and will not be run'.format(row_number, patts_id, first_rows[patts_id]))
+            continue
+        first_rows[patts_id] = row_number
+        unique_facilities.append(facility)
+    # end for
+    return unique_facilities
+
+def initWorker():
+    """Set up a worker process so a failed facility raises an error instead of exiting Python"""
+    errorLogger.exit_on_error = False
+
+def facilityFolder(output_dir, facility):
+    """Return the output folder of a facility"""
+    return os.path.join(output_dir, 'PATTS_{}'.format(facility['PATTS']))
+
+def runFacility(args):
+    """Run the SARA Reporting Tool for one facility and return a summary record.  When the facility has a PROJECT_DIR and RERUN_STAGES,
+       that earlier run is updated by running only those stages again."""
+    facility, output_dir, native_map = args
+    # SARAReportTool is imported here so each worker process loads its own copy
+    import SARAReportTool
+    start_time = time.time()
+    patts_id = str(facility['PATTS'])
+    # each facility gets its own output folder and scratch workspace
+    facility_dir = facilityFolder(output_dir, facility)
+    summary = {'PATTS': patts_id, 'NAME': facility['NAME'], 'OUTPUT_DIR': facility_dir, 'MESSAGE': ''}
+    try:
+        if not os.path.exists(facility_dir):
+            os.mkdir(facility_dir)
+        # lets the batch find out if this process stops before the facility finishes
+        with open(os.path.join(facility_dir, pid_file_name), 'w') as f:
+            f.write(str(os.getpid()))
+        scratch_dir = os.path.join(facility_dir, 'Scratch')
+        if not os.path.exists(scratch_dir):
+            os.mkdir(scratch_dir)
+        arcpy.env.scratchWorkspace = scratch_dir
+        # distances may be separated by ; (tool form) or , (spreadsheet)
+        mrb_distances = ';'.join([d.strip() for d in str(facility['DISTANCES']).replace(',', ';').split(';') if d.strip()])
+        sub_dir = SARAReportTool.createSaraReport(facility['NAME'], facility['ADDRESS'], patts_id, facility['CHEMICAL'],
+                                                  float(facility['LATITUDE']), float(facility['LONGITUDE']), mrb_distances,
+                                                  facility['UNITS'], facility_dir, profile_run=True, use_results_cache=True, native_map=native_map, record_results=True, resume=True,
+                                                  project_dir=facility.get('PROJECT_DIR'), rerun_stages=facility.get('RERUN_STAGES'))
+        summary['STATUS'] = 'Completed'
+        summary['OUTPUT_DIR'] = sub_dir
+    # record the error and let the batch carry on
+    except Exception as e:
+        summary['STATUS'] = 'Failed'
+        summary['MESSAGE'] = str(e).strip()
+    summary['ELAPSED_SECONDS'] = round(time.time() - start_time, 1)
+    return summary
+
+def facilityWorker(facility_dir, submit_time):
+    """Return the process ID of the worker process running a facility and the time it started, or None if the facility has not
+       started.  A process ID file written before the facility was submitted is left over from another batch and ignored."""
+    pid_file = os.path.join(facility_dir, pid_file_name)
+    try:
+        # allow for file systems that store modification times to the nearest two seconds
+        started = os.path.getmtime(pid_file)
+        if started < submit_time - 2:
+            return None
+        with open(pid_file) as f:
+            return int(f.read()), started
+    except (IOError, OSError, ValueError):
+        return None
+
+def waitForFacility(running_facilities):
+    """Wait for a facility running in a worker process to finish and return its summary record.  A facility whose worker process
+       stopped (for example an ArcGIS crash), whose summary could not be passed back, or that ran longer than facility_timeout is
+       returned as failed.
+
+       running_facilities = dictionary of PATTS ID to (AsyncResult, facility, output folder, submit time)
+    """
+    while True:
+        # worker processes of the pool (child processes of this process) that are still running
+        worker_pids = set(process.pid for process in multiprocessing.active_children())
+        for patts_id, (result, facility, facility_dir, submit_time) in list(running_facilities.items()):
+            error = None
+            start_time = submit_time
+            if result.ready():
+                try:
+                    return result.get()
+                except Exception as e:
+                    error = 'the facility could not be run in a worker process: {}'.format(str(e).strip() or e.__class__.__name__)
+            else:
+                worker = facilityWorker(facility_dir, submit_time)
+                if worker:
+                    start_time = worker[1]
+                    if worker[0] not in worker_pids and not result.ready():
+                        error = 'the worker process running the facility stopped before the facility finished'
+                    elif facility_timeout and time.time() - start_time > facility_timeout:
+                        error = 'the facility did not finish in {} seconds'.format(facility_timeout)
+            if error:
+                return {'PATTS': patts_id, 'NAME': facility['NAME'], 'STATUS': 'Failed', 'ELAPSED_SECONDS': round(time.time() - start_time, 1),
+                        'OUTPUT_DIR': facility_dir, 'MESSAGE': error}
+        # end for
+        time.sleep(poll_seconds)
+
+def writeBatchSummary(summaries, summary_file):
+    """Write the status and elapsed time for each facility to a csv file"""
+    with csvFiles.openCsvFile(summary_file, 'w') as f:
+        writer = csv.DictWriter(f, summary_fields)
+        writer.writeheader()
+        for summary in summaries:
+            writer.writerow(summary)
+
+def runBatch(facilities_table, output_dir, workers=None, native_map=False):
+    """Run the SARA Reporting Tool for each facility in a table using a pool of worker processes
+
+       native_map = draw each map without the map document template (mapRenderer.py)
+    """
+    return runFacilities(readFacilities(facilities_table), output_dir, workers, native_map)
+
+def runFacilities(facilities, output_dir, workers=None, native_map=False):
+    """Run the SARA Reporting Tool for a list of facility dictionaries (facility_fields) and return the batch summary file"""
+    # default to one worker per processor, leaving one for the operating system
+    if not workers:
+        workers = max(1, multiprocessing.cpu_count() - 1)
+    arcpy.AddMessage('\nRunning {} SARA facilities using {} worker processes'.format(len(facilities), workers))
+    summaries = []
+    # AsyncResult, facility, output folder, and submit time of each facility not yet finished
+    running_facilities = {}
+    lost = False
+    pool = multiprocessing.Pool(processes=workers, initializer=initWorker)
+    try:
+        for facility in facilities:
+            facility_dir = facilityFolder(output_dir, facility)
+            # the worker process writes its process ID once the facility starts
+            if os.path.exists(os.path.join(facility_dir, pid_file_name)):
+                os.remove(os.path.join(facility_dir, pid_file_name))
+            running_facilities[str(facility['PATTS'])] = (pool.apply_async(runFacility, ((facility, output_dir, native_map),)), facility, facility_dir, time.time())
+        # end for
+        while running_facilities:
+            summary = waitForFacility(running_facilities)
+            result = running_facilities.pop(summary['PATTS'])[0]
+            # a facility lost with its worker process is never finished
+            lost = lost or not result.ready()
+            summaries.append(summary)
+            message = 'PATTS {} {} in {} seconds ({} of {})'.format(summary['PATTS'], summary['STATUS'].lower(), summary['ELAPSED_SECONDS'], len(summaries), len(facilities))
+            if summary['STATUS'] == 'Completed':
+                arcpy.AddMessage('\n{}'.format(message))
+            else:
+                arcpy.AddWarning('\n{}'.format(message))
+        # end for
+    finally:
+        # a facility lost with its worker process is never finished, so the pool is stopped rather than waited for
+        if running_facilities or lost:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+
+    # keep summary in the same order as the facilities table
+    order = dict((str(facility['PATTS']), index) for index, facility in enumerate(facilities))
+    summaries.sort(key=lambda summary: order.get(summary['PATTS'], len(order)))
+    summary_file = os.path.join(output_dir, 'SARA_Batch_Summary_{}.csv'.format(datetime.date.today().strftime("%Y-%m-%d")))
+    writeBatchSummary(summaries, summary_file)
+    failed = len([summary for summary in summaries if summary['STATUS'] != 'Completed'])
+    arcpy.AddMessage('\nCompleted batch with {} failed facilities.  Batch summary written to {}'.format(failed, summary_file))
+    return summary_file
+
+if __name__ == '__main__':
+    try:
+        # worker processes must start python.exe rather than the ArcGIS application
+        if sys.platform.startswith('win'):
+            multiprocessing.set_executable(os.path.join(sys.exec_prefix, 'python.exe'))
+        # User entered variables from ArcGIS tool
+        # CSV file or table of SARA facilities - file/table
+        facilities_table = arcpy.GetParameterAsText(0)
+        # Output directory for analysis results - folder
+        output_dir = arcpy.GetParameterAsText(1)
+        # Number of worker processes - long, optional
+        workers = arcpy.GetParameterAsText(2)
+        # Draw the maps without the map document template - boolean, optional
+        native_map = arcpy.GetParameterAsText(3).lower() == 'true'
+
+        runBatch(facilities_table, output_dir, int(workers) if workers else None, native_map)
+    # If an error occurs running geoprocessing tool(s) capture error and write message
+    # handle error outside of Python system
+    except EnvironmentError as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # handle exception error
+    except Exception as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
@@ -0,0 +1,496 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Local ArcPy Stand-in for Benchmarks
+#
+# Purpose:     Run the SARA analysis modules against synthetic data on a computer without ArcGIS, so their speed can be measured.
+#
+# Summary:     An in-memory workspace holding feature classes and feature layers, with the small part of the arcpy API the benchmarked
+#              modules call: Describe, ListFields, GetCount, feature layers and selections, Clip, SpatialJoin, CreateFeatureclass, AddField,
+#              and the arcpy.da cursors and FeatureClassToNumPyArray.  It is only loaded by runBenchmarks.py, which installs it as the arcpy
+#              module before the SARA modules are imported.
+#
+#              Datasets are found by the last part of their path, so the paths hard-coded in the SARA modules (C:\GIS\Geodata.gdb\...) and
+#              in_memory outputs both work.  Clip uses the Sutherland-Hodgman algorithm, which is exact when the clip features are convex,
+#              such as the risk radii.  Select by location and spatial join with INTERSECT compare feature envelopes, which is exact for the
+#              rectangular building footprints and floodplains made by syntheticData.py.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import math, re, numpy
+
+# feature classes and tables, by name
+datasets = {}
+# feature layers, by name
+layers = {}
+# geoprocessing messages (printed when verbose is True)
+messages = []
+verbose = False
+# vertices used for a buffer around a point
+buffer_vertices = 360
+# meters in one unit of the supported coordinate systems
+meters_per_unit = {2272: 1200.0 / 3937.0}
+# names of the supported coordinate systems
+coordinate_system_names = {2272: 'NAD_1983_StatePlane_Pennsylvania_South_FIPS_3702_Feet'}
+
+class Environment(object):
+    """arcpy.env"""
+    def __init__(self):
+        self.overwriteOutput = False
+        self.workspace = None
+        self.scratchWorkspace = None
+
+env = Environment()
+
+def addMessage(message):
+    messages.append(message)
+    if verbose:
+        print(message)
+
+AddMessage = addMessage
+AddWarning = addMessage
+AddError = addMessage
+
+class Result(object):
+    """Result of a geoprocessing tool"""
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+
+    def getOutput(self, index):
+        return self.outputs[index]
+
+    def __getitem__(self, index):
+        return self.outputs[index]
+
+    def __str__(self):
+        return str(self.outputs[0])
+
+class SpatialReference(object):
+    def __init__(self, wkid=None):
+        self.factoryCode = wkid
+        self.metersPerUnit = meters_per_unit.get(wkid, 1.0)
+
+    def exportToString(self):
+        return 'PROJCS["{}"]'.format(coordinate_system_names.get(self.factoryCode, self.factoryCode))
+
+class Extent(object):
+    def __init__(self, xmin, ymin, xmax, ymax):
+        self.XMin = xmin
+        self.YMin = ymin
+        self.XMax = xmax
+        self.YMax = ymax
+
+class Point(object):
+    def __init__(self, x=0.0, y=0.0):
+        self.X = x
+        self.Y = y
+
+class Geometry(object):
+    """Point, line, or polygon made of parts, each a list of (x, y).  Polygon rings are closed (first vertex repeated at the end)."""
+    def __init__(self, shape_type, parts, spatial_reference=None):
+        self.type = shape_type
+        self.parts = parts
+        self.spatialReference = spatial_reference
+
+    def __iter__(self):
+        for part in self.parts:
+            yield [Point(x, y) for x, y in part]
+
+    @property
+    def extent(self):
+        xs = [x for part in self.parts for x, y in part]
+        ys = [y for part in self.parts for x, y in part]
+        return Extent(min(xs), min(ys), max(xs), max(ys))
+
+    @property
+    def firstPoint(self):
+        return Point(*self.parts[0][0])
+
+    @property
+    def area(self):
+        if self.type != 'Polygon':
+            return 0.0
+        return abs(sum(ringArea(part) for part in self.parts))
+
+    @property
+    def trueCentroid(self):
+        extent = self.extent
+        return Point((extent.XMin + extent.XMax) / 2.0, (extent.YMin + extent.YMax) / 2.0)
+
+    def buffer(self, distance):
+        """Return a polygon approximating a circle around a point"""
+        x, y = self.parts[0][0]
+        # clockwise, as ArcGIS stores polygon exterior rings
+        angles = -numpy.arange(buffer_vertices + 1) * 2 * math.pi / buffer_vertices
+        ring = list(zip((x + distance * numpy.cos(angles)).tolist(), (y + distance * numpy.sin(angles)).tolist()))
+        ring[-1] = ring[0]
+        return Geometry('Polygon', [ring], self.spatialReference)
+
+def PointGeometry(point, spatial_reference=None):
+    return Geometry('Point', [[(point.X, point.Y)]], spatial_reference)
+
+def ringArea(ring):
+    """Signed area of a ring (negative when clockwise)"""
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(ring[:-1], ring[1:]):
+        area += x1 * y2 - x2 * y1
+    return area / 2.0
+
+def clipRing(subject, clip):
+    """Clip a ring with a convex ring (Sutherland-Hodgman)"""
+    # keep points on the inside of each clip edge, whichever way the clip ring runs
+    orientation = 1.0 if ringArea(clip) > 0 else -1.0
+    output = list(subject[:-1]) if subject[0] == subject[-1] else list(subject)
+    for (cx1, cy1), (cx2, cy2) in zip(clip[:-1], clip[1:]):
+        if not output:
+            break
+        def inside(point):
+            return orientation * ((cx2 - cx1) * (point[1] - cy1) - (cy2 - cy1) * (point[0] - cx1)) >= 0
+        def crossing(p1, p2):
+            dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+            edge_dx, edge_dy = cx2 - cx1, cy2 - cy1
+            denominator = edge_dx * dy - edge_dy * dx
+            t = (edge_dy * (p1[0] - cx1) - edge_dx * (p1[1] - cy1)) / denominator
+            return (p1[0] + t * dx, p1[1] + t * dy)
+        points = output
+        output = []
+        previous = points[-1]
+        for point in points:
+            if inside(point):
+                if not inside(previous):
+                    output.append(crossing(previous, point))
+                output.append(point)
+            elif inside(previous):
+                output.append(crossing(previous, point))
+            previous = point
+        # end for
+    # end for
+    if len(output) < 3:
+        return None
+    return output + [output[0]]
+
+class Field(object):
+    def __init__(self, name, field_type):
+        self.name = name
+        self.type = field_type
+
+class Dataset(object):
+    """Feature class or table held in memory"""
+    def __init__(self, name, shape_type, fields=(), spatial_reference=None):
+        self.name = name
+        self.shapeType = shape_type
+        self.spatialReference = spatial_reference or SpatialReference(2272)
+        self.fields = [Field('OBJECTID', 'OID'), Field('Shape', 'Geometry')] + [Field(field_name, field_type) for field_name, field_type in fields]
+        self.oids = []
+        self.shapes = []
+        self.columns = dict((field_name, []) for field_name, field_type in fields)
+        self.positions = {}
+        self.envelope_array = None
+
+    def addField(self, field_name, field_type):
+        self.fields.append(Field(field_name, field_type))
+        self.columns[field_name] = [None] * len(self.oids)
+
+    def insert(self, shape, values=None):
+        """Add a feature and return its OBJECTID"""
+        values = values or {}
+        oid = len(self.oids) + 1
+        self.positions[oid] = len(self.oids)
+        self.oids.append(oid)
+        self.shapes.append(shape)
+        for field_name in self.columns:
+            self.columns[field_name].append(values.get(field_name))
+        self.envelope_array = None
+        return oid
+
+    def envelopes(self):
+        """Return an array of feature envelopes (xmin, ymin, xmax, ymax)"""
+        if self.envelope_array is None:
+            envelopes = numpy.zeros((len(self.shapes), 4))
+            for position, shape in enumerate(self.shapes):
+                extent = shape.extent
+                envelopes[position] = (extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+            self.envelope_array = envelopes
+        return self.envelope_array
+
+    def value(self, oid, field_name):
+        position = self.positions[oid]
+        if field_name in ('OBJECTID', 'OID@'):
+            return oid
+        shape = self.shapes[position]
+        if field_name == 'SHAPE@':
+            return shape
+        if field_name == 'SHAPE@XY':
+            if shape.type == 'Point':
+                return shape.parts[0][0]
+            centroid = shape.trueCentroid
+            return (centroid.X, centroid.Y)
+        if field_name == 'SHAPE@X':
+            return self.value(oid, 'SHAPE@XY')[0]
+        if field_name == 'SHAPE@Y':
+            return self.value(oid, 'SHAPE@XY')[1]
+        if field_name in ('SHAPE@AREA', 'Shape_Area'):
+            return shape.area
+        return self.columns[field_name][position]
+
+class Layer(object):
+    """Feature layer with a definition query and a selection"""
+    def __init__(self, dataset, oids):
+        self.dataset = dataset
+        self.oids = oids
+        self.selection = None
+
+def datasetName(path):
+    """Return the name of a dataset from its path"""
+    return re.split(r'[\\/]', str(path))[-1]
+
+def resolve(value):
+    """Return the dataset and the OBJECTIDs in use (selected features of a layer) for a layer, dataset path, or tool result"""
+    name = str(value)
+    if name in layers:
+        layer = layers[name]
+        oids = layer.oids if layer.selection is None else [oid for oid in layer.oids if oid in layer.selection]
+        return layer.dataset, oids
+    dataset = datasets.get(datasetName(name))
+    if dataset is None:
+        raise RuntimeError('ERROR 000732: Dataset {} does not exist or is not supported'.format(name))
+    return dataset, list(dataset.oids)
+
+def parseValue(text):
+    text = text.strip()
+    if text[:1] in ('"', "'"):
+        return text[1:-1]
+    return float(text)
+
+def whereFilter(dataset, oids, where_clause):
+    """Return the OBJECTIDs matching a simple where clause (field IN (...) or field <operator> value)"""
+    if not where_clause:
+        return list(oids)
+    match = re.match(r'^\s*"?(\w+)"?\s+IN\s*\((.*)\)\s*$', where_clause, re.IGNORECASE)
+    if match:
+        values = set(parseValue(value) for value in match.group(2).split(',') if value.strip())
+        return [oid for oid in oids if dataset.value(oid, match.group(1)) in values]
+    match = re.match(r'^\s*"?(\w+)"?\s*(<>|<=|>=|=|<|>)\s*(.+?)\s*$', where_clause)
+    if not match:
+        raise RuntimeError('ERROR 000358: Invalid expression {}'.format(where_clause))
+    field_name, operator, value = match.group(1), match.group(2), parseValue(match.group(3))
+    tests = {'=': lambda a: a == value, '<>': lambda a: a != value, '<': lambda a: a is not None and a < value,
+             '>': lambda a: a is not None and a > value, '<=': lambda a: a is not None and a <= value, '>=': lambda a: a is not None and a >= value}
+    return [oid for oid in oids if tests[operator](dataset.value(oid, field_name))]
+
+class Description(object):
+    def __init__(self, dataset, oids):
+        self.shapeType = dataset.shapeType
+        self.spatialReference = dataset.spatialReference
+        self.OIDFieldName = 'OBJECTID'
+        self.fields = dataset.fields
+        envelopes = dataset.envelopes()[[dataset.positions[oid] for oid in oids]] if oids else numpy.zeros((1, 4))
+        self.extent = Extent(envelopes[:, 0].min(), envelopes[:, 1].min(), envelopes[:, 2].max(), envelopes[:, 3].max())
+
+def Describe(value):
+    dataset, oids = resolve(value)
+    return Description(dataset, oids)
+
+def ListFields(value):
+    return list(resolve(value)[0].fields)
+
+def AddFieldDelimiters(dataset, field_name):
+    return field_name
+
+def Exists(value):
+    try:
+        resolve(value)
+        return True
+    except RuntimeError:
+        return False
+
+def GetCount_management(value):
+    return Result(str(len(resolve(value)[1])))
+
+def MakeFeatureLayer_management(in_features, out_layer, where_clause='', *args, **kwargs):
+    dataset, oids = resolve(in_features)
+    layers[out_layer] = Layer(dataset, whereFilter(dataset, oids, where_clause))
+    return Result(out_layer)
+
+def SelectLayerByAttribute_management(layer_name, selection_type='NEW_SELECTION', where_clause=''):
+    layer = layers[str(layer_name)]
+    if selection_type == 'CLEAR_SELECTION':
+        layer.selection = None
+    else:
+        layer.selection = set(whereFilter(layer.dataset, layer.oids, where_clause))
+    return Result(layer_name)
+
+def intersectingPositions(dataset, oids, select_features):
+    """Return the OBJECTIDs whose envelope intersects the envelope of any of the select features"""
+    select_dataset, select_oids = resolve(select_features)
+    if not oids or not select_oids:
+        return set()
+    envelopes = dataset.envelopes()[[dataset.positions[oid] for oid in oids]]
+    select_envelopes = select_dataset.envelopes()[[select_dataset.positions[oid] for oid in select_oids]]
+    matches = numpy.zeros(len(oids), dtype=bool)
+    for xmin, ymin, xmax, ymax in select_envelopes:
+        matches |= (envelopes[:, 0] <= xmax) & (envelopes[:, 2] >= xmin) & (envelopes[:, 1] <= ymax) & (envelopes[:, 3] >= ymin)
+    return set(numpy.asarray(oids)[matches].tolist())
+
+def SelectLayerByLocation_management(layer_name, overlap_type='INTERSECT', select_features=None, search_distance=None, selection_type='NEW_SELECTION', *args, **kwargs):
+    if overlap_type != 'INTERSECT':
+        raise NotImplementedError('The benchmark stand-in only supports INTERSECT')
+    layer = layers[str(layer_name)]
+    candidates = layer.oids if selection_type == 'NEW_SELECTION' or layer.selection is None else [oid for oid in layer.oids if oid in layer.selection]
+    layer.selection = intersectingPositions(layer.dataset, candidates, select_features)
+    return Result(layer_name)
+
+def SpatialJoin_analysis(target_features, join_features, out_feature_class, join_operation='JOIN_ONE_TO_ONE', join_type='KEEP_ALL', *args, **kwargs):
+    target_dataset, target_oids = resolve(target_features)
+    join_dataset, join_oids = resolve(join_features)
+    join_fields = [field for field in join_dataset.fields if field.name in join_dataset.columns]
+    output = Dataset(datasetName(out_feature_class), target_dataset.shapeType, [('TARGET_FID', 'Integer'), ('JOIN_FID', 'Integer')] + [(field.name, field.type) for field in join_fields])
+    if target_oids and join_oids:
+        envelopes = target_dataset.envelopes()[[target_dataset.positions[oid] for oid in target_oids]]
+        target_array = numpy.asarray(target_oids)
+        for join_oid in join_oids:
+            xmin, ymin, xmax, ymax = join_dataset.envelopes()[join_dataset.positions[join_oid]]
+            matches = (envelopes[:, 0] <= xmax) & (envelopes[:, 2] >= xmin) & (envelopes[:, 1] <= ymax) & (envelopes[:, 3] >= ymin)
+            for target_oid in target_array[matches].tolist():
+                values = dict((field.name, join_dataset.value(join_oid, field.name)) for field in join_fields)
+                values.update({'TARGET_FID': target_oid, 'JOIN_FID': join_oid})
+                output.insert(target_dataset.shapes[target_dataset.positions[target_oid]], values)
+        # end for
+    datasets[output.name] = output
+    return Result(out_feature_class)
+
+def Clip_analysis(in_features, clip_features, out_feature_class, *args, **kwargs):
+    dataset, oids = resolve(in_features)
+    clip_dataset, clip_oids = resolve(clip_features)
+    output = Dataset(datasetName(out_feature_class), dataset.shapeType, [(field.name, field.type) for field in dataset.fields if field.name in dataset.columns], dataset.spatialReference)
+    envelopes = dataset.envelopes()[[dataset.positions[oid] for oid in oids]] if oids else numpy.zeros((0, 4))
+    for clip_oid in clip_oids:
+        clip_shape = clip_dataset.shapes[clip_dataset.positions[clip_oid]]
+        extent = clip_shape.extent
+        near = (envelopes[:, 0] <= extent.XMax) & (envelopes[:, 2] >= extent.XMin) & (envelopes[:, 1] <= extent.YMax) & (envelopes[:, 3] >= extent.YMin)
+        for oid in numpy.asarray(oids)[near].tolist():
+            position = dataset.positions[oid]
+            parts = []
+            for part in dataset.shapes[position].parts:
+                for clip_ring in clip_shape.parts:
+                    clipped = clipRing(part, clip_ring)
+                    if clipped:
+                        parts.append(clipped)
+            # end for
+            if parts:
+                output.insert(Geometry(dataset.shapeType, parts, dataset.spatialReference), dict((name, column[position]) for name, column in dataset.columns.items()))
+        # end for
+    # end for
+    datasets[output.name] = output
+    return Result(out_feature_class)
+
+def CreateFeatureclass_management(out_path, out_name, geometry_type='POLYGON', template=None, has_m='DISABLED', has_z='DISABLED', spatial_reference=None):
+    shape_types = {'POINT': 'Point', 'POLYLINE': 'Polyline', 'POLYGON': 'Polygon'}
+    name = datasetName(out_name)
+    datasets[name] = Dataset(name, shape_types[geometry_type.upper()], spatial_reference=spatial_reference)
+    return Result(name)
+
+def AddField_management(in_table, field_name, field_type, *args, **kwargs):
+    dataset = resolve(in_table)[0]
+    if field_name not in dataset.columns:
+        dataset.addField(field_name, {'TEXT': 'String', 'DOUBLE': 'Double', 'LONG': 'Integer', 'SHORT': 'SmallInteger', 'FLOAT': 'Single'}.get(field_type.upper(), field_type))
+    return Result(in_table)
+
+def Delete_management(value, *args, **kwargs):
+    name = str(value)
+    if name in layers:
+        del layers[name]
+    else:
+        datasets.pop(datasetName(name), None)
+    return Result('true')
+
+class SearchCursor(object):
+    """arcpy.da.SearchCursor"""
+    def __init__(self, in_table, field_names, where_clause=None, spatial_reference=None, *args, **kwargs):
+        self.dataset, oids = resolve(in_table)
+        self.field_names = [field_names] if isinstance(field_names, str) else list(field_names)
+        self.oids = whereFilter(self.dataset, oids, where_clause)
+        self.rows = iter(self.oids)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        oid = next(self.rows)
+        return tuple(self.dataset.value(oid, field_name) for field_name in self.field_names)
+
+    next = __next__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def reset(self):
+        self.rows = iter(self.oids)
+
+class InsertCursor(object):
+    """arcpy.da.InsertCursor"""
+    def __init__(self, in_table, field_names):
+        self.dataset = resolve(in_table)[0]
+        self.field_names = list(field_names)
+
+    def insertRow(self, row):
+        values = dict(zip(self.field_names, row))
+        return self.dataset.insert(values.pop('SHAPE@', None), values)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+def fieldDtype(dataset, field_name):
+    if field_name in ('OID@', 'OBJECTID'):
+        return 'i4'
+    if field_name.startswith('SHAPE@') or field_name == 'Shape_Area':
+        return 'f8'
+    field_type = dict((field.name, field.type) for field in dataset.fields).get(field_name)
+    if field_type in ('Integer', 'SmallInteger'):
+        return 'i8'
+    if field_type in ('Double', 'Single'):
+        return 'f8'
+    return 'U64'
+
+def FeatureClassToNumPyArray(in_table, field_names, where_clause='', spatial_reference=None, explode_to_points=False, skip_nulls=False, null_value=None):
+    dataset, oids = resolve(in_table)
+    oids = whereFilter(dataset, oids, where_clause)
+    dtype = [(str(field_name), fieldDtype(dataset, field_name)) for field_name in field_names]
+    rows = []
+    for oid in oids:
+        row = tuple(dataset.value(oid, field_name) for field_name in field_names)
+        rows.append(tuple(null_value if value is None else value for value in row))
+    return numpy.array(rows, dtype=dtype)
+
+class DataAccess(object):
+    """arcpy.da"""
+    SearchCursor = SearchCursor
+    InsertCursor = InsertCursor
+    FeatureClassToNumPyArray = staticmethod(FeatureClassToNumPyArray)
+
+da = DataAccess()
+
+def reset():
+    """Remove every dataset and layer"""
+    datasets.clear()
+    layers.clear()
+    del messages[:]
@@ -0,0 +1,222 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        File Geodatabase Reader Check
+#
+# Purpose:     Check that the file geodatabase reader (fileGeodatabase.py) decodes point, polyline, and polygon feature classes to the same
+#              geometry and attributes that were written, on any computer with Python and NumPy.
+#
+# Summary:     The reference features are created from a fixed random seed: points (some with no geometry), multi-part random-walk lines,
+#              and polygons with holes and multiple parts, each with integer, double, and text fields (some text values are null).  They
+#              are saved in data/FileGeodatabaseCheck.gdb, which was written with GDAL's OpenFileGDB driver (pyogrio and shapely), so
+#              the reader is checked against a geodatabase it did not write.  The check reads each feature class with the reader and
+#              compares the OBJECTIDs, envelopes, vertices (to 0.001 feet), parts, attributes, and coordinate system with the reference
+#              features, then checks the bounding box and where clause filters.  Polygon rings are compared without regard to their
+#              starting vertex or direction, since the geodatabase stores rings in its own order.
+#
+#              --rebuild writes the geodatabase again from the reference features (requires pyogrio and shapely).
+#
+#              Usage:  python benchmarks/checkFileGeodatabase.py [--rebuild] [--gdb folder.gdb]
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import os, sys, shutil, argparse, numpy
+
+# the SARA modules are in the folder above
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmark_dir))
+import fileGeodatabase
+
+# geodatabase written from the reference features
+check_gdb = os.path.join(benchmark_dir, 'data', 'FileGeodatabaseCheck.gdb')
+# random seed of the reference features
+seed = 2019
+# largest difference (feet) between a decoded and a reference coordinate
+tolerance = 0.001
+# PA State Plane South (feet)
+wkid = 2272
+# attribute fields of every feature class
+fields = ['CODE', 'VALUE', 'NAME']
+
+def ringVertices(random, x, y, radius, count, clockwise):
+    """Return a closed ring of vertices around a centre, at random distances from it"""
+    angles = numpy.sort(random.uniform(0, 2 * numpy.pi, count))
+    if clockwise:
+        angles = angles[::-1]
+    distances = radius * random.uniform(0.6, 1.0, count)
+    ring = numpy.column_stack([x + distances * numpy.cos(angles), y + distances * numpy.sin(angles)])
+    return numpy.vstack([ring, ring[:1]])
+
+def referenceFeatures():
+    """Return the reference features of each feature class: shape type and a list of (parts, CODE, VALUE, NAME) for each feature.
+       Points have one part of one vertex (or no parts for no geometry), and polygons have a list of rings for each part."""
+    random = numpy.random.RandomState(seed)
+    layers = {}
+    points = []
+    for index in range(200):
+        parts = [] if index % 37 == 5 else [random.uniform([2250000, 200000], [2350000, 300000]).reshape(1, 2)]
+        points.append(parts)
+    # end for
+    lines = []
+    for index in range(120):
+        parts = []
+        for part in range(random.randint(1, 4)):
+            start = random.uniform([2250000, 200000], [2350000, 300000])
+            steps = random.normal(0, 400, (random.randint(1, 120), 2))
+            parts.append(numpy.vstack([start, start + numpy.cumsum(steps, axis=0)]))
+        # end for
+        lines.append(parts)
+    # end for
+    polygons = []
+    for index in range(80):
+        parts = []
+        for part in range(1 if index % 3 else 2):
+            x, y = random.uniform([2250000, 200000], [2350000, 300000])
+            radius = random.uniform(500, 5000)
+            # outer rings clockwise and holes counterclockwise, as in a file geodatabase
+            rings = [ringVertices(random, x, y, radius, random.randint(3, 100), True)]
+            if index % 4 == 0:
+                rings.append(ringVertices(random, x, y, radius * 0.3, random.randint(3, 40), False))
+            parts.append(rings)
+        # end for
+        polygons.append(parts)
+    # end for
+    for name, shape_type, geometries in [('Check_Points', 'Point', points), ('Check_Lines', 'Polyline', lines), ('Check_Polygons', 'Polygon', polygons)]:
+        features = []
+        for index, parts in enumerate(geometries):
+            features.append((parts, index * 10, round(index * 0.75, 2), None if index % 11 == 3 else 'Feature {}'.format(index)))
+        # end for
+        layers[name] = (shape_type, features)
+    # end for
+    return layers
+
+def writeGeodatabase(gdb):
+    """Write the reference features to a file geodatabase with GDAL's OpenFileGDB driver"""
+    import pyogrio.raw, shapely.geometry
+    if os.path.exists(gdb):
+        shutil.rmtree(gdb)
+    elif not os.path.isdir(os.path.dirname(gdb)):
+        os.makedirs(os.path.dirname(gdb))
+    for name, (shape_type, features) in sorted(referenceFeatures().items()):
+        geometries = []
+        for parts, code, value, label in features:
+            if not parts:
+                geometries.append(None)
+            elif shape_type == 'Point':
+                geometries.append(shapely.geometry.Point(parts[0][0]).wkb)
+            elif shape_type == 'Polyline':
+                geometries.append(shapely.geometry.MultiLineString([part.tolist() for part in parts]).wkb)
+            else:
+                geometries.append(shapely.geometry.MultiPolygon([(rings[0].tolist(), [ring.tolist() for ring in rings[1:]]) for rings in parts]).wkb)
+        # end for
+        geometry_type = {'Point': 'Point', 'Polyline': 'MultiLineString', 'Polygon': 'MultiPolygon'}[shape_type]
+        field_data = [numpy.array([feature[1] for feature in features], dtype='int32'), numpy.array([feature[2] for feature in features], dtype='float64'),
+                      numpy.array([feature[3] for feature in features], dtype=object)]
+        pyogrio.raw.write(gdb, numpy.array(geometries, dtype=object), field_data, fields, layer=name, driver='OpenFileGDB', geometry_type=geometry_type,
+                          crs='EPSG:{}'.format(wkid))
+    # end for
+    print('Wrote {}'.format(gdb))
+
+def canonicalRing(ring):
+    """Return the vertices of a closed ring, without the closing vertex, starting at its lowest vertex and running clockwise"""
+    ring = numpy.asarray(ring)[:-1]
+    # shoelace area is negative for clockwise rings
+    area = 0.5 * numpy.sum(ring[:, 0] * numpy.roll(ring[:, 1], -1) - numpy.roll(ring[:, 0], -1) * ring[:, 1])
+    if area > 0:
+        ring = ring[::-1]
+    start = numpy.lexsort((ring[:, 1], numpy.round(ring[:, 0], 2)))[0]
+    return numpy.roll(ring, -start, axis=0)
+
+def decodedParts(arrays, shape_type, index):
+    """Return the parts of a decoded feature as a list of vertex arrays"""
+    if shape_type == 'Point':
+        point = numpy.array([[arrays['X'][index], arrays['Y'][index]]])
+        return [] if numpy.isnan(point).any() else [point]
+    part_offsets = arrays['PART_OFFSETS']
+    feature_parts = arrays['FEATURE_PARTS']
+    return [arrays['XY'][part_offsets[part]:part_offsets[part + 1]] for part in range(feature_parts[index], feature_parts[index + 1])]
+
+def sameVertices(decoded, reference):
+    """Return True when two vertex arrays have the same vertices to within the tolerance"""
+    return decoded.shape == reference.shape and numpy.abs(decoded - reference).max() <= tolerance
+
+def checkLayer(gdb, name, shape_type, features):
+    """Return a list of the differences between a decoded feature class and its reference features"""
+    problems = []
+    decoded_type, arrays, spatial_reference_wkt = fileGeodatabase.readFeatureClass(os.path.join(gdb, name), fields)
+    if decoded_type != shape_type:
+        return ['{}: shape type is {}, not {}'.format(name, decoded_type, shape_type)]
+    if not spatial_reference_wkt or 'Pennsylvania_South' not in spatial_reference_wkt:
+        problems.append('{}: coordinate system is {}'.format(name, spatial_reference_wkt))
+    if arrays['OID'].tolist() != list(range(1, len(features) + 1)):
+        return problems + ['{}: OBJECTIDs are {}'.format(name, arrays['OID'].tolist())]
+    for index, (parts, code, value, label) in enumerate(features):
+        decoded = decodedParts(arrays, shape_type, index)
+        if shape_type == 'Polygon':
+            rings = [ring for rings in parts for ring in rings]
+            matched = len(decoded) == len(rings) and all(sameVertices(canonicalRing(ring), canonicalRing(reference)) for ring, reference in zip(decoded, rings))
+        else:
+            rings = parts
+            matched = len(decoded) == len(parts) and all(sameVertices(part, reference) for part, reference in zip(decoded, parts))
+        if not matched:
+            problems.append('{} OBJECTID {}: decoded geometry differs from the reference'.format(name, index + 1))
+        if rings:
+            vertices = numpy.vstack(rings)
+            envelope = [vertices[:, 0].min(), vertices[:, 1].min(), vertices[:, 0].max(), vertices[:, 1].max()]
+            if numpy.abs(arrays['ENVELOPE'][index] - envelope).max() > tolerance:
+                problems.append('{} OBJECTID {}: envelope {} differs from {}'.format(name, index + 1, arrays['ENVELOPE'][index].tolist(), envelope))
+        elif not numpy.isnan(arrays['ENVELOPE'][index]).all():
+            problems.append('{} OBJECTID {}: feature with no geometry has an envelope'.format(name, index + 1))
+        if arrays['FIELD_CODE'][index] != code or arrays['FIELD_VALUE'][index] != value or arrays['FIELD_NAME'][index] != (label or u''):
+            problems.append('{} OBJECTID {}: attributes {} differ from {}'.format(name, index + 1,
+                            [arrays['FIELD_CODE'][index], arrays['FIELD_VALUE'][index], arrays['FIELD_NAME'][index]], [code, value, label]))
+    # end for
+
+    # bounding box and where clause filters
+    bbox = (2280000, 230000, 2320000, 270000)
+    expected = [index + 1 for index, envelope in enumerate(arrays['ENVELOPE'])
+                if envelope[0] <= bbox[2] and envelope[2] >= bbox[0] and envelope[1] <= bbox[3] and envelope[3] >= bbox[1]]
+    filtered = fileGeodatabase.readFeatureClass(os.path.join(gdb, name), fields, bbox=bbox)[1]
+    if filtered['OID'].tolist() != expected:
+        problems.append('{}: bounding box returned OBJECTIDs {} in place of {}'.format(name, filtered['OID'].tolist(), expected))
+    filtered = fileGeodatabase.readFeatureClass(os.path.join(gdb, name), fields, where_clause='CODE >= 500 AND VALUE < 60')[1]
+    expected = [index + 1 for index, feature in enumerate(features) if feature[1] >= 500 and feature[2] < 60]
+    if filtered['OID'].tolist() != expected:
+        problems.append('{}: where clause returned OBJECTIDs {} in place of {}'.format(name, filtered['OID'].tolist(), expected))
+    return problems
+
+def checkGeodatabase(gdb):
+    """Check every feature class of the geodatabase against the reference features and return the number of differences"""
+    problem_count = 0
+    for name, (shape_type, features) in sorted(referenceFeatures().items()):
+        problems = checkLayer(gdb, name, shape_type, features)
+        for problem in problems[:20]:
+            print(problem)
+        # end for
+        print('{:<16}{:>5} features  {}'.format(name, len(features), 'matches the reference' if not problems else '{} differences'.format(len(problems))))
+        problem_count += len(problems)
+    # end for
+    return problem_count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the file geodatabase reader against reference features')
+    parser.add_argument('--gdb', default=check_gdb, help='file geodatabase holding the reference features')
+    parser.add_argument('--rebuild', action='store_true', help='write the geodatabase again from the reference features (requires pyogrio and shapely)')
+    args = parser.parse_args()
+
+    if args.rebuild or not os.path.exists(args.gdb):
+        writeGeodatabase(args.gdb)
+    sys.exit(1 if checkGeodatabase(args.gdb) else 0)
@@ -0,0 +1,229 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Benchmarks
+#
+# Purpose:     Time the SARA analysis modules against synthetic data on any computer with Python and NumPy, so speedups and regressions
+#              can be tracked without ArcGIS or the production data.
+#
+# Summary:     Synthetic reference layers are created for the number of counties requested (syntheticData.py) in a local stand-in for
+#              arcpy (arcpyStandIn.py).  The one-time set up (reference data snapshots and floodplain flags) is timed, then each stage is
+#              run for a set of SARA facilities with 1 or more risk radii:
+#
+#              risk_radii             risk rings from latitude and longitude, saved as polygons (riskRings.py)
+#              floodplain             floodplain flag lookup for the building footprint containing the facility (floodplainIndex.py)
+#              population             nested single-pass population estimate from the Census block snapshot (populationEstimate.py)
+#              population_each_ring   the same estimate with every risk radius clipped from the full set of Census blocks
+#              population_streaming   the same estimate with the Census blocks clipped in batches (streaming mode)
+#              population_surface     the estimate from the Census population surface (populationSurface.py)
+#              vulnerable_facilities  distance to every vulnerable facility from the layer snapshots (proximityAnalysis.py)
+#              ring_measures          stream and pipeline length and municipal area within each risk radius (ringMeasures.py)
+#
+#              Latency (mean, median, 95th percentile, and longest) and throughput (facilities per second) are reported for each stage
+#              and number of risk radii, along with the largest difference between the population surface and Census block estimates.
+#              Results can be saved to a JSON file and compared against an earlier run.
+#
+#              Usage:  python benchmarks/runBenchmarks.py [--counties 1 | --state] [--sites 20] [--rings 1,3,5] [--output results.json]
+#                                                         [--compare earlier_results.json]
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import os, sys, json, time, shutil, argparse, tempfile, platform, numpy
+
+# the SARA modules are in the folder above, and import arcpy - use the stand-in in place of arcpy
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, benchmark_dir)
+sys.path.insert(1, os.path.dirname(benchmark_dir))
+import arcpyStandIn
+sys.modules['arcpy'] = arcpyStandIn
+import syntheticData, spatialIndex, dataCache, floodplainIndex, generalizedGeometry, populationEstimate, populationSurface, proximityAnalysis, projection, riskRings, vulnerableFacilities, ringMeasures
+
+# reference data paths used by the SARA modules
+geodata_gdb = r'C:\GIS\Geodata.gdb'
+census_blocks = os.path.join(geodata_gdb, 'Regional_Census2010_Blocks_SPS')
+building_footprints = os.path.join(geodata_gdb, 'Building_Footprints_2008')
+floodplains = os.path.join(geodata_gdb, 'FEMA_Floodplains_2009')
+# stages in the order they are reported
+stage_names = ['risk_radii', 'floodplain', 'population', 'population_each_ring', 'population_streaming', 'population_surface', 'vulnerable_facilities', 'ring_measures']
+
+def timed(function, *args, **kwargs):
+    """Return the result of a function and the seconds it took"""
+    start_time = time.time()
+    result = function(*args, **kwargs)
+    return result, time.time() - start_time
+
+def ringDistances(ring_count, max_distance):
+    """Return evenly spaced risk radius distances up to the largest distance"""
+    return [round(max_distance * (ring + 1) / float(ring_count), 3) for ring in range(ring_count)]
+
+def loadFacilitySnapshots():
+    """Load the vulnerable facility layer snapshots"""
+    snapshots = {}
+    for feature_class, layer_name, clause in vulnerableFacilities.vulnerable_layers:
+        snapshots[layer_name] = dataCache.loadSnapshot(os.path.join(geodata_gdb, feature_class), where_clause=clause)
+    # end for
+    return snapshots
+
+def loadGeneralizedTiers(snapshots):
+    """Load the generalized tiers of the line and polygon vulnerable facility layers"""
+    for snapshot in snapshots.values():
+        if snapshot.shape_type != 'Point':
+            generalizedGeometry.loadGeneralized(snapshot)
+    # end for
+
+def runSetup(counties, scale, seed):
+    """Create the synthetic data and the snapshots and floodplain flags, and return the towns and the time taken by each step"""
+    setup = {}
+    towns, setup['synthetic_data'] = timed(syntheticData.createDatasets, counties, seed, scale)
+    snapshot, setup['census_block_snapshot'] = timed(dataCache.loadSnapshot, census_blocks)
+    flags, setup['floodplain_flags'] = timed(floodplainIndex.loadFloodplainFlags, building_footprints, floodplains)
+    snapshots, setup['facility_snapshots'] = timed(loadFacilitySnapshots)
+    tiers, setup['generalized_geometry'] = timed(loadGeneralizedTiers, snapshots)
+    surface, setup['population_surface'] = timed(populationSurface.loadSurface, census_blocks)
+    counts = dict((name, len(dataset.oids)) for name, dataset in arcpyStandIn.datasets.items())
+    return towns, snapshots, surface, setup, counts
+
+def runSite(x, y, distances, snapshots, surface, layer_names):
+    """Run each stage for one SARA facility and return the seconds taken by each stage, and the largest difference (%) between the
+       population surface and Census block estimates"""
+    seconds = {}
+    lon, lat = projection.statePlaneToWgs84(x, y)
+    def riskRadii():
+        rings = riskRings.fromLatLon(float(lat), float(lon), distances, 'Miles', 'BENCHMARK')
+        return rings, rings.toFeatureClass(r'in_memory\Benchmark_Risk_Radii')
+    (rings, risk_radii), seconds['risk_radii'] = timed(riskRadii)
+    status, seconds['floodplain'] = timed(floodplainIndex.footprintFloodplainStatus, rings.x, rings.y, building_footprints, floodplains)
+    nested, seconds['population'] = timed(populationEstimate.estimateRingPopulations, risk_radii, 'in_memory', nested_rings=True, single_pass=True, keep_block_outputs=False, use_cache=True)
+    each_ring, seconds['population_each_ring'] = timed(populationEstimate.estimateRingPopulations, risk_radii, 'in_memory', nested_rings=False, single_pass=True, keep_block_outputs=False, use_cache=True)
+    streamed, seconds['population_streaming'] = timed(populationEstimate.estimateRingPopulations, risk_radii, 'in_memory', nested_rings=True, single_pass=True, keep_block_outputs=False, use_cache=True, streaming=True)
+    surface_estimates, seconds['population_surface'] = timed(surface.estimateRings, rings)
+    results, seconds['vulnerable_facilities'] = timed(proximityAnalysis.findFacilitiesWithinRiskRadii, layer_names, rings, snapshots)
+    measures, seconds['ring_measures'] = timed(ringMeasures.measureFeatures, results, rings, snapshots)
+    # both population methods must agree
+    if sorted(nested) != sorted(each_ring):
+        raise AssertionError('Population estimates differ between nested and separate clips: {} {}'.format(nested, each_ring))
+    if sorted(nested) != sorted(streamed):
+        raise AssertionError('Population estimates differ between clipping at once and in batches: {} {}'.format(nested, streamed))
+    arcpyStandIn.Delete_management(risk_radii)
+    differences = [abs(surface_ring[2] - block_ring[2]) * 100.0 / max(block_ring[2], 1) for surface_ring, block_ring in zip(surface_estimates, sorted(nested))]
+    return seconds, max(differences) if differences else 0.0
+
+def summarize(stage, ring_count, seconds):
+    """Return latency and throughput for a list of timings"""
+    milliseconds = numpy.array(seconds) * 1000.0
+    return {
+        'stage': stage,
+        'rings': ring_count,
+        'sites': len(seconds),
+        'mean_ms': round(float(milliseconds.mean()), 3),
+        'p50_ms': round(float(numpy.percentile(milliseconds, 50)), 3),
+        'p95_ms': round(float(numpy.percentile(milliseconds, 95)), 3),
+        'max_ms': round(float(milliseconds.max()), 3),
+        'throughput_per_second': round(len(seconds) / max(sum(seconds), 1e-9), 2)
+    }
+
+def runBenchmarks(counties=1, scale=1.0, sites=20, ring_counts=(1, 3, 5), max_distance=2.0, seed=2019):
+    """Run the benchmarks and return the results as a dictionary"""
+    arcpyStandIn.reset()
+    # forget snapshots and flags loaded by an earlier run in this process
+    dataCache.loaded_snapshots.clear()
+    floodplainIndex.loaded_flags.clear()
+    generalizedGeometry.loaded_tiers.clear()
+    populationSurface.loaded_surfaces.clear()
+    cache_folder = tempfile.mkdtemp(prefix='sara_benchmark_')
+    spatialIndex.cache_dir = cache_folder
+    try:
+        towns, snapshots, surface, setup, counts = runSetup(counties, scale, seed)
+        layer_names = [layer[1] for layer in vulnerableFacilities.vulnerable_layers]
+        locations = syntheticData.siteLocations(towns, sites, seed)
+        results = []
+        surface_difference = 0.0
+        for ring_count in ring_counts:
+            distances = ringDistances(ring_count, max_distance)
+            timings = dict((stage, []) for stage in stage_names)
+            for x, y in locations.tolist():
+                site_seconds, difference = runSite(x, y, distances, snapshots, surface, layer_names)
+                surface_difference = max(surface_difference, difference)
+                for stage, seconds in site_seconds.items():
+                    timings[stage].append(seconds)
+            # end for
+            results.extend([summarize(stage, ring_count, timings[stage]) for stage in stage_names])
+        # end for
+    finally:
+        shutil.rmtree(cache_folder, ignore_errors=True)
+    return {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'config': {'counties': counties, 'scale': scale, 'sites': sites, 'rings': list(ring_counts), 'max_distance_miles': max_distance, 'seed': seed},
+        'feature_counts': counts,
+        'setup_seconds': dict((step, round(seconds, 3)) for step, seconds in setup.items()),
+        'surface_max_difference_percent': round(surface_difference, 2),
+        'results': results
+    }
+
+def printReport(report, previous=None):
+    """Print the benchmark results, with the change from an earlier run when provided"""
+    print('\nSARA benchmarks - {} counties, {} sites'.format(report['config']['counties'], report['config']['sites']))
+    print('\nFeatures: ' + ', '.join('{} {}'.format(name, count) for name, count in sorted(report['feature_counts'].items())))
+    print('\nSet up (seconds): ' + ', '.join('{} {}'.format(step, seconds) for step, seconds in sorted(report['setup_seconds'].items())))
+    if 'surface_max_difference_percent' in report:
+        print('\nLargest population surface difference from the Census block estimate: {}%'.format(report['surface_max_difference_percent']))
+    earlier = {}
+    if previous:
+        earlier = dict(((result['stage'], result['rings']), result) for result in previous['results'])
+        if previous['config'] != report['config']:
+            print('\nWarning: the earlier run used different settings {}'.format(previous['config']))
+    header = '{:<24}{:>6}{:>12}{:>12}{:>12}{:>12}{:>14}'.format('stage', 'rings', 'mean ms', 'p50 ms', 'p95 ms', 'max ms', 'sites/second')
+    if earlier:
+        header += '{:>12}'.format('speedup')
+    print('\n' + header)
+    for result in report['results']:
+        line = '{:<24}{:>6}{:>12}{:>12}{:>12}{:>12}{:>14}'.format(result['stage'], result['rings'], result['mean_ms'], result['p50_ms'], result['p95_ms'], result['max_ms'], result['throughput_per_second'])
+        before = earlier.get((result['stage'], result['rings']))
+        if before and result['mean_ms'] > 0:
+            line += '{:>11}x'.format(round(before['mean_ms'] / result['mean_ms'], 2))
+        print(line)
+    # end for
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the SARA analysis modules against synthetic data')
+    parser.add_argument('--counties', type=int, default=1, help='number of synthetic counties')
+    parser.add_argument('--state', action='store_true', help='synthetic data for the whole state ({} counties)'.format(syntheticData.state_counties))
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the number of features in each county')
+    parser.add_argument('--sites', type=int, default=20, help='number of SARA facilities to run')
+    parser.add_argument('--rings', default='1,3,5', help='comma separated numbers of risk radii')
+    parser.add_argument('--max-distance', type=float, default=2.0, help='largest risk radius (miles)')
+    parser.add_argument('--seed', type=int, default=2019, help='random seed for the synthetic data')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    parser.add_argument('--compare', help='JSON file from an earlier run to compare against')
+    parser.add_argument('--verbose', action='store_true', help='print the geoprocessing messages')
+    args = parser.parse_args()
+
+    arcpyStandIn.verbose = args.verbose
+    counties = syntheticData.state_counties if args.state else args.counties
+    ring_counts = [int(count) for count in args.rings.split(',') if count.strip()]
+    report = runBenchmarks(counties, args.scale, args.sites, ring_counts, args.max_distance, args.seed)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    printReport(report, previous)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('\nResults saved to {}'.format(args.output))
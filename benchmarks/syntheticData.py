@@ -0,0 +1,181 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Synthetic Reference Data for Benchmarks
+#
+# Purpose:     Create Census blocks, building footprints, floodplains, and vulnerable facility layers for any number of counties, so the
+#              SARA analysis modules can be timed from a single county up to the whole state.
+#
+# Summary:     Counties are squares laid out in a grid in PA State Plane South (feet).  Each county has a grid of Census blocks, towns
+#              with building footprints clustered around them, floodplain strips, point facility layers, stream and pipeline lines, and
+#              municipality polygons.  Population and building density fall off with distance from each town.  The same seed always
+#              creates the same data.
+#
+#              The datasets are added to the benchmark arcpy stand-in (arcpyStandIn.py) under the names used in C:\GIS\Geodata.gdb.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import math, numpy, arcpyStandIn
+
+# width of a county (feet)
+county_size = 150000.0
+# south west corner of the grid of counties (feet)
+origin = (1800000.0, 150000.0)
+# number of counties in Pennsylvania
+state_counties = 67
+
+# features in each county
+county_density = {
+    'census_block_rows': 70,
+    'towns': 8,
+    'footprints': 60000,
+    'floodplains': 40,
+    'streams': 400,
+    'pipelines': 30,
+    'municipalities': 30
+}
+
+# point facility layers and the number of facilities in each county
+point_layers = {
+    'EOC_AssistedLiving': 25,
+    'EOC_Daycare': 120,
+    'Site_HealthMedical': 90,
+    'EOC_MHIDD_Facility': 30,
+    'Site_Education': 80,
+    'EOC_PublicShelters': 40,
+    'EOC_SARA': 150,
+    'Site_EmergencyResponseLawEnforcement': 45
+}
+
+def rectangle(xmin, ymin, xmax, ymax):
+    """Return a closed clockwise rectangle ring"""
+    return [(xmin, ymin), (xmin, ymax), (xmax, ymax), (xmax, ymin), (xmin, ymin)]
+
+def countyOrigins(counties):
+    """Return the south west corner of each county"""
+    columns = int(math.ceil(math.sqrt(counties)))
+    return [(origin[0] + (county % columns) * county_size, origin[1] + (county // columns) * county_size) for county in range(counties)]
+
+def townCenters(random, county_origin, towns):
+    """Return the centre of each town in a county, away from the county edge"""
+    x = county_origin[0] + random.uniform(0.15, 0.85, towns) * county_size
+    y = county_origin[1] + random.uniform(0.15, 0.85, towns) * county_size
+    return numpy.column_stack([x, y])
+
+def nearTowns(random, towns, count, spread):
+    """Return points scattered around the towns of a county"""
+    town_index = random.randint(0, len(towns), count)
+    return towns[town_index] + random.normal(0, spread, (count, 2))
+
+def addCensusBlocks(dataset, random, county_origin, towns, density):
+    rows = density['census_block_rows']
+    size = county_size / rows
+    for row in range(rows):
+        for column in range(rows):
+            xmin = county_origin[0] + column * size
+            ymin = county_origin[1] + row * size
+            # more people in blocks close to a town
+            distance = numpy.hypot(towns[:, 0] - (xmin + size / 2), towns[:, 1] - (ymin + size / 2)).min()
+            population = int(random.poisson(400 * math.exp(-distance / 12000.0) + 5))
+            dataset.insert(arcpyStandIn.Geometry('Polygon', [rectangle(xmin, ymin, xmin + size, ymin + size)]),
+                           {'POP10': population, 'HOUSING10': int(population / 2.5), 'ORAREA': size * size})
+        # end for
+    # end for
+
+def addFootprints(dataset, random, towns, density):
+    centers = nearTowns(random, towns, density['footprints'], 9000.0)
+    sizes = random.uniform(30, 120, (len(centers), 2))
+    for (x, y), (width, height) in zip(centers.tolist(), sizes.tolist()):
+        dataset.insert(arcpyStandIn.Geometry('Polygon', [rectangle(x - width / 2, y - height / 2, x + width / 2, y + height / 2)]))
+    # end for
+
+def addFloodplains(dataset, random, towns, density):
+    # floodplain strips run through and near the towns
+    centers = nearTowns(random, towns, density['floodplains'], 6000.0)
+    for x, y in centers.tolist():
+        length = random.uniform(5000, 30000)
+        width = random.uniform(500, 2000)
+        if random.rand() < 0.5:
+            ring = rectangle(x - length / 2, y - width / 2, x + length / 2, y + width / 2)
+        else:
+            ring = rectangle(x - width / 2, y - length / 2, x + width / 2, y + length / 2)
+        dataset.insert(arcpyStandIn.Geometry('Polygon', [ring]), {'FLD_ZONE': ['A', 'AE', 'X500'][random.randint(0, 3)]})
+    # end for
+
+def addLines(dataset, random, county_origin, count, vertices, step):
+    """Add lines that wander across a county"""
+    for line in range(count):
+        start = numpy.array(county_origin) + random.uniform(0, county_size, 2)
+        heading = random.uniform(0, 2 * math.pi)
+        headings = heading + numpy.cumsum(random.normal(0, 0.3, vertices - 1))
+        offsets = numpy.cumsum(numpy.column_stack([numpy.cos(headings), numpy.sin(headings)]) * step, axis=0)
+        points = numpy.vstack([start, start + offsets])
+        dataset.insert(arcpyStandIn.Geometry('Polyline', [[tuple(point) for point in points.tolist()]]))
+    # end for
+
+def addMunicipalities(dataset, county_origin, density):
+    columns = int(math.ceil(math.sqrt(density['municipalities'])))
+    size = county_size / columns
+    for municipality in range(density['municipalities']):
+        xmin = county_origin[0] + (municipality % columns) * size
+        ymin = county_origin[1] + (municipality // columns) * size
+        dataset.insert(arcpyStandIn.Geometry('Polygon', [rectangle(xmin, ymin, xmin + size, ymin + size)]))
+    # end for
+
+def createDatasets(counties=1, seed=2019, scale=1.0):
+    """Create the synthetic reference layers in the arcpy stand-in and return the town centres (to place SARA facilities near)
+
+       counties = number of counties (67 for the whole state)
+       scale = multiplier for the number of features in each county
+    """
+    random = numpy.random.RandomState(seed)
+    density = dict((key, max(1, int(round(value * (scale if key != 'census_block_rows' else math.sqrt(scale)))))) for key, value in county_density.items())
+    spatial_reference = arcpyStandIn.SpatialReference(2272)
+    def dataset(name, shape_type, fields=()):
+        arcpyStandIn.datasets[name] = arcpyStandIn.Dataset(name, shape_type, fields, spatial_reference)
+        return arcpyStandIn.datasets[name]
+    census_blocks = dataset('Regional_Census2010_Blocks_SPS', 'Polygon', [('POP10', 'Integer'), ('HOUSING10', 'Integer'), ('ORAREA', 'Double')])
+    footprints = dataset('Building_Footprints_2008', 'Polygon')
+    floodplains = dataset('FEMA_Floodplains_2009', 'Polygon', [('FLD_ZONE', 'String')])
+    points = dict((name, dataset(name, 'Point', [('FCode', 'Integer')])) for name in point_layers)
+    streams = dataset('NHD_Streams', 'Polyline')
+    pipelines = dataset('NPMS_Pipelines', 'Polyline')
+    municipalities = dataset('Pennsylvania_Municipalities', 'Polygon')
+    county_polygons = dataset('Pennsylvania_Counties', 'Polygon')
+
+    all_towns = []
+    for county_origin in countyOrigins(counties):
+        towns = townCenters(random, county_origin, density['towns'])
+        all_towns.append(towns)
+        addCensusBlocks(census_blocks, random, county_origin, towns, density)
+        addFootprints(footprints, random, towns, density)
+        addFloodplains(floodplains, random, towns, density)
+        for name, count in sorted(point_layers.items()):
+            for x, y in nearTowns(random, towns, max(1, int(count * scale)), 12000.0).tolist():
+                # a few health and medical sites have the FCode excluded in vulnerableFacilities.py
+                points[name].insert(arcpyStandIn.Geometry('Point', [[(x, y)]]), {'FCode': 80026 if random.rand() < 0.1 else 80000})
+        # end for
+        addLines(streams, random, county_origin, density['streams'], 12, 800.0)
+        addLines(pipelines, random, county_origin, density['pipelines'], 40, 2500.0)
+        addMunicipalities(municipalities, county_origin, density)
+        county_polygons.insert(arcpyStandIn.Geometry('Polygon', [rectangle(county_origin[0], county_origin[1], county_origin[0] + county_size, county_origin[1] + county_size)]))
+    # end for
+    return numpy.vstack(all_towns)
+
+def siteLocations(towns, count, seed=2019):
+    """Return SARA facility locations (x, y in feet) near the towns"""
+    random = numpy.random.RandomState(seed + 1)
+    return nearTowns(random, towns, count, 4000.0)
@@ -0,0 +1,285 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Change Detection
+#
+# Purpose:     After the reference data in C:\GIS\Geodata.gdb is updated, find the SARA reports the changes reach and run only those again,
+#              rather than running every facility.
+#
+# Summary:     A manifest of each reference layer is kept in the cache folder, holding the OBJECTID, a hash of the geometry and attributes,
+#              and the envelope of every feature.  Each update reads the layers again and compares them with the manifests by OBJECTID to
+#              find the features that were added, removed, or changed.  The envelopes of those features (before and after the change) are
+#              compared with the most recent run of each SARA facility in the results database (resultsDatabase.py):
+#
+#              Census blocks                      population              within the largest risk radius
+#              building footprints, floodplains   floodplain              near the SARA facility (site_margin)
+#              vulnerable facility layers         vulnerable_facilities   within the largest risk radius
+#
+#              The saved population estimates and vulnerable facility distances (resultsCache.py) that no change reaches are carried forward
+#              to the new version of the data.  The reports the changes reach are listed in SARA_Stale_Reports_<date>.csv and updated
+#              in the project folder of their last run (batchReport.py).  Only the stages the changes reach, and the stages using their
+#              results, are run again.  The other stages use the results saved in the run manifest (stageScheduler.py).  Reports whose
+#              project folder no longer exists are run again in full.  Reports that fail are kept in the state file and run again by the
+#              next update.  Listing the stale reports without running them leaves the manifests as they were.  The first run records the
+#              manifests.
+#
+#              Usage:  python changeDetection.py <output folder> [workers] [quick maps true/false] [list only true/false]
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, csv, datetime, hashlib, numpy, errorLogger, spatialIndex, dataCache, resultsCache, resultsDatabase, batchReport, vulnerableFacilities, csvFiles
+
+# report stage fed by each reference layer, and whether a change must be within the risk radii ('rings') or near the SARA facility ('site')
+layer_stages = dict([('Regional_Census2010_Blocks_SPS', ('population', 'rings')),
+                     ('Building_Footprints_2008', ('floodplain', 'site')),
+                     ('FEMA_Floodplains_2009', ('floodplain', 'site'))] +
+                    [(layer[0], ('vulnerable_facilities', 'rings')) for layer in vulnerableFacilities.vulnerable_layers])
+# distance (feet) from a SARA facility that a building footprint or floodplain change is checked to
+site_margin = 1000.0
+# field types that are not part of the feature hash
+skip_field_types = ['OID', 'Geometry', 'Blob', 'Raster']
+# fields calculated from the geometry
+skip_fields = ['SHAPE_LENGTH', 'SHAPE_AREA']
+# fields written to the stale reports file
+stale_fields = ['PATTS', 'NAME', 'RUN_ID', 'STAGES', 'CHANGED_LAYERS', 'LAST_OUTPUT_DIR']
+
+def changesFolder():
+    """Return the folder holding the layer manifests"""
+    return os.path.join(spatialIndex.cache_dir, 'Changes')
+
+def featureHash(shape, shape_type, values):
+    """Return a 64-bit hash of a feature's geometry and attribute values"""
+    if shape is None:
+        geometry = u'None'
+    elif shape_type == 'Point':
+        geometry = u'{:.6f},{:.6f}'.format(shape.firstPoint.X, shape.firstPoint.Y)
+    else:
+        geometry = u';'.join(u' '.join(u'{:.6f},{:.6f}'.format(x, y) for x, y in ring) for ring in dataCache.ringsFromShape(shape))
+    attributes = u'|'.join(u'{}'.format(value) for value in values)
+    return int(hashlib.md5(u'{}#{}'.format(geometry, attributes).encode('utf-8')).hexdigest()[:16], 16)
+
+def layerManifest(feature_class):
+    """Read a layer and return arrays of the OBJECTID, hash, and envelope of every feature"""
+    arcpy.AddMessage('\nReading {}'.format(feature_class))
+    shape_type = arcpy.Describe(feature_class).shapeType
+    fields = [field.name for field in arcpy.ListFields(feature_class) if field.type not in skip_field_types and field.name.upper() not in skip_fields]
+    oids = []
+    hashes = []
+    envelopes = []
+    with arcpy.da.SearchCursor(feature_class, ['OID@', 'SHAPE@'] + fields) as cursor:
+        for row in cursor:
+            oids.append(row[0])
+            hashes.append(featureHash(row[1], shape_type, row[2:]))
+            if row[1] is None:
+                envelopes.append((numpy.nan, numpy.nan, numpy.nan, numpy.nan))
+            else:
+                extent = row[1].extent
+                envelopes.append((extent.XMin, extent.YMin, extent.XMax, extent.YMax))
+        # end for
+    # end cursor
+    return {'OID': numpy.asarray(oids, dtype='int64'), 'HASH': numpy.asarray(hashes, dtype='uint64'),
+            'ENVELOPE': numpy.reshape(numpy.asarray(envelopes, dtype='float64'), (-1, 4))}
+
+def loadManifest(feature_class):
+    """Return the saved manifest of a layer, or None"""
+    manifest_file = os.path.join(changesFolder(), '{}.npz'.format(os.path.basename(feature_class)))
+    if not os.path.exists(manifest_file):
+        return None
+    with numpy.load(manifest_file) as saved:
+        return dict((name, saved[name]) for name in ['OID', 'HASH', 'ENVELOPE'])
+
+def saveManifest(feature_class, manifest):
+    """Save the manifest of a layer, so other processes never read a partial file"""
+    if not os.path.exists(changesFolder()):
+        os.makedirs(changesFolder())
+    manifest_file = os.path.join(changesFolder(), '{}.npz'.format(os.path.basename(feature_class)))
+    temp_file = '{}.{}.tmp'.format(manifest_file, os.getpid())
+    with open(temp_file, 'wb') as f:
+        numpy.savez(f, **manifest)
+    if os.path.exists(manifest_file):
+        os.remove(manifest_file)
+    os.rename(temp_file, manifest_file)
+
+def diffManifests(previous, current):
+    """Compare two manifests of a layer by OBJECTID and return the number of features added, removed, and changed, and the envelopes
+       of those features (before and after each change)"""
+    order = numpy.argsort(previous['OID'], kind='mergesort')
+    previous_oids = previous['OID'][order]
+    if len(previous_oids):
+        positions = numpy.minimum(numpy.searchsorted(previous_oids, current['OID']), len(previous_oids) - 1)
+        matches = order[positions]
+        found = previous_oids[positions] == current['OID']
+    else:
+        matches = numpy.zeros(len(current['OID']), dtype='int64')
+        found = numpy.zeros(len(current['OID']), dtype=bool)
+    added = ~found
+    changed = found & (previous['HASH'][matches] != current['HASH'])
+    removed = numpy.ones(len(previous['OID']), dtype=bool)
+    removed[matches[found]] = False
+    envelopes = numpy.vstack([current['ENVELOPE'][added | changed], previous['ENVELOPE'][matches[changed]], previous['ENVELOPE'][removed]])
+    return int(added.sum()), int(removed.sum()), int(changed.sum()), envelopes
+
+def envelopesNear(envelopes, x, y, distance):
+    """Return True if any envelope is within a distance of a point"""
+    if not len(envelopes):
+        return False
+    dx = numpy.maximum(numpy.maximum(envelopes[:, 0] - x, x - envelopes[:, 2]), 0.0)
+    dy = numpy.maximum(numpy.maximum(envelopes[:, 1] - y, y - envelopes[:, 3]), 0.0)
+    return bool((numpy.hypot(dx, dy) <= distance).any())
+
+def staleStages(run, changes):
+    """Return the report stages and the changed layers that reach a run of a SARA facility (resultsDatabase.latestRuns)"""
+    stages = set()
+    changed_layers = []
+    for feature_class, envelopes in changes.items():
+        stage, reach = layer_stages[feature_class]
+        distance = run['radius_feet'] if reach == 'rings' else site_margin
+        if envelopesNear(envelopes, run['x'], run['y'], distance):
+            stages.add(stage)
+            changed_layers.append(feature_class)
+    # end for
+    return sorted(stages), sorted(changed_layers)
+
+def writeStaleReports(stale, stale_file):
+    """Write the SARA facilities the changes reach, and the stages run again for each, to a csv file"""
+    with csvFiles.openCsvFile(stale_file, 'w') as f:
+        writer = csv.DictWriter(f, stale_fields)
+        writer.writeheader()
+        for run, stages, changed_layers in stale:
+            writer.writerow({'PATTS': run['patts'], 'NAME': run['name'], 'RUN_ID': run['run_id'], 'STAGES': ';'.join(stages),
+                             'CHANGED_LAYERS': ';'.join(changed_layers), 'LAST_OUTPUT_DIR': run['output_dir']})
+        # end for
+    return stale_file
+
+def failedFacilities(summary_file):
+    """Return the PATTS IDs of the facilities that did not complete in a batch summary (batchReport.py)"""
+    with csvFiles.openCsvFile(summary_file, 'r') as f:
+        return [row['PATTS'] for row in csv.DictReader(f) if row['STATUS'] != 'Completed']
+
+def updateReports(output_dir, workers=None, native_map=False, list_only=False, database=None):
+    """Find the SARA reports reached by changes to the reference data since the last update, and run them again
+
+       output_dir = folder for the stale reports file, the batch summary, and reports whose last project folder no longer exists (batchReport.py)
+       native_map = draw the maps without the map document template (mapRenderer.py)
+       list_only = only list the stale reports.  The manifests are not updated, so the next update lists the same reports.
+       database = results database (resultsDatabase.database_file by default)
+    Returns the stale reports file, or None when the manifests are recorded for the first time or nothing changed.
+    """
+    geodata_gdb = resultsCache.geodata_gdb
+    state_file = os.path.join(changesFolder(), 'state.json')
+    state = resultsCache.readJson(state_file, None)
+    current_version = resultsCache.dataVersion()
+    # stale reports that failed to run again in an earlier update, by PATTS ID
+    pending = state.get('pending', {}) if state else {}
+    data_changed = not state or state['data_version'] != current_version
+    if not data_changed and not pending:
+        arcpy.AddMessage('\nThe reference data has not changed since {}'.format(state['updated']))
+        return None
+
+    # compare each layer with its manifest
+    manifests = {}
+    changes = {}
+    for feature_class in layer_stages if data_changed else []:
+        manifest = layerManifest(os.path.join(geodata_gdb, feature_class))
+        manifests[feature_class] = manifest
+        previous = loadManifest(feature_class)
+        if previous is None:
+            continue
+        added, removed, changed, envelopes = diffManifests(previous, manifest)
+        if len(envelopes):
+            changes[feature_class] = envelopes
+            arcpy.AddMessage('\n{}: {} added, {} removed, {} changed'.format(feature_class, added, removed, changed))
+    # end for
+
+    stale_file = None
+    stale = []
+    if state:
+        runs = resultsDatabase.latestRuns(database)
+        for run in runs:
+            stages, changed_layers = staleStages(run, changes)
+            # add the stages of a report that failed to run again in an earlier update
+            earlier = pending.get(str(run['patts']))
+            if earlier:
+                stages = sorted(set(stages) | set(earlier['stages']))
+                changed_layers = sorted(set(changed_layers) | set(earlier['changed_layers']))
+            if stages:
+                stale.append((run, stages, changed_layers))
+            # keep the saved results no change reaches
+            if data_changed:
+                resultsCache.carryForwardResults(run['latitude'], run['longitude'], state['data_version'], 'population' not in stages,
+                                                 'vulnerable_facilities' not in stages, run['radius_feet'])
+        # end for
+        stale_file = writeStaleReports(stale, os.path.join(output_dir, 'SARA_Stale_Reports_{}.csv'.format(datetime.date.today().strftime("%Y-%m-%d"))))
+        arcpy.AddMessage('\n{} of {} SARA reports are reached by the changes.  The list is written to {}'.format(len(stale), len(runs), stale_file))
+        # the manifests are kept as they are, so the next update finds the same changes
+        if stale and list_only:
+            return stale_file
+        pending = {}
+        if stale:
+            facilities = []
+            for run, stages, changed_layers in stale:
+                facilities.append({'NAME': run['name'], 'ADDRESS': run['address'], 'PATTS': run['patts'], 'CHEMICAL': run['chemical'],
+                                   'LATITUDE': run['latitude'], 'LONGITUDE': run['longitude'],
+                                   'DISTANCES': ';'.join('{:g}'.format(distance) for distance in run['distances']), 'UNITS': run['units']})
+                # update the last run, running only the stages the changes reach
+                if run['output_dir'] and os.path.isdir(run['output_dir']):
+                    facilities[-1]['PROJECT_DIR'] = run['output_dir']
+                    facilities[-1]['RERUN_STAGES'] = stages
+            # end for
+            summary_file = batchReport.runFacilities(facilities, output_dir, workers, native_map)
+            # reports that failed are listed again by the next update
+            failed = set(failedFacilities(summary_file))
+            for run, stages, changed_layers in stale:
+                if str(run['patts']) in failed:
+                    pending[str(run['patts'])] = {'stages': stages, 'changed_layers': changed_layers}
+            # end for
+            if pending:
+                arcpy.AddWarning('\n{} stale SARA reports failed and will be run again by the next update'.format(len(pending)))
+    else:
+        arcpy.AddMessage('\nRecorded the reference data manifests.  Reports will be compared against this version of the data from the next update.')
+
+    # the current data becomes the version the next update is compared with
+    for feature_class, manifest in manifests.items():
+        saveManifest(feature_class, manifest)
+    # end for
+    resultsCache.writeJson(state_file, {'data_version': current_version, 'updated': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                        'pending': pending})
+    return stale_file
+
+if __name__ == '__main__':
+    try:
+        # User entered variables from ArcGIS tool
+        # Output directory for the stale reports file and reports - folder
+        output_dir = arcpy.GetParameterAsText(0)
+        # Number of worker processes - long, optional
+        workers = arcpy.GetParameterAsText(1)
+        # Draw the maps without the map document template - boolean, optional
+        native_map = arcpy.GetParameterAsText(2).lower() == 'true'
+        # Only list the stale reports - boolean, optional
+        list_only = arcpy.GetParameterAsText(3).lower() == 'true'
+
+        updateReports(output_dir, int(workers) if workers else None, native_map, list_only)
+    # If an error occurs running geoprocessing tool(s) capture error and write message
+    # handle error outside of Python system
+    except EnvironmentError as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # handle exception error
+    except Exception as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
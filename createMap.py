@@ -5,15 +5,18 @@
 #              facility and risk radii layers to project map.  Saves the map
 #              and exports as PNG file.
 #
+#              With native_renderer, the map is drawn directly from the risk
+#              radii (mapRenderer.py) in place of the map document template.
+#
 # Author:      Patrick McKinney
 #
 # Created:     4/25/19
 #
-# Updated:     5/30/19
+# Updated:     10/18/2026
 #-------------------------------------------------------------------------------
 
 # Import modules
-import arcpy, os, errorLogger, datetime
+import arcpy, os, errorLogger, datetime, runProfile, riskRings, mapRenderer
 
 def saveLayerFile(layer,name,out_dir):
         # create a feature layer
@@ -25,8 +28,26 @@ def saveLayerFile(layer,name,out_dir):
         # get access to layer file
         return out_layer_file
 
-def createSaraMap(sara_site, risk_radii, sara_name, sara_address, patts, chem_info, output_dir):
+@runProfile.timedStage
+def createSaraMap(sara_site, risk_radii, sara_name, sara_address, patts, chem_info, output_dir, native_renderer=False, map_formats=('pdf',), facilities=()):
+    """Create the SARA risk radius map
+
+       native_renderer = draw the map from the risk radii (mapRenderer.py) in place of the map document template
+       map_formats = any of 'pdf', 'svg', and 'png'.  Only used with native_renderer.
+       facilities = (layer name, x, y) of vulnerable facilities to draw.  Only used with native_renderer.
+    """
     try:
+        if native_renderer:
+            # risk radii as a centre point and radii
+            if isinstance(risk_radii, riskRings.RiskRings):
+                rings = risk_radii
+            else:
+                rings = riskRings.fromRiskRadiiLayer(risk_radii)
+            map_files = mapRenderer.renderSaraMap(rings, sara_name, sara_address, patts, chem_info, output_dir, map_formats, facilities)
+            # add message
+            arcpy.AddMessage('\nCreated project map {}'.format(', '.join([os.path.basename(map_file) for map_file in map_files])))
+            return map_files
+
         # create a layer file to disk for SARA Facility
         sara_lyr = saveLayerFile(sara_site,'SARA Site',output_dir)
         # create a layer file to disk for Risk Radii
@@ -144,9 +165,11 @@ def createSaraMap(sara_site, risk_radii, sara_name, sara_address, patts, chem_in
             errorLogger.PrintException(e)
     finally:
         try:
-            # delete variables to release locks on map documents (.mxd) and layer files (.lyr)
-            del mxd_template, project_mxd, sara_lyr, sara_temp, sara_symbol_file, risk_radii_lyr, risk_radii_temp, risk_radii_symbol_file
-            arcpy.AddMessage('\nReleased locks on map documents and layer files')
+            # no map documents or layer files are opened by the native renderer
+            if not native_renderer:
+                # delete variables to release locks on map documents (.mxd) and layer files (.lyr)
+                del mxd_template, project_mxd, sara_lyr, sara_temp, sara_symbol_file, risk_radii_lyr, risk_radii_temp, risk_radii_symbol_file
+                arcpy.AddMessage('\nReleased locks on map documents and layer files')
             arcpy.AddMessage('\nCompleted running tool')
         except:
             arcpy.AddWarning('\nLocks may still exist on map documents and layer files')
@@ -0,0 +1,31 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        CSV File Helper
+#
+# Purpose:     Open csv files the way the csv module expects on both ArcGIS Desktop (Python 2) and ArcGIS Pro (Python 3), for the modules
+#              that read or write csv files (batchReport.py, changeDetection.py, proximityMatrix.py, workbookWriter.py).
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import sys
+
+def openCsvFile(csv_file, mode):
+    """Open a csv file in the mode the csv module expects for this version of Python"""
+    if sys.version_info[0] < 3:
+        return open(csv_file, mode + 'b')
+    else:
+        return open(csv_file, mode, newline='')
@@ -0,0 +1,268 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Reference Data Snapshot Cache
+#
+# Purpose:     Keep a local copy of the geometry and attributes of the reference layers in C:\GIS\Geodata.gdb, so each run can read them
+#              without rebuilding feature layers.
+#
+# Summary:     A snapshot of a layer is a folder of NumPy (.npy) files in the cache folder: one file per attribute, the feature envelopes,
+#              and the feature vertices (see geometryArrays.py for the layout of lines and polygons).  The files are memory-mapped when a
+#              snapshot is loaded, so only the parts of the layer that are used are read from disk.
+#
+#              Snapshots are keyed by the source path, definition query, and fields, plus the modification time and feature count of the
+#              source (spatialIndex.dataSignature).  A snapshot is rebuilt the first time it is loaded after the source data changes.
+#
+#              Geometry is stored in PA State Plane South (feet), the coordinate system of the risk rings (riskRings.py), so distances,
+#              lengths, and areas can be measured from a snapshot directly.  Layers in another coordinate system are projected as they
+#              are read.  True curves are stored as their vertices.
+#
+#              Layers in a file geodatabase are read straight from the .gdbtable files (fileGeodatabase.py) when the definition query
+#              is made of simple comparisons and the layer is already in PA State Plane South, and with a search cursor otherwise.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, json, shutil, hashlib, numpy, spatialIndex, geometryArrays, fileGeodatabase
+
+# change when the layout of the snapshot files changes
+snapshot_version = 2
+# coordinate system of the snapshots - PA State Plane South (feet), the same as the risk rings
+snapshot_wkid = 2272
+# field types stored as whole numbers and decimal numbers
+integer_field_types = ['SmallInteger', 'Integer', 'OID']
+float_field_types = ['Single', 'Double']
+# read file geodatabases with fileGeodatabase.py rather than a search cursor
+use_gdb_reader = True
+# snapshots already loaded in this process, by snapshot folder
+loaded_snapshots = {}
+
+class LayerSnapshot(object):
+    """Memory-mapped geometry and attributes of a layer"""
+    def __init__(self, folder, metadata):
+        self.folder = folder
+        self.source = metadata['source']
+        self.where_clause = metadata['where_clause']
+        self.fields = metadata['fields']
+        self.signature = tuple(metadata['signature'])
+        self.shape_type = metadata['shape_type']
+        self.wkid = metadata['wkid']
+        self.spatial_reference_wkt = metadata.get('spatial_reference_wkt')
+        self.oids = self.loadArray('OID')
+        self.envelopes = self.loadArray('ENVELOPE')
+        if self.shape_type == 'Point':
+            self.x = self.loadArray('X')
+            self.y = self.loadArray('Y')
+        else:
+            self.xy = self.loadArray('XY')
+            self.part_offsets = self.loadArray('PART_OFFSETS')
+            self.feature_parts = self.loadArray('FEATURE_PARTS')
+        self.columns = dict((field, self.loadArray('FIELD_{}'.format(field))) for field in self.fields)
+
+    def loadArray(self, name):
+        return numpy.load(os.path.join(self.folder, '{}.npy'.format(name)), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.oids)
+
+    def queryEnvelope(self, xmin, ymin, xmax, ymax):
+        """Return the indexes of features whose envelope intersects an envelope"""
+        envelopes = self.envelopes
+        return numpy.nonzero((envelopes[:, 0] <= xmax) & (envelopes[:, 2] >= xmin) & (envelopes[:, 1] <= ymax) & (envelopes[:, 3] >= ymin))[0]
+
+    def featureGeometry(self, indexes):
+        """Return the vertex and offset arrays for a subset of line or polygon features"""
+        return geometryArrays.subsetFeatures(self.xy, self.part_offsets, self.feature_parts, indexes)
+
+    def featureDistances(self, x, y, indexes):
+        """Return the distance from a point to each of a subset of features"""
+        indexes = numpy.asarray(indexes, dtype='int64')
+        if self.shape_type == 'Point':
+            return numpy.hypot(self.x[indexes] - x, self.y[indexes] - y)
+        if len(indexes) == 0:
+            return numpy.zeros(0)
+        xy, part_offsets, feature_parts = self.featureGeometry(indexes)
+        return geometryArrays.pointFeatureDistances(x, y, xy, part_offsets, feature_parts, self.shape_type == 'Polygon')
+
+    def containingFeatures(self, x, y):
+        """Return the indexes of polygons that contain a point"""
+        indexes = self.queryEnvelope(x, y, x, y)
+        if len(indexes) == 0:
+            return indexes
+        xy, part_offsets, feature_parts = self.featureGeometry(indexes)
+        return indexes[geometryArrays.pointInPolygons(x, y, xy, part_offsets, feature_parts)]
+
+def snapshotFolder(feature_class, where_clause, fields, signature, cache_folder):
+    """Return the folder for a snapshot of a layer at a version of the source data"""
+    key = hashlib.md5('{}|{}|{}'.format(feature_class, where_clause, ','.join(fields)).encode('utf-8')).hexdigest()[:12]
+    prefix = '{}_{}'.format(os.path.basename(feature_class), key)
+    return os.path.join(cache_folder, prefix, '{}_{}'.format(*signature))
+
+def ringsFromShape(shape):
+    """Return a list of vertex lists, one for each part (or polygon ring) of a geometry"""
+    rings = []
+    for part in shape:
+        ring = []
+        for point in part:
+            # interior rings of a polygon part are separated by None
+            if point is None:
+                if ring:
+                    rings.append(ring)
+                ring = []
+            else:
+                ring.append((point.X, point.Y))
+        # end for
+        if ring:
+            rings.append(ring)
+    # end for
+    return rings
+
+def sourceWkid(feature_class):
+    """Return the WKID of the coordinate system of a feature class"""
+    return arcpy.Describe(feature_class).spatialReference.factoryCode
+
+def readLayer(feature_class, where_clause, fields):
+    """Read a layer with a search cursor, projected to the snapshot coordinate system, and return its shape type and snapshot arrays"""
+    description = arcpy.Describe(feature_class)
+    shape_type = description.shapeType
+    field_types = dict((field.name, field.type) for field in arcpy.ListFields(feature_class))
+    oids = []
+    envelopes = []
+    points = []
+    vertices = []
+    part_offsets = [0]
+    feature_parts = [0]
+    columns = dict((field, []) for field in fields)
+    with arcpy.da.SearchCursor(feature_class, ['OID@', 'SHAPE@'] + list(fields), where_clause, spatial_reference=arcpy.SpatialReference(snapshot_wkid)) as cursor:
+        for row in cursor:
+            oids.append(row[0])
+            shape = row[1]
+            if shape is None:
+                envelopes.append((numpy.nan, numpy.nan, numpy.nan, numpy.nan))
+                points.append((numpy.nan, numpy.nan))
+            else:
+                extent = shape.extent
+                envelopes.append((extent.XMin, extent.YMin, extent.XMax, extent.YMax))
+                if shape_type == 'Point':
+                    points.append((shape.firstPoint.X, shape.firstPoint.Y))
+                else:
+                    for ring in ringsFromShape(shape):
+                        vertices.extend(ring)
+                        part_offsets.append(len(vertices))
+            if shape_type != 'Point':
+                feature_parts.append(len(part_offsets) - 1)
+            for field, value in zip(fields, row[2:]):
+                columns[field].append(value)
+        # end for
+    # end cursor
+
+    arrays = {'OID': numpy.asarray(oids, dtype='int64'), 'ENVELOPE': numpy.reshape(numpy.asarray(envelopes, dtype='float64'), (-1, 4))}
+    if shape_type == 'Point':
+        point_array = numpy.reshape(numpy.asarray(points, dtype='float64'), (-1, 2))
+        arrays['X'] = point_array[:, 0]
+        arrays['Y'] = point_array[:, 1]
+    else:
+        arrays['XY'] = numpy.reshape(numpy.asarray(vertices, dtype='float64'), (-1, 2))
+        arrays['PART_OFFSETS'] = numpy.asarray(part_offsets, dtype='int64')
+        arrays['FEATURE_PARTS'] = numpy.asarray(feature_parts, dtype='int64')
+    for field in fields:
+        values = columns[field]
+        field_type = field_types.get(field)
+        if field_type in integer_field_types:
+            arrays['FIELD_{}'.format(field)] = numpy.asarray([value or 0 for value in values], dtype='int64')
+        elif field_type in float_field_types:
+            arrays['FIELD_{}'.format(field)] = numpy.asarray([numpy.nan if value is None else value for value in values], dtype='float64')
+        else:
+            arrays['FIELD_{}'.format(field)] = numpy.asarray([u'' if value is None else u'{}'.format(value) for value in values], dtype='U')
+    # end for
+    return shape_type, arrays
+
+def buildSnapshot(feature_class, folder, where_clause, fields, signature):
+    """Read a layer and save its geometry and attributes to a snapshot folder"""
+    arcpy.AddMessage('\nCreating snapshot of {}'.format(feature_class))
+    # file geodatabases are read straight from their files when the definition query is simple enough.  The reader does not project,
+    # so layers in another coordinate system are read with a search cursor
+    if use_gdb_reader and fileGeodatabase.canRead(feature_class, where_clause) and sourceWkid(feature_class) == snapshot_wkid:
+        shape_type, arrays, spatial_reference_wkt = fileGeodatabase.readFeatureClass(feature_class, fields, where_clause=where_clause)
+    else:
+        shape_type, arrays = readLayer(feature_class, where_clause, fields)
+        spatial_reference_wkt = arcpy.SpatialReference(snapshot_wkid).exportToString()
+
+    # write to a temporary folder so other processes never load a partial snapshot
+    temp_folder = '{}_{}.tmp'.format(folder, os.getpid())
+    if os.path.exists(temp_folder):
+        shutil.rmtree(temp_folder)
+    os.makedirs(temp_folder)
+    for name, values in arrays.items():
+        numpy.save(os.path.join(temp_folder, '{}.npy'.format(name)), values)
+    # end for
+    metadata = {'version': snapshot_version, 'source': feature_class, 'where_clause': where_clause, 'fields': list(fields),
+                'signature': list(signature), 'shape_type': shape_type, 'wkid': snapshot_wkid,
+                'spatial_reference_wkt': spatial_reference_wkt, 'count': len(arrays['OID'])}
+    with open(os.path.join(temp_folder, 'snapshot.json'), 'w') as f:
+        json.dump(metadata, f)
+    try:
+        os.rename(temp_folder, folder)
+    except OSError:
+        # another process finished the same snapshot first
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+def removeOldSnapshots(folder):
+    """Delete snapshots of the same layer made from earlier versions of the source data"""
+    layer_folder = os.path.dirname(folder)
+    for name in os.listdir(layer_folder):
+        old_folder = os.path.join(layer_folder, name)
+        if old_folder != folder and not name.endswith('.tmp'):
+            shutil.rmtree(old_folder, ignore_errors=True)
+
+def loadSnapshot(feature_class, fields=(), where_clause='', cache_folder=None):
+    """Load the snapshot of a layer, creating a new snapshot if there isn't one for the current version of the source data
+
+       feature_class = full path to the source feature class
+       fields = attribute fields to include
+       where_clause = definition query for the features to include
+       cache_folder = folder holding the snapshots (spatialIndex.cache_dir by default)
+    """
+    fields = list(fields)
+    if cache_folder is None:
+        cache_folder = spatialIndex.cache_dir
+    signature = spatialIndex.dataSignature(feature_class)
+    folder = snapshotFolder(feature_class, where_clause, fields, signature, cache_folder)
+    if folder in loaded_snapshots:
+        return loaded_snapshots[folder]
+    metadata_file = os.path.join(folder, 'snapshot.json')
+    metadata = None
+    if os.path.exists(metadata_file):
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+        if metadata.get('version') != snapshot_version or metadata.get('wkid') != snapshot_wkid:
+            shutil.rmtree(folder, ignore_errors=True)
+            metadata = None
+    if metadata is None:
+        try:
+            os.makedirs(os.path.dirname(folder))
+        except OSError:
+            # folder already exists
+            pass
+        buildSnapshot(feature_class, folder, where_clause, fields, signature)
+        removeOldSnapshots(folder)
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+    snapshot = LayerSnapshot(folder, metadata)
+    # forget snapshots of earlier versions of the same layer
+    for old_folder in [key for key in loaded_snapshots if os.path.dirname(key) == os.path.dirname(folder)]:
+        del loaded_snapshots[old_folder]
+    loaded_snapshots[folder] = snapshot
+    return snapshot
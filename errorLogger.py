@@ -7,7 +7,7 @@
 #
 # Created:     11/6/2017
 #
-# Updated:     11/6/2017
+# Updated:     10/18/2026
 #
 # Copyright:   (c) Cumberland County GIS 2019
 #
@@ -26,6 +26,14 @@
 # import modules
 import sys, linecache, arcpy
 
+# exit Python after reporting an error (ArcGIS tool form)
+# batch runs set this to False so a failed facility raises SaraToolError instead of ending the batch
+exit_on_error = True
+
+class SaraToolError(Exception):
+    """Raised by PrintException in place of sys.exit() when exit_on_error is False"""
+    pass
+
 # Function to handle errors
 def PrintException(error):
     exc_type, exc_obj, tb = sys.exc_info()
@@ -34,7 +42,12 @@ def PrintException(error):
     filename = f.f_code.co_filename
     linecache.checkcache(filename)
     line = linecache.getline(filename, lineno, f.f_globals)
-    arcpy.AddError('\nerror: {}\nFILE: {}, LINE: {}\n\n\t "{}": {}'.format(error, filename, lineno, line.strip(), exc_obj))
+    message = '\nerror: {}\nFILE: {}, LINE: {}\n\n\t "{}": {}'.format(error, filename, lineno, line.strip(), exc_obj)
+    arcpy.AddError(message)
     # exit Python
-    sys.exit()
+    if exit_on_error:
+        sys.exit()
+    # otherwise hand the error back to the caller
+    else:
+        raise SaraToolError(message)
 # end PrintException
\ No newline at end of file
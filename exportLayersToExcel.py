@@ -7,6 +7,8 @@
 #
 # Created:     4/12/2019
 #
+# Updated:     10/18/2026
+#
 # Copyright:   (c) Cumberland County GIS 2019
 #
 # Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THIS TOOL.
@@ -21,7 +23,7 @@
 
 #-------------------------------------------------------------------------------
 
-import arcpy, os
+import arcpy, os, spatialIndex
 
 # function to select layers by location and export selected features to an excel spreadsheet
 def selectFeaturesExportToExcel(featureLayer, intersectLayer, bufDist, bufUnits, patts, outLocation):
@@ -51,4 +53,32 @@ def selectFeaturesExportToExcel(featureLayer, intersectLayer, bufDist, bufUnits,
        arcpy.TableToExcel_conversion(featureLayer,outFile)
        # add message
        arcpy.AddMessage('\nExported features from {} layer that intersect the {}-{} buffer to a Microsoft Excel file'.format(featureLayer, bufDist, bufUnits))
-   # end if/else
\ No newline at end of file
+   # end if/else
+
+# function to export a list of features to an excel spreadsheet
+def exportFeaturesToExcel(featureLayer, oids, bufDist, bufUnits, patts, outLocation):
+    """ function to export features found by the proximity engine to an excel spreadsheet
+        featureLayer = the feature layer the features are from
+        oids = the OBJECTIDs of the features within the buffer
+        bufDist = the buffer distance
+        bufUnits = the buffer units
+        patts = PATTS ID for SARA site
+        outLocation = the folder that output datasets are placed in.  This is a user parameter in  the tools' form
+    """
+    # if no features are within the buffer, add warning message
+    if not oids:
+       # add warning message
+       arcpy.AddWarning('\nNo features from {} intersect the {}-{} buffer'.format(featureLayer,bufDist,bufUnits))
+    # if features are within the buffer, export them to excel file
+    else:
+       # select features within buffer
+       arcpy.SelectLayerByAttribute_management(featureLayer, 'NEW_SELECTION', spatialIndex.oidWhereClause(featureLayer, oids))
+       # name for excel file
+       fileName = '{} Intersect {} {} {} Buffer.xls'.format(featureLayer,patts,bufDist,bufUnits)
+       # output file
+       outFile = os.path.join(outLocation,fileName)
+       # export to excel
+       arcpy.TableToExcel_conversion(featureLayer,outFile)
+       # add message
+       arcpy.AddMessage('\nExported features from {} layer that intersect the {}-{} buffer to a Microsoft Excel file'.format(featureLayer, bufDist, bufUnits))
+   # end if/else
@@ -0,0 +1,492 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        File Geodatabase Reader
+#
+# Purpose:     Read feature classes and tables straight from the .gdbtable and .gdbtablx files of a file geodatabase, without arcpy, so the
+#              reference data snapshots (dataCache.py) can be created on any computer with Python and NumPy.
+#
+# Summary:     The files are memory-mapped and read-only.  The row offsets (.gdbtablx) and the position of every field in every row are found
+#              a field at a time for all rows together with NumPy, and only the fields asked for are decoded.  Point, polyline, and polygon
+#              shapes are decoded from all rows at once into the same arrays as a layer snapshot:
+#
+#              OID                      OBJECTID of each row
+#              ENVELOPE                 xmin, ymin, xmax, ymax of each feature
+#              X, Y                     point layers
+#              XY, PART_OFFSETS,        polyline and polygon layers - the vertices, the first vertex of each part (or polygon ring),
+#              FEATURE_PARTS            and the first part of each feature
+#              FIELD_<name>             attribute values (integers with nulls as 0, doubles with nulls as NaN, anything else as text)
+#
+#              Rows can be limited to features whose envelope intersects a bounding box, and by a where clause made of simple comparisons
+#              joined by AND (for example FCode <> 80026).  Z and M values, curves, multipoints, multipatches, and raster fields are not read.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import os, re, mmap, struct, uuid, numpy
+
+# field types in .gdbtable files, named as arcpy names them
+field_types = {0: 'SmallInteger', 1: 'Integer', 2: 'Single', 3: 'Double', 4: 'String', 5: 'Date', 6: 'OID', 7: 'Geometry',
+               8: 'Blob', 9: 'Raster', 10: 'Guid', 11: 'GlobalID', 12: 'XML'}
+# geometry types of feature classes
+geometry_types = {1: 'Point', 2: 'Multipoint', 3: 'Polyline', 4: 'Polygon', 5: 'MultiPatch'}
+# fields stored with a fixed width and their NumPy types
+fixed_width_types = {0: '<i2', 1: '<i4', 2: '<f4', 3: '<f8', 5: '<f8'}
+# shape blob types (the low byte of the first value of the blob) of polylines and polygons that carry curves
+curve_flag = 0x20000000
+# days between 1899-12-30, the first day of file geodatabase dates, and 1970-01-01
+date_epoch_days = 25569
+# comparison in a where clause, for example FCode <> 80026 or FLD_ZONE = 'AE'
+comparison_pattern = re.compile(r"^\s*(\w+)\s*(<>|!=|<=|>=|=|<|>)\s*('(?:[^']|'')*'|-?\d+(?:\.\d*)?)\s*$")
+
+class GdbField(object):
+    """Field of a .gdbtable file"""
+    def __init__(self, name, alias, field_type, nullable, width=0):
+        self.name = name
+        self.alias = alias
+        self.field_type = field_type
+        self.type = field_types.get(field_type, 'Unknown')
+        self.nullable = nullable
+        self.width = width
+
+def readVarUInt(buffer, position):
+    """Return a variable length unsigned integer from a buffer and the position after it"""
+    value = 0
+    shift = 0
+    while True:
+        byte = struct.unpack_from('<B', buffer, position)[0]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+def readUtf16(buffer, position):
+    """Return a string stored as a character count and UTF-16 characters, and the position after it"""
+    length = struct.unpack_from('<B', buffer, position)[0]
+    start = position + 1
+    return buffer[start:start + length * 2].decode('utf-16-le'), start + length * 2
+
+def varUIntArray(data, positions):
+    """Return the variable length unsigned integers starting at each position, and the number of bytes in each"""
+    index = numpy.minimum(positions[:, None] + numpy.arange(10), len(data) - 1)
+    values_bytes = data[index].astype('uint64')
+    sizes = numpy.argmax(values_bytes < 0x80, axis=1) + 1
+    values = numpy.zeros(len(positions), dtype='uint64')
+    for byte in range(10):
+        active = sizes > byte
+        if not active.any():
+            break
+        values[active] |= (values_bytes[active, byte] & numpy.uint64(0x7f)) << numpy.uint64(7 * byte)
+    # end for
+    return values, sizes
+
+def splitValues(stream, blob_ends):
+    """Return the unsigned and signed value of each variable length integer in a stream of shape blobs, and the first byte of each value"""
+    last_byte = stream < 0x80
+    # a value never runs from one blob into the next
+    last_byte[blob_ends] = True
+    value_ends = numpy.nonzero(last_byte)[0]
+    value_starts = numpy.concatenate([[0], value_ends[:-1] + 1]).astype('int64')
+    value_sizes = value_ends - value_starts + 1
+    unsigned = numpy.zeros(len(value_starts), dtype='uint64')
+    for byte in range(int(value_sizes.max()) if len(value_sizes) else 0):
+        active = value_sizes > byte
+        unsigned[active] |= (stream[value_starts[active] + byte].astype('uint64') & numpy.uint64(0x7f)) << numpy.uint64(7 * byte)
+    # end for
+    # signed values keep the sign in the 7th bit of the first byte, so each later byte is shifted one bit less
+    first_bytes = stream[value_starts].astype('uint64')
+    magnitude = (first_bytes & numpy.uint64(0x3f)) | ((unsigned >> numpy.uint64(7)) << numpy.uint64(6))
+    signed = numpy.where(first_bytes & numpy.uint64(0x40), -magnitude.astype('int64'), magnitude.astype('int64'))
+    return unsigned, signed, value_starts
+
+def parseWhereClause(where_clause):
+    """Return a list of (field, operator, value) for a where clause of comparisons joined by AND, or None if the reader can't use it"""
+    terms = []
+    for term in re.split(r'\s+AND\s+', where_clause.strip(), flags=re.IGNORECASE) if where_clause.strip() else []:
+        match = comparison_pattern.match(term)
+        if match is None:
+            return None
+        field, operator, value = match.groups()
+        if value.startswith("'"):
+            value = value[1:-1].replace("''", "'")
+        else:
+            value = float(value)
+        terms.append((field, '!=' if operator == '<>' else operator, value))
+    # end for
+    return terms
+
+def compareValues(values, operator, value):
+    """Return the result of a comparison from a where clause for an array of values"""
+    if isinstance(value, float) and values.dtype.kind not in 'iuf':
+        return numpy.zeros(len(values), dtype=bool)
+    if not isinstance(value, float):
+        values = values.astype('U')
+    return {'=': numpy.equal, '!=': numpy.not_equal, '<': numpy.less, '<=': numpy.less_equal,
+            '>': numpy.greater, '>=': numpy.greater_equal}[operator](values, value)
+
+class GdbTable(object):
+    """A table or feature class in a file geodatabase, read from its memory-mapped .gdbtable and .gdbtablx files"""
+    def __init__(self, table_file):
+        self.table_file = table_file
+        with open(table_file, 'rb') as f:
+            self.table_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = numpy.frombuffer(self.table_map, dtype='uint8')
+        self.readFields()
+        self.readRowOffsets(os.path.splitext(table_file)[0] + '.gdbtablx')
+
+    def readFields(self):
+        """Read the field descriptions from the .gdbtable header"""
+        buffer = self.table_map
+        self.valid_rows = struct.unpack_from('<i', buffer, 4)[0]
+        field_offset = struct.unpack_from('<q', buffer, 32)[0]
+        header_size, self.version, flags, field_count = struct.unpack_from('<iiIh', buffer, field_offset)
+        self.shape_type = geometry_types.get(flags & 0xff)
+        self.geometry_field = None
+        # coordinate system of the geometry field as well-known text (None for tables)
+        self.spatial_reference_wkt = None
+        self.fields = []
+        position = field_offset + 14
+        for field_index in range(field_count):
+            name, position = readUtf16(buffer, position)
+            alias, position = readUtf16(buffer, position)
+            field_type = struct.unpack_from('<B', buffer, position)[0]
+            position += 1
+            width = 0
+            if field_type == 6:
+                width, flag = struct.unpack_from('<BB', buffer, position)
+                position += 2
+            elif field_type == 4:
+                width, flag = struct.unpack_from('<iB', buffer, position)
+                default_length, position = readVarUInt(buffer, position + 5)
+                position += default_length
+            elif field_type in fixed_width_types:
+                width, flag, default_length = struct.unpack_from('<BBB', buffer, position)
+                position += 3 + default_length
+            elif field_type == 7:
+                position, flag = self.readGeometryField(buffer, position)
+            elif field_type in (8, 10, 11, 12):
+                width, flag = struct.unpack_from('<BB', buffer, position)
+                position += 2
+            else:
+                raise ValueError('{} has a {} field ({}), which the reader does not support'.format(self.table_file, field_types.get(field_type, field_type), name))
+            field = GdbField(name, alias, field_type, bool(flag & 1), width)
+            if field_type == 7:
+                self.geometry_field = field
+            self.fields.append(field)
+        # end for
+
+    def readGeometryField(self, buffer, position):
+        """Read the spatial reference and coordinate precision of the geometry field, and return the position after it and its flags"""
+        flag = struct.unpack_from('<B', buffer, position + 1)[0]
+        wkt_length = struct.unpack_from('<H', buffer, position + 2)[0]
+        position += 4
+        self.spatial_reference_wkt = buffer[position:position + wkt_length].decode('utf-16-le')
+        position += wkt_length
+        geometry_flags = struct.unpack_from('<B', buffer, position)[0]
+        position += 1
+        has_m = bool(geometry_flags & 2)
+        has_z = bool(geometry_flags & 4)
+        self.xorigin, self.yorigin, self.xyscale = struct.unpack_from('<3d', buffer, position)
+        # M and Z origins and scales, and the x/y, M, and Z tolerances
+        position += 24 + (16 if has_m else 0) + (16 if has_z else 0) + 8 + (8 if has_m else 0) + (8 if has_z else 0)
+        self.extent = struct.unpack_from('<4d', buffer, position)
+        position += 32
+        # optional Z and M ranges come before the spatial index grid sizes
+        while True:
+            marker = struct.unpack_from('<BI', buffer, position)
+            if marker[0] == 0 and 1 <= marker[1] <= 3:
+                return position + 5 + 8 * marker[1], flag
+            position += 8
+
+    def readRowOffsets(self, tablx_file):
+        """Read the position of each row in the .gdbtable file from the .gdbtablx file"""
+        with open(tablx_file, 'rb') as f:
+            tablx = f.read()
+        block_count, row_count, offset_size = struct.unpack_from('<3i', tablx, 4)
+        raw = numpy.frombuffer(tablx, dtype='uint8', count=block_count * 1024 * offset_size, offset=16).reshape(-1, offset_size)
+        offsets = numpy.zeros(len(raw), dtype='int64')
+        for byte in range(offset_size):
+            offsets |= raw[:, byte].astype('int64') << (8 * byte)
+        # end for
+        row_ids = numpy.arange(1, len(offsets) + 1, dtype='int64')
+        # tables with gaps in their OBJECTIDs only keep the blocks of 1024 rows that hold rows
+        trailer = 16 + block_count * 1024 * offset_size
+        if len(tablx) >= trailer + 16:
+            bitmap_words = struct.unpack_from('<i', tablx, trailer)[0]
+            if bitmap_words:
+                bitmap = numpy.frombuffer(tablx, dtype='<u4', count=bitmap_words, offset=trailer + 16)
+                blocks = numpy.nonzero(((bitmap[:, None] >> numpy.arange(32, dtype='uint32')) & 1).ravel())[0]
+                row_ids = (numpy.repeat(blocks * 1024, 1024) + numpy.tile(numpy.arange(1024), len(blocks)) + 1)[:len(offsets)]
+        # deleted rows have no offset
+        present = offsets > 0
+        self.row_offsets = offsets[present]
+        self.oids = row_ids[present]
+
+    def __len__(self):
+        return len(self.oids)
+
+    def close(self):
+        self.data = None
+        self.table_map.close()
+
+    def findField(self, name):
+        """Return the field with a name (not case sensitive)"""
+        for field in self.fields:
+            if field.name.upper() == name.upper():
+                return field
+        # end for
+        raise ValueError('{} has no field named {}'.format(self.table_file, name))
+
+    def fieldLayout(self, last_field):
+        """Return the rows holding a value, and the first byte and length of each value, of every field up to and including a field"""
+        null_bytes = (len([field for field in self.fields if field.nullable and field.field_type != 6]) + 7) // 8
+        positions = self.row_offsets + 4 + null_bytes
+        nullable_index = 0
+        layout = {}
+        for field in self.fields:
+            if field.field_type == 6:
+                continue
+            if field.nullable:
+                null_flags = self.data[self.row_offsets + 4 + nullable_index // 8]
+                present = ((null_flags >> (nullable_index % 8)) & 1) == 0
+                nullable_index += 1
+            else:
+                present = numpy.ones(len(positions), dtype=bool)
+            starts = positions[present]
+            if field.field_type in fixed_width_types:
+                lengths = numpy.full(len(starts), numpy.dtype(fixed_width_types[field.field_type]).itemsize, dtype='int64')
+            elif field.field_type in (10, 11):
+                lengths = numpy.full(len(starts), 16, dtype='int64')
+            else:
+                # text, blobs, and shapes are stored with their length first
+                lengths, sizes = varUIntArray(self.data, starts)
+                lengths = lengths.astype('int64')
+                starts = starts + sizes
+            positions[present] = starts + lengths
+            layout[field.name] = (present, starts, lengths)
+            if field is last_field:
+                break
+        # end for
+        return layout
+
+    def fieldValues(self, field, present, starts, lengths):
+        """Decode the values of a field for a set of rows"""
+        count = len(present)
+        if field.field_type in fixed_width_types:
+            dtype = numpy.dtype(fixed_width_types[field.field_type])
+            raw = self.data[starts[:, None] + numpy.arange(dtype.itemsize)]
+            decoded = numpy.ascontiguousarray(raw).view(dtype).ravel()
+            if field.field_type == 5:
+                seconds = numpy.round((decoded - date_epoch_days) * 86400.0).astype('int64')
+                text = numpy.datetime_as_string(seconds.astype('datetime64[s]'))
+                values = numpy.full(count, u'', dtype='U19')
+                values[present] = numpy.char.replace(text, 'T', ' ')
+            elif field.field_type in (2, 3):
+                values = numpy.full(count, numpy.nan)
+                values[present] = decoded
+            else:
+                values = numpy.zeros(count, dtype='int64')
+                values[present] = decoded
+            return values
+        raw_values = [self.table_map[start:start + length] for start, length in zip(starts.tolist(), lengths.tolist())]
+        if field.field_type in (10, 11):
+            text = [u'{{{}}}'.format(uuid.UUID(bytes_le=value)).upper() for value in raw_values]
+        elif field.field_type in (4, 12):
+            text = [value.decode('utf-8') for value in raw_values]
+        else:
+            values = numpy.empty(count, dtype=object)
+            values[present] = raw_values
+            return values
+        values = numpy.full(count, u'', dtype='U{}'.format(max([len(value) for value in text] + [1])))
+        values[present] = text
+        return values
+
+    def shapeValues(self, starts, lengths):
+        """Split the shape blobs into variable length integers and return the values and the index of the first value of each blob"""
+        blob_starts = numpy.cumsum(lengths) - lengths
+        if not lengths.sum():
+            # no shapes; every value reads as 0 (empty)
+            return numpy.zeros(1, dtype='uint64'), numpy.zeros(1, dtype='int64'), numpy.zeros(len(lengths), dtype='int64')
+        index =numpy.repeat(starts - blob_starts, lengths) + numpy.arange(int(lengths.sum()))
+        stream = self.data[index]
+        unsigned, signed, value_starts = splitValues(stream, (blob_starts + lengths - 1)[lengths > 0])
+        return unsigned, signed, numpy.searchsorted(value_starts, blob_starts)
+
+    def read(self, fields=(), bbox=None, where_clause=''):
+        """Return the arrays of a layer snapshot for the rows of the table
+
+           fields = attribute fields to include
+           bbox = (xmin, ymin, xmax, ymax) to only include features whose envelope intersects it
+           where_clause = comparisons joined by AND (parseWhereClause)
+        """
+        field_names = list(fields)
+        fields = [self.findField(name) for name in field_names]
+        terms = parseWhereClause(where_clause or '')
+        if terms is None:
+            raise ValueError('The file geodatabase reader cannot use the where clause {}'.format(where_clause))
+        term_fields = [self.findField(term[0]) for term in terms]
+        wanted = fields + term_fields + ([self.geometry_field] if self.geometry_field else [])
+        last_field = max(wanted, key=self.fields.index) if wanted else None
+        layout = self.fieldLayout(last_field) if last_field else {}
+        row_count = len(self.oids)
+        keep = numpy.ones(row_count, dtype=bool)
+
+        arrays = {}
+        if self.geometry_field is not None:
+            present, starts, lengths = layout[self.geometry_field.name]
+            unsigned, signed, first_values = self.shapeValues(starts, lengths)
+            value_count = len(unsigned)
+            def value(offsets):
+                return unsigned[numpy.minimum(offsets, value_count - 1)]
+            envelopes = numpy.full((row_count, 4), numpy.nan)
+            if self.shape_type == 'Point':
+                x_values = value(first_values + 1).astype('float64')
+                y_values = value(first_values + 2).astype('float64')
+                empty = x_values == 0
+                x = numpy.where(empty, numpy.nan, (x_values - 1) / self.xyscale + self.xorigin)
+                y = numpy.where(empty, numpy.nan, (y_values - 1) / self.xyscale + self.yorigin)
+                envelopes[present] = numpy.column_stack([x, y, x, y])
+            elif self.shape_type in ('Polyline', 'Polygon'):
+                shape_types = value(first_values)
+                point_counts = value(first_values + 1).astype('int64')
+                part_counts = numpy.where(point_counts > 0, value(first_values + 2).astype('int64'), 0)
+                header = first_values + 3 + ((shape_types & numpy.uint64(curve_flag)) > 0)
+                xmin = value(header) / self.xyscale + self.xorigin
+                ymin = value(header + 1) / self.xyscale + self.yorigin
+                xmax = value(header + 2) / self.xyscale + xmin
+                ymax = value(header + 3) / self.xyscale + ymin
+                envelopes[present] = numpy.where((point_counts > 0)[:, None], numpy.column_stack([xmin, ymin, xmax, ymax]), numpy.nan)
+            else:
+                raise ValueError('{} is a {} feature class, which the reader does not support'.format(self.table_file, self.shape_type))
+            if bbox is not None:
+                keep &= (envelopes[:, 0] <= bbox[2]) & (envelopes[:, 2] >= bbox[0]) & (envelopes[:, 1] <= bbox[3]) & (envelopes[:, 3] >= bbox[1])
+
+        # attribute values of the rows kept so far
+        def keptValues(field):
+            present, starts, lengths = layout[field.name]
+            kept_rows = keep[present]
+            return self.fieldValues(field, present[keep], starts[kept_rows], lengths[kept_rows])
+        for (name, operator, compare_value), field in zip(terms, term_fields):
+            matches = numpy.zeros(row_count, dtype=bool)
+            # a comparison with a null value is never true
+            matches[keep] = compareValues(keptValues(field), operator, compare_value) & layout[field.name][0][keep]
+            keep &= matches
+        # end for
+
+        arrays['OID'] = self.oids[keep]
+        if self.geometry_field is not None:
+            arrays['ENVELOPE'] = envelopes[keep]
+            kept_shapes = keep[present]
+            if self.shape_type == 'Point':
+                arrays['X'] = arrays['ENVELOPE'][:, 0].copy()
+                arrays['Y'] = arrays['ENVELOPE'][:, 1].copy()
+            else:
+                # parts of each feature kept; rows without a shape have none
+                feature_part_counts = numpy.zeros(row_count, dtype='int64')
+                feature_part_counts[present] = part_counts
+                feature_part_counts = feature_part_counts[keep]
+                point_counts = point_counts[kept_shapes]
+                part_counts = part_counts[kept_shapes]
+                header = header[kept_shapes]
+                # points in each part: the count of each part but the last is stored, the last part has the rest
+                part_feature = numpy.repeat(numpy.arange(len(part_counts)), part_counts)
+                part_rank = numpy.arange(len(part_feature)) - numpy.repeat(numpy.cumsum(part_counts) - part_counts, part_counts)
+                stored = part_rank < part_counts[part_feature] - 1
+                part_points = numpy.zeros(len(part_feature), dtype='int64')
+                part_points[stored] = value(header[part_feature[stored]] + 4 + part_rank[stored]).astype('int64')
+                last_parts = (numpy.cumsum(part_counts) - 1)[part_counts > 0]
+                part_points[last_parts] = point_counts[part_counts > 0] - numpy.bincount(part_feature, weights=part_points, minlength=len(part_counts))[part_counts > 0].astype('int64')
+                # x and y are stored as the change from the previous vertex of the feature
+                coordinate_starts = header + 4 + numpy.maximum(part_counts - 1, 0)
+                total_points = int(point_counts.sum())
+                point_feature_starts = numpy.cumsum(point_counts) - point_counts
+                index = numpy.repeat(coordinate_starts - 2 * point_feature_starts, 2 * point_counts) + numpy.arange(2 * total_points)
+                deltas = signed[index].reshape(-1, 2)
+                totals = numpy.cumsum(deltas, axis=0)
+                feature_base = numpy.zeros((len(point_counts), 2), dtype='int64')
+                later = point_feature_starts > 0
+                feature_base[later] = totals[point_feature_starts[later] - 1]
+                totals -= numpy.repeat(feature_base, point_counts, axis=0)
+                arrays['XY'] = numpy.column_stack([totals[:, 0] / self.xyscale + self.xorigin, totals[:, 1] / self.xyscale + self.yorigin])
+                arrays['PART_OFFSETS'] = numpy.concatenate([[0], numpy.cumsum(part_points)]).astype('int64')
+                arrays['FEATURE_PARTS'] = numpy.concatenate([[0], numpy.cumsum(feature_part_counts)]).astype('int64')
+        for name, field in zip(field_names, fields):
+            arrays['FIELD_{}'.format(name)] = keptValues(field)
+        # end for
+        return arrays
+
+def geodatabasePath(feature_class):
+    """Return the file geodatabase folder holding a feature class, or None"""
+    gdb = feature_class
+    while gdb and not gdb.lower().endswith('.gdb'):
+        parent = os.path.dirname(gdb)
+        if parent == gdb:
+            return None
+        gdb = parent
+    return gdb or None
+
+def catalogTables(gdb):
+    """Return a dictionary of the table names (upper case) in a file geodatabase and their .gdbtable files"""
+    catalog = GdbTable(os.path.join(gdb, 'a00000001.gdbtable'))
+    try:
+        rows = catalog.read(['Name', 'FileFormat'])
+    finally:
+        catalog.close()
+    tables = {}
+    for oid, name, file_format in zip(rows['OID'].tolist(), rows['FIELD_Name'].tolist(), rows['FIELD_FileFormat'].tolist()):
+        table_file = os.path.join(gdb, 'a{:08x}.gdbtable'.format(oid))
+        if file_format == 0 and os.path.exists(table_file):
+            tables[name.upper()] = table_file
+    # end for
+    return tables
+
+def tableFile(feature_class):
+    """Return the .gdbtable file of a feature class or table in a file geodatabase, or None"""
+    gdb = geodatabasePath(feature_class)
+    if gdb is None or not os.path.exists(os.path.join(gdb, 'a00000001.gdbtable')):
+        return None
+    return catalogTables(gdb).get(os.path.basename(feature_class).upper())
+
+def canRead(feature_class, where_clause=''):
+    """Return True if the reader can read a feature class or table with a where clause"""
+    try:
+        return tableFile(feature_class) is not None and parseWhereClause(where_clause or '') is not None
+    except (IOError, OSError, ValueError, struct.error):
+        return False
+
+def openTable(feature_class):
+    """Open a feature class or table in a file geodatabase"""
+    table_file = tableFile(feature_class)
+    if table_file is None:
+        raise IOError('{} was not found in a file geodatabase'.format(feature_class))
+    return GdbTable(table_file)
+
+def rowCount(feature_class):
+    """Return the number of rows in a feature class or table in a file geodatabase"""
+    table = openTable(feature_class)
+    try:
+        return len(table)
+    finally:
+        table.close()
+
+def readFeatureClass(feature_class, fields=(), bbox=None, where_clause=''):
+    """Return the shape type, snapshot arrays (GdbTable.read), and coordinate system (well-known text, None for tables) of a feature
+       class or table in a file geodatabase.  Coordinates are not projected."""
+    table = openTable(feature_class)
+    try:
+        return table.shape_type, table.read(fields, bbox, where_clause), table.spatial_reference_wkt
+    finally:
+        table.close()
@@ -4,12 +4,15 @@
 #
 # Purpose:     Module selects any building footprint features that contain the SARA facility.  If any building footprint features are selected,
 #              a test is performed to check if they intersect the Floodplain layer.  In any event, messages are logged to tool and to a text file.
+#              With the reference data cache (dataCache.py), the building footprints containing the SARA facility are found from the building
+#              footprint snapshot rather than a select by location against the full layer.  With the floodplain flags (floodplainIndex.py),
+#              whether the building footprint intersects a floodplain is looked up rather than tested.
 #
 # Author:      Patrick McKinney
 #
 # Created:     02/28/2019
 #
-# Updated:     05/9/2019
+# Updated:     10/18/2026
 #
 # Copyright:   (c) Cumberland County GIS 2019
 #
@@ -22,10 +25,16 @@
 #-----------------------------------------------------------------------------------------------------------------------------------------------------------#
 
 # import modules
-import arcpy, os, errorLogger
+import arcpy, os, errorLogger, spatialIndex, dataCache, floodplainIndex, runProfile
 
-def intersectFloodplainTest(projected_point,lon,lat,results_text_file):
-    """Tests whether the building footprint for the SARA site intersects a floodplain"""
+@runProfile.timedStage
+def intersectFloodplainTest(projected_point,lon,lat,results_text_file,use_cache=False,use_flag_index=False):
+    """Tests whether the building footprint for the SARA site intersects a floodplain, and returns the number of building footprints
+       containing the SARA site, whether they intersect a floodplain, and the flood zones (floodplain flags only)
+
+       use_cache = find the building footprint containing the SARA site from the building footprint snapshot (dataCache.py)
+       use_flag_index = look up the building footprint containing the SARA site in the precomputed floodplain flags (floodplainIndex.py)
+    """
     try:
         # file geodatabase containing data:
         geodata_gdb = r'C:\GIS\Geodata.gdb'
@@ -37,37 +46,62 @@ def intersectFloodplainTest(projected_point,lon,lat,results_text_file):
         text_file_contents = ''
         # message to write to text file and arcPy info window
         message = ''
+        # flood zones intersected by the building footprint (floodplain flags only)
+        flood_zones = []
+
+        if use_cache or use_flag_index:
+            # SARA Site coordinates
+            with arcpy.da.SearchCursor(projected_point, ['SHAPE@XY']) as cursor:
+                site_x, site_y = next(cursor)[0]
 
-        # create feature layers
-        arcpy.MakeFeatureLayer_management(blgd_footprints,'Building_Footprints')
-        arcpy.MakeFeatureLayer_management(floodplain_districts,'Floodplains')
-        arcpy.MakeFeatureLayer_management(projected_point,'SARA_Site')
+        if use_flag_index:
+            # look up building footprint and its floodplain flag
+            features_count, intersects_floodplain, flood_zones = floodplainIndex.footprintFloodplainStatus(site_x, site_y, blgd_footprints, floodplain_districts)
+        else:
+            # create feature layers
+            if use_cache:
+                # find building footprints containing SARA Site from the snapshot, and limit the layer to those footprints
+                footprints_snapshot = dataCache.loadSnapshot(blgd_footprints)
+                footprint_oids = [int(oid) for oid in footprints_snapshot.oids[footprints_snapshot.containingFeatures(site_x, site_y)]]
+                arcpy.MakeFeatureLayer_management(blgd_footprints,'Building_Footprints',spatialIndex.oidWhereClause(blgd_footprints, footprint_oids))
+            else:
+                arcpy.MakeFeatureLayer_management(blgd_footprints,'Building_Footprints')
+            arcpy.MakeFeatureLayer_management(floodplain_districts,'Floodplains')
+            arcpy.MakeFeatureLayer_management(projected_point,'SARA_Site')
+
+            # select building footprint that contains SARA Site
+            if not use_cache:
+                arcpy.SelectLayerByLocation_management('Building_Footprints', 'CONTAINS', 'SARA_Site')
+            # get count of selected features
+            features_count = int(arcpy.GetCount_management('Building_Footprints')[0])
+            intersects_floodplain = False
+            # if a building footprint is selected, test if it intersects a floodplain
+            if features_count > 0:
+                # the snapshot layer only holds the footprints containing SARA Site, so it has no selection to subset
+                selection_type = 'NEW_SELECTION' if use_cache else 'SUBSET_SELECTION'
+                arcpy.SelectLayerByLocation_management('Building_Footprints', 'INTERSECT', 'Floodplains', selection_type=selection_type)
+                # get count of selected features
+                intersects_floodplain = int(arcpy.GetCount_management('Building_Footprints')[0]) > 0
 
-        # select building footprint that contains SARA Site
-        arcpy.SelectLayerByLocation_management('Building_Footprints', 'CONTAINS', 'SARA_Site')
-        # get count of selected features
-        features_count = int(arcpy.GetCount_management('Building_Footprints')[0])
         # if no features selected, add warning message
         if features_count == 0:
             # add warning message
             message = 'No Building Footprints contain the SARA Site located at latitude: {}; longitude: {}'.format(lat,lon)
             arcpy.AddWarning('\n{}'.format(message))
             text_file_contents += '\n{}\n'.format(message)
-        # if a building footprint is selected, test if it intersects a floodplain
+        # if no building footprint intersects a floodplain, add message
+        elif not intersects_floodplain:
+            # add message
+            message = 'The building footprint for the SARA Site located at latitude: {}; longitude: {}, does not intersect a floodplain'.format(lat,lon)
+            arcpy.AddMessage('\n{}'.format(message))
+            text_file_contents += '\n{}\n'.format(message)
         else:
-            arcpy.SelectLayerByLocation_management('Building_Footprints', 'INTERSECT', 'Floodplains', selection_type='SUBSET_SELECTION')
-            # get count of selected features
-            features_count = int(arcpy.GetCount_management('Building_Footprints')[0])
-            # if no features selected, add warning message
-            if features_count == 0:
-                # add message
-                message = 'The building footprint for the SARA Site located at latitude: {}; longitude: {}, does not intersect a floodplain'.format(lat,lon)
-                arcpy.AddMessage('\n{}'.format(message))
-                text_file_contents += '\n{}\n'.format(message)
-            else:
-                message = 'The building footprint for the SARA Site located at latitude: {}; longitude: {}, intersects a floodplain'.format(lat,lon)
-                arcpy.AddWarning('\n{}'.format(message))
-                text_file_contents += '\n{}\n'.format(message)
+            message = 'The building footprint for the SARA Site located at latitude: {}; longitude: {}, intersects a floodplain'.format(lat,lon)
+            arcpy.AddWarning('\n{}'.format(message))
+            text_file_contents += '\n{}\n'.format(message)
+            if flood_zones:
+                arcpy.AddWarning('\nFlood zone(s): {}'.format(', '.join(flood_zones)))
+        return features_count, intersects_floodplain, flood_zones
     # If an error occurs running geoprocessing tool(s) capture error and write message
     # handle error outside of Python system
     except EnvironmentError as e:
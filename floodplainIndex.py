@@ -0,0 +1,144 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Building Footprint Floodplain Index
+#
+# Purpose:     Tag every building footprint with whether it intersects a FEMA floodplain, once for each version of the data, so the floodplain
+#              check for a SARA facility is a point-in-polygon lookup.
+#
+# Summary:     A select by location between the building footprints and the floodplains is run once.  The result (and the flood zones of the
+#              floodplains each footprint intersects) is saved to the cache folder next to the building footprint snapshot (dataCache.py),
+#              along with a grid index of the footprint envelopes (spatialIndex.py).  The flags are rebuilt when either layer changes.
+#
+#              footprintFloodplainStatus finds the footprints containing a point and returns whether any of them intersect a floodplain.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, json, pickle, shutil, numpy, spatialIndex, dataCache, geometryArrays
+
+# field holding the flood zone in the floodplain layer
+zone_field = 'FLD_ZONE'
+# grid cell size (feet) for the footprint index
+cell_size = 1000
+# flags already loaded in this process
+loaded_flags = {}
+
+class FloodplainFlags(object):
+    """Floodplain flag and flood zones for every building footprint in a snapshot"""
+    def __init__(self, snapshot, flags, zones, index):
+        self.snapshot = snapshot
+        self.flags = flags
+        self.zones = zones
+        self.index = index
+
+    def containingFootprints(self, x, y):
+        """Return the snapshot indexes of building footprints containing a point"""
+        candidates = numpy.array(self.index.query(x, y, x, y), dtype='int64')
+        if len(candidates) == 0:
+            return candidates
+        xy, part_offsets, feature_parts = self.snapshot.featureGeometry(candidates)
+        return candidates[geometryArrays.pointInPolygons(x, y, xy, part_offsets, feature_parts)]
+
+def flagsFolder(footprints, floodplains, footprints_signature, floodplains_signature):
+    """Return the cache folder for the flags of a version of the building footprints and floodplains"""
+    name = '{}_in_{}'.format(os.path.basename(footprints), os.path.basename(floodplains))
+    version = '{}_{}_{}_{}'.format(footprints_signature[0], footprints_signature[1], floodplains_signature[0], floodplains_signature[1])
+    return os.path.join(spatialIndex.cache_dir, name, version)
+
+def buildFloodplainFlags(footprints, floodplains, snapshot, folder):
+    """Flag the building footprints that intersect a floodplain and save the flags to a cache folder"""
+    arcpy.AddMessage('\nFlagging building footprints that intersect a floodplain')
+    arcpy.MakeFeatureLayer_management(footprints, 'Footprints_Flag_Layer')
+    arcpy.MakeFeatureLayer_management(floodplains, 'Floodplains_Flag_Layer')
+    arcpy.SelectLayerByLocation_management('Footprints_Flag_Layer', 'INTERSECT', 'Floodplains_Flag_Layer')
+    flagged_oids = set()
+    with arcpy.da.SearchCursor('Footprints_Flag_Layer', ['OID@']) as cursor:
+        for row in cursor:
+            flagged_oids.add(row[0])
+    # flood zones of the floodplains each flagged footprint intersects
+    zones_by_oid = {}
+    if flagged_oids and zone_field in [field.name for field in arcpy.ListFields(floodplains)]:
+        joined = arcpy.SpatialJoin_analysis('Footprints_Flag_Layer', 'Floodplains_Flag_Layer', r'in_memory\Footprint_Flood_Zones', 'JOIN_ONE_TO_MANY', 'KEEP_COMMON', match_option='INTERSECT')
+        with arcpy.da.SearchCursor(joined, ['TARGET_FID', zone_field]) as cursor:
+            for row in cursor:
+                if row[1]:
+                    zones_by_oid.setdefault(row[0], set()).add(row[1])
+        arcpy.Delete_management(joined)
+    arcpy.Delete_management('Footprints_Flag_Layer')
+    arcpy.Delete_management('Floodplains_Flag_Layer')
+
+    # line flags up with the footprint snapshot
+    oids = [int(oid) for oid in snapshot.oids]
+    flags = numpy.array([oid in flagged_oids for oid in oids], dtype=bool)
+    zones = numpy.array([u','.join(sorted(zones_by_oid.get(oid, []))) for oid in oids], dtype='U')
+    index = spatialIndex.GridIndex(cell_size, footprints)
+    envelopes = snapshot.envelopes
+    for position in range(len(oids)):
+        if not numpy.isnan(envelopes[position, 0]):
+            index.insert(position, *[float(value) for value in envelopes[position]])
+    # end for
+
+    temp_folder = '{}_{}.tmp'.format(folder, os.getpid())
+    os.makedirs(temp_folder)
+    numpy.save(os.path.join(temp_folder, 'FLAG.npy'), flags)
+    numpy.save(os.path.join(temp_folder, 'ZONE.npy'), zones)
+    index.save(os.path.join(temp_folder, 'footprints.idx'))
+    with open(os.path.join(temp_folder, 'flags.json'), 'w') as f:
+        json.dump({'footprints': footprints, 'floodplains': floodplains, 'snapshot': snapshot.folder, 'flagged': int(flags.sum())}, f)
+    try:
+        os.rename(temp_folder, folder)
+    except OSError:
+        # another process finished the same flags first
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+def loadFloodplainFlags(footprints, floodplains):
+    """Load the floodplain flags for the current version of the building footprints and floodplains, building them if needed"""
+    footprints_signature = spatialIndex.dataSignature(footprints)
+    floodplains_signature = spatialIndex.dataSignature(floodplains)
+    key = (footprints, floodplains, footprints_signature, floodplains_signature)
+    if key in loaded_flags:
+        return loaded_flags[key]
+    snapshot = dataCache.loadSnapshot(footprints)
+    folder = flagsFolder(footprints, floodplains, footprints_signature, floodplains_signature)
+    if not os.path.exists(os.path.join(folder, 'flags.json')):
+        try:
+            os.makedirs(os.path.dirname(folder))
+        except OSError:
+            # folder already exists
+            pass
+        buildFloodplainFlags(footprints, floodplains, snapshot, folder)
+        dataCache.removeOldSnapshots(folder)
+    with open(os.path.join(folder, 'footprints.idx'), 'rb') as f:
+        index = pickle.load(f)
+    flags = FloodplainFlags(snapshot, numpy.load(os.path.join(folder, 'FLAG.npy'), mmap_mode='r'),
+                            numpy.load(os.path.join(folder, 'ZONE.npy'), mmap_mode='r'), index)
+    loaded_flags.clear()
+    loaded_flags[key] = flags
+    return flags
+
+def footprintFloodplainStatus(x, y, footprints, floodplains):
+    """Return the number of building footprints containing a point, whether any of them intersect a floodplain, and their flood zones"""
+    flags = loadFloodplainFlags(footprints, floodplains)
+    containing = flags.containingFootprints(x, y)
+    zones = set()
+    for position in containing:
+        zones.update([zone for zone in flags.zones[position].split(',') if zone])
+    return len(containing), bool(flags.flags[containing].any()) if len(containing) else False, sorted(zones)
+
+if __name__ == '__main__':
+    # build the floodplain flags after a data release, so the first SARA run doesn't have to
+    flags = loadFloodplainFlags(r'C:\GIS\Geodata.gdb\Building_Footprints_2008', r'C:\GIS\Geodata.gdb\FEMA_Floodplains_2009')
+    arcpy.AddMessage('\n{} of {} building footprints intersect a floodplain'.format(int(flags.flags.sum()), len(flags.flags)))
@@ -0,0 +1,265 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Generalized Geometry Tiers
+#
+# Purpose:     Keep simplified copies of the lines and polygons in a layer snapshot (municipalities, counties, streams, pipelines), so the
+#              distance from a SARA facility to most features is settled without reading their full-resolution vertices.
+#
+# Summary:     Each part of each feature is simplified with the Douglas-Peucker algorithm at each of the tolerances (coarsest first).  Every
+#              vertex left out is within the tolerance of the simplified part, so the simplified and full-resolution boundaries are never
+#              more than the tolerance apart, and the distance from a point to one is within the tolerance of the distance to the other.
+#              A point further than the tolerance from a simplified polygon's boundary is inside the full-resolution polygon only when it
+#              is inside the simplified polygon.
+#
+#              A distance test checks each feature against, in turn:
+#
+#              envelope          features whose envelope is beyond the largest risk radius are left out, and features with few
+#                                vertices are measured at full resolution straight away
+#              simplified tiers  features whose simplified boundary is more than the tolerance beyond the largest risk radius are left out,
+#                                and polygons containing the point further than the tolerance from their boundary are 0 feet away
+#              full resolution   the exact distance, for the features left near a boundary
+#
+#              The features found and their distances are the same as testing every feature at full resolution.  The tiers are saved in
+#              a Generalized folder inside the snapshot folder (dataCache.py), so they are rebuilt with the snapshot when the data changes.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, json, shutil, numpy, geometryArrays
+
+# simplification tolerances of the generalized tiers in feet, coarsest first
+tolerances = [500.0, 50.0]
+# added to each tolerance to allow for floating point rounding (feet)
+rounding_slack = 0.001
+# parts with this many vertices or fewer are kept as they are
+min_part_vertices = 4
+# features with fewer vertices are measured at full resolution, since the tiers cost more than they save
+min_feature_vertices = 100
+# generalized tiers loaded in this process, by snapshot folder
+loaded_tiers = {}
+
+def simplifyPart(xy, tolerance):
+    """Return the indexes of the vertices of a part kept by Douglas-Peucker simplification.  Every vertex left out is within the
+       tolerance of the segment joining the kept vertices on either side of it."""
+    count = len(xy)
+    if count <= min_part_vertices:
+        return numpy.arange(count)
+    keep = numpy.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = xy[first]
+        step = xy[last] - start
+        inner = xy[first + 1:last] - start
+        length_squared = float(step[0] * step[0] + step[1] * step[1])
+        # distance to the segment, not the line through it, so closed rings (first vertex = last vertex) are handled
+        t = numpy.clip(inner.dot(step) / length_squared, 0.0, 1.0) if length_squared > 0 else numpy.zeros(len(inner))
+        distances = numpy.hypot(inner[:, 0] - t * step[0], inner[:, 1] - t * step[1])
+        farthest = int(numpy.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    # end while
+    return numpy.nonzero(keep)[0]
+
+def simplifyFeatures(xy, part_offsets, feature_parts, tolerance):
+    """Return the vertex and offset arrays of every feature simplified to a tolerance, and the index of each kept vertex in the
+       full-resolution vertices.  No parts are removed."""
+    xy = numpy.asarray(xy, dtype='float64')
+    part_offsets = numpy.asarray(part_offsets, dtype='int64')
+    kept = []
+    for part in range(len(part_offsets) - 1):
+        start, end = int(part_offsets[part]), int(part_offsets[part + 1])
+        kept.append(start + simplifyPart(xy[start:end], tolerance))
+    # end for
+    vertex_indexes = numpy.concatenate(kept) if kept else numpy.zeros(0, dtype='int64')
+    new_part_offsets = numpy.concatenate([[0], numpy.cumsum([len(part) for part in kept])]).astype('int64')
+    return xy[vertex_indexes], new_part_offsets, numpy.array(feature_parts, dtype='int64'), vertex_indexes.astype('int64')
+
+def featureVertexCounts(part_offsets, feature_parts):
+    """Return the number of vertices in each feature"""
+    part_offsets = numpy.asarray(part_offsets, dtype='int64')
+    feature_parts = numpy.asarray(feature_parts, dtype='int64')
+    return part_offsets[feature_parts[1:]] - part_offsets[feature_parts[:-1]]
+
+class GeneralizedLayer(object):
+    """The generalized tiers of a line or polygon layer snapshot
+
+       tiers = list of (tolerance, xy, part_offsets, feature_parts, full-resolution vertex index of each vertex), coarsest first
+    """
+    def __init__(self, snapshot, tiers):
+        self.snapshot = snapshot
+        self.polygons = snapshot.shape_type == 'Polygon'
+        self.tiers = tiers
+        self.vertex_counts = featureVertexCounts(snapshot.part_offsets, snapshot.feature_parts)
+        self.tier_vertex_counts = [featureVertexCounts(tier[2], tier[3]) for tier in tiers]
+        # layers without detailed features are measured at full resolution
+        self.detailed = bool((self.vertex_counts >= min_feature_vertices).any())
+
+    def featureDistances(self, x, y, indexes, max_distance):
+        """Return the distance from a point to each of a subset of features.  Distances up to max_distance are exact, and features
+           further away may be given numpy.inf."""
+        indexes = numpy.asarray(indexes, dtype='int64')
+        if not self.detailed:
+            return self.snapshot.featureDistances(x, y, indexes)
+        distances = numpy.full(len(indexes), numpy.inf)
+        if not len(indexes):
+            return distances
+        # envelope tier
+        envelopes = self.snapshot.envelopes[indexes]
+        dx = numpy.maximum(numpy.maximum(envelopes[:, 0] - x, x - envelopes[:, 2]), 0)
+        dy = numpy.maximum(numpy.maximum(envelopes[:, 1] - y, y - envelopes[:, 3]), 0)
+        unresolved = numpy.hypot(dx, dy) <= max_distance
+        positions = numpy.nonzero(unresolved)[0]
+        small = positions[self.vertex_counts[indexes[positions]] < min_feature_vertices]
+        if len(small):
+            distances[small] = self.snapshot.featureDistances(x, y, indexes[small])
+            unresolved[small] = False
+        # polygons known not to contain the point
+        outside = numpy.zeros(len(indexes), dtype=bool)
+        for (tolerance, xy, part_offsets, feature_parts, vertices), tier_counts in zip(self.tiers, self.tier_vertex_counts):
+            # only features with fewer vertices in this tier are worth testing on it
+            positions = numpy.nonzero(unresolved)[0]
+            positions = positions[tier_counts[indexes[positions]] < self.vertex_counts[indexes[positions]]]
+            if not len(positions):
+                continue
+            tier_xy, tier_part_offsets, tier_feature_parts = geometryArrays.subsetFeatures(xy, part_offsets, feature_parts, indexes[positions])
+            boundary = geometryArrays.pointFeatureDistances(x, y, tier_xy, tier_part_offsets, tier_feature_parts)
+            bound = tolerance + rounding_slack
+            inside = numpy.zeros(len(positions), dtype=bool)
+            if self.polygons:
+                clear = boundary > bound
+                inside = clear & geometryArrays.pointInPolygons(x, y, tier_xy, tier_part_offsets, tier_feature_parts)
+                outside[positions[clear & ~inside]] = True
+                distances[positions[inside]] = 0.0
+            far = ~inside & (boundary - bound > max_distance)
+            unresolved[positions[inside | far]] = False
+        # end for
+        positions = numpy.nonzero(unresolved)[0]
+        if not len(positions):
+            return distances
+        # full resolution tier, measured only along the parts of the boundary that can hold the nearest segment when the feature
+        # has fewer vertices in the finest tier
+        simplified = self.tier_vertex_counts[-1][indexes[positions]] < self.vertex_counts[indexes[positions]] if self.tiers else numpy.zeros(len(positions), dtype=bool)
+        if simplified.any():
+            distances[positions[simplified]] = self.refineDistances(x, y, indexes[positions[simplified]])
+        if not simplified.all():
+            distances[positions[~simplified]] = self.snapshot.featureDistances(x, y, indexes[positions[~simplified]])
+        if self.polygons:
+            unknown = positions[~outside[positions]]
+            if len(unknown):
+                xy, part_offsets, feature_parts = self.snapshot.featureGeometry(indexes[unknown])
+                distances[unknown[geometryArrays.pointInPolygons(x, y, xy, part_offsets, feature_parts)]] = 0.0
+        return distances
+
+    def refineDistances(self, x, y, indexes):
+        """Return the exact distance from a point to the boundary of each of a subset of features
+
+           Each segment of the finest tier stands in for the full-resolution segments between its two vertices, which are all within
+           the tolerance of it.  Only the full-resolution segments of tier segments that can be nearer than the nearest tier segment
+           plus the tolerance are measured.
+        """
+        tolerance, xy, part_offsets, feature_parts, vertices = self.tiers[-1]
+        bound = tolerance + rounding_slack
+        feature_parts = numpy.asarray(feature_parts)
+        part_offsets = numpy.asarray(part_offsets)
+        parts = geometryArrays.concatenatedRanges(feature_parts[indexes], feature_parts[indexes + 1])
+        part_position = numpy.repeat(numpy.arange(len(indexes)), feature_parts[indexes + 1] - feature_parts[indexes])
+        tier_vertex = geometryArrays.concatenatedRanges(part_offsets[parts], part_offsets[parts + 1])
+        vertex_part = numpy.repeat(numpy.arange(len(parts)), part_offsets[parts + 1] - part_offsets[parts])
+        # segments join each tier vertex to the next one in the same part
+        joined = vertex_part[:-1] == vertex_part[1:]
+        first = tier_vertex[:-1][joined]
+        second = tier_vertex[1:][joined]
+        segment_position = part_position[vertex_part[:-1][joined]]
+        xy = numpy.asarray(xy)
+        tier_distances = geometryArrays.pointSegmentDistances(x, y, xy[first], xy[second])
+        upper = geometryArrays.reduceByFeature(tier_distances, segment_position, len(indexes), numpy.minimum, numpy.inf) + bound
+        near = tier_distances - bound <= upper[segment_position]
+        vertices = numpy.asarray(vertices)
+        starts = vertices[first[near]]
+        ends = vertices[second[near]]
+        full_segments = geometryArrays.concatenatedRanges(starts, ends)
+        full_position = numpy.repeat(segment_position[near], ends - starts)
+        full_xy = self.snapshot.xy
+        distances = geometryArrays.reduceByFeature(geometryArrays.pointSegmentDistances(x, y, full_xy[full_segments], full_xy[full_segments + 1]),
+                                                   full_position, len(indexes), numpy.minimum, numpy.inf)
+        # features without segments are measured to their first vertex
+        single = numpy.isinf(distances)
+        if single.any():
+            distances[single] = self.snapshot.featureDistances(x, y, indexes[single])
+        return distances
+
+def generalizedFolder(snapshot):
+    return os.path.join(snapshot.folder, 'Generalized')
+
+def buildGeneralized(snapshot, folder):
+    """Simplify the features of a snapshot at each tolerance and save the tiers to a folder"""
+    arcpy.AddMessage('\nCreating generalized geometry for {}'.format(snapshot.source))
+    temp_folder = '{}_{}.tmp'.format(folder, os.getpid())
+    if os.path.exists(temp_folder):
+        shutil.rmtree(temp_folder)
+    os.makedirs(temp_folder)
+    vertex_counts = []
+    for tier, tolerance in enumerate(tolerances):
+        xy, part_offsets, feature_parts, vertices = simplifyFeatures(snapshot.xy, snapshot.part_offsets, snapshot.feature_parts, tolerance)
+        numpy.save(os.path.join(temp_folder, 'TIER_{}_XY.npy'.format(tier)), xy)
+        numpy.save(os.path.join(temp_folder, 'TIER_{}_PART_OFFSETS.npy'.format(tier)), part_offsets)
+        numpy.save(os.path.join(temp_folder, 'TIER_{}_FEATURE_PARTS.npy'.format(tier)), feature_parts)
+        numpy.save(os.path.join(temp_folder, 'TIER_{}_VERTEX.npy'.format(tier)), vertices)
+        vertex_counts.append(len(xy))
+    # end for
+    with open(os.path.join(temp_folder, 'generalized.json'), 'w') as f:
+        json.dump({'tolerances': tolerances, 'vertices': len(snapshot.xy), 'tier_vertices': vertex_counts}, f)
+    try:
+        os.rename(temp_folder, folder)
+    except OSError:
+        # another process finished the same tiers first
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+def loadGeneralized(snapshot):
+    """Load the generalized tiers of a line or polygon layer snapshot, building them if needed"""
+    if snapshot.folder in loaded_tiers:
+        return loaded_tiers[snapshot.folder]
+    folder = generalizedFolder(snapshot)
+    metadata_file = os.path.join(folder, 'generalized.json')
+    metadata = None
+    if os.path.exists(metadata_file):
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+        # tiers made with other tolerances
+        if metadata.get('tolerances') != tolerances:
+            shutil.rmtree(folder, ignore_errors=True)
+            metadata = None
+    if metadata is None:
+        buildGeneralized(snapshot, folder)
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+    tiers = []
+    for tier, tolerance in enumerate(metadata['tolerances']):
+        tiers.append((tolerance,) + tuple(numpy.load(os.path.join(folder, 'TIER_{}_{}.npy'.format(tier, name)), mmap_mode='r') for name in ['XY', 'PART_OFFSETS', 'FEATURE_PARTS', 'VERTEX']))
+    # end for
+    layer = GeneralizedLayer(snapshot, tiers)
+    # forget the tiers of earlier versions of the same layer
+    for old_folder in [key for key in loaded_tiers if os.path.dirname(key) == os.path.dirname(snapshot.folder)]:
+        del loaded_tiers[old_folder]
+    loaded_tiers[snapshot.folder] = layer
+    return layer
@@ -0,0 +1,116 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Geometry Array Functions
+#
+# Purpose:     Vectorized geometry tests for features stored as NumPy vertex arrays (see dataCache.py).
+#
+# Summary:     Lines and polygons are stored as one array of vertices (xy), the index of the first vertex of each part or ring
+#              (part_offsets), and the index of the first part of each feature (feature_parts).  Both offset arrays end with the total count.
+#              The functions in this module measure distances from a point to every feature and test whether a point is inside polygons,
+#              working on all vertices of all features at once rather than one feature at a time.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import numpy
+
+def concatenatedRanges(starts, ends):
+    """Return the indexes of several ranges (start to end - 1) joined into one array"""
+    starts = numpy.asarray(starts, dtype='int64')
+    lengths = numpy.asarray(ends, dtype='int64') - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return numpy.zeros(0, dtype='int64')
+    # step of 1 within each range, jumping to the next start at each range boundary
+    steps = numpy.ones(total, dtype='int64')
+    non_empty = lengths > 0
+    range_starts = numpy.cumsum(lengths[non_empty])[:-1]
+    steps[0] = starts[non_empty][0]
+    steps[range_starts] = starts[non_empty][1:] - (starts[non_empty][:-1] + lengths[non_empty][:-1] - 1)
+    return numpy.cumsum(steps)
+
+def subsetFeatures(xy, part_offsets, feature_parts, feature_indexes):
+    """Return the vertex and offset arrays for a subset of features"""
+    feature_indexes = numpy.asarray(feature_indexes, dtype='int64')
+    part_indexes = concatenatedRanges(feature_parts[feature_indexes], feature_parts[feature_indexes + 1])
+    vertex_indexes = concatenatedRanges(part_offsets[part_indexes], part_offsets[part_indexes + 1])
+    part_lengths = part_offsets[part_indexes + 1] - part_offsets[part_indexes]
+    feature_lengths = feature_parts[feature_indexes + 1] - feature_parts[feature_indexes]
+    new_part_offsets = numpy.concatenate([[0], numpy.cumsum(part_lengths)]).astype('int64')
+    new_feature_parts = numpy.concatenate([[0], numpy.cumsum(feature_lengths)]).astype('int64')
+    return numpy.asarray(xy)[vertex_indexes], new_part_offsets, new_feature_parts
+
+def segments(xy, part_offsets, feature_parts):
+    """Return segment start points, end points, and the feature index of each segment"""
+    xy = numpy.asarray(xy, dtype='float64')
+    vertex_count = len(xy)
+    if vertex_count < 2:
+        empty = numpy.zeros((0, 2))
+        return empty, empty, numpy.zeros(0, dtype='int64')
+    # a segment joins each vertex to the next one, except across the end of a part
+    keep = numpy.ones(vertex_count - 1, dtype=bool)
+    part_ends = numpy.asarray(part_offsets[1:-1], dtype='int64') - 1
+    keep[part_ends[(part_ends >= 0) & (part_ends < vertex_count - 1)]] = False
+    start_indexes = numpy.nonzero(keep)[0]
+    # feature index of each part, then of each segment
+    part_feature = numpy.repeat(numpy.arange(len(feature_parts) - 1), numpy.diff(feature_parts))
+    segment_part = numpy.searchsorted(part_offsets, start_indexes, side='right') - 1
+    return xy[start_indexes], xy[start_indexes + 1], part_feature[segment_part]
+
+def pointSegmentDistances(x, y, starts, ends):
+    """Return the distance from a point to each segment"""
+    dx = ends[:, 0] - starts[:, 0]
+    dy = ends[:, 1] - starts[:, 1]
+    length_squared = dx * dx + dy * dy
+    safe_length = numpy.where(length_squared > 0, length_squared, 1.0)
+    # position of the closest point along each segment, clamped to the segment
+    t = numpy.clip(((x - starts[:, 0]) * dx + (y - starts[:, 1]) * dy) / safe_length, 0.0, 1.0)
+    t = numpy.where(length_squared > 0, t, 0.0)
+    return numpy.hypot(starts[:, 0] + t * dx - x, starts[:, 1] + t * dy - y)
+
+def reduceByFeature(values, segment_feature, feature_count, function, empty_value):
+    """Reduce a value for each segment to a value for each feature"""
+    result = numpy.full(feature_count, empty_value, dtype='float64')
+    if len(values):
+        function.at(result, segment_feature, values)
+    return result
+
+def pointInPolygons(x, y, xy, part_offsets, feature_parts):
+    """Return whether a point is inside each polygon (even-odd rule across all rings)"""
+    feature_count = len(feature_parts) - 1
+    starts, ends, segment_feature = segments(xy, part_offsets, feature_parts)
+    # count ring edges crossed by a ray running east from the point
+    straddles = (starts[:, 1] > y) != (ends[:, 1] > y)
+    safe_dy = numpy.where(straddles, ends[:, 1] - starts[:, 1], 1.0)
+    crossing_x = starts[:, 0] + (y - starts[:, 1]) * (ends[:, 0] - starts[:, 0]) / safe_dy
+    crossings = (straddles & (crossing_x > x)).astype('int64')
+    counts = numpy.bincount(segment_feature, weights=crossings, minlength=feature_count)
+    return (counts.astype('int64') % 2) == 1
+
+def pointFeatureDistances(x, y, xy, part_offsets, feature_parts, polygons=False):
+    """Return the shortest distance from a point to each line or polygon feature (0 when a polygon contains the point)"""
+    feature_count = len(feature_parts) - 1
+    starts, ends, segment_feature = segments(xy, part_offsets, feature_parts)
+    distances = reduceByFeature(pointSegmentDistances(x, y, starts, ends), segment_feature, feature_count, numpy.minimum, numpy.inf)
+    # features made of a single vertex
+    single = numpy.isinf(distances)
+    if single.any():
+        first_vertex = numpy.asarray(part_offsets)[numpy.asarray(feature_parts)[:-1]]
+        has_vertex = single & (first_vertex < len(xy))
+        distances[has_vertex] = numpy.hypot(xy[first_vertex[has_vertex], 0] - x, xy[first_vertex[has_vertex], 1] - y)
+    if polygons:
+        distances[pointInPolygons(x, y, xy, part_offsets, feature_parts)] = 0.0
+    return distances
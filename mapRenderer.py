@@ -0,0 +1,392 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Map Renderer
+#
+# Purpose:     Draw the SARA risk radius map directly from the risk rings, without the map document template, so the map is created in a
+#              fraction of a second and maps for a batch can be drawn at the same time in separate processes.
+#
+# Summary:     The page is laid out once as a list of shapes and text in page points (1/72 inch, origin at the lower left of a letter size
+#              landscape page): the risk radii, the SARA facility, any vulnerable facilities found, the map title, SARA name, address, PATTS,
+#              chemical, risk radii distances, date, scale, legend, and disclaimer from the map document template.  The page is then written as:
+#
+#              svg   written directly
+#              pdf   written directly, using the standard Helvetica fonts
+#              png   drawn with matplotlib, when it is installed
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import os, math, datetime, multiprocessing
+# matplotlib is only needed for png maps
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot, patches
+except ImportError:
+    matplotlib = None
+
+# letter size landscape page (points)
+page_width = 792.0
+page_height = 612.0
+# map frame (x, y, width, height) and text panel to the right of it (points)
+map_frame = (36.0, 36.0, 528.0, 540.0)
+panel_left = 582.0
+panel_width = 174.0
+
+# text from the map document template
+map_title = 'Cumberland County SARA Facilities'
+prepared_by = 'Prepared by: Cumberland County GIS'
+projection_text = 'Projection: State Plane South (feet)'
+disclaimer_text = ('Disclaimer: Map and data are intended for informational purposes only. No guarantee is made as to the accuracy '
+                   'of the map and data and they should not be relied upon for any purpose other than general information.')
+
+# colours (red, green, blue from 0 to 1)
+black = (0.0, 0.0, 0.0)
+white = (1.0, 1.0, 1.0)
+grey = (0.45, 0.45, 0.45)
+site_colour = (0.85, 0.0, 0.0)
+# risk radius fills from the smallest (darkest) to the largest risk radius
+ring_colours = [(0.96, 0.55, 0.45), (0.98, 0.68, 0.5), (0.99, 0.78, 0.56), (1.0, 0.86, 0.64), (1.0, 0.92, 0.74), (1.0, 0.96, 0.84)]
+ring_outline = (0.7, 0.15, 0.1)
+# vulnerable facility markers
+facility_colours = [(0.12, 0.47, 0.71), (0.2, 0.63, 0.17), (0.42, 0.24, 0.6), (0.69, 0.35, 0.16), (0.0, 0.55, 0.55),
+                    (0.89, 0.1, 0.55), (0.4, 0.4, 0.4), (0.1, 0.1, 0.45)]
+
+# Helvetica character widths (1/1000 of the font size) for the printable ASCII characters
+helvetica_widths = [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278, 556, 556, 556, 556, 556, 556, 556, 556,
+                    556, 556, 278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+                    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556, 333, 556, 556, 500, 556, 556, 278, 556,
+                    556, 222, 222, 500, 222, 833, 556, 556, 556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]
+
+def textWidth(text, size, bold=False):
+    """Return the approximate width of text in points"""
+    width = sum([helvetica_widths[ord(c) - 32] if 32 <= ord(c) < 127 else 556 for c in text])
+    # bold characters are about 5% wider
+    return width * size / 1000.0 * (1.05 if bold else 1.0)
+
+def wrapText(text, size, width, bold=False):
+    """Split text into lines no wider than width"""
+    lines = []
+    line = ''
+    for word in str(text).split():
+        candidate = '{} {}'.format(line, word) if line else word
+        if line and textWidth(candidate, size, bold) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    # end for
+    if line:
+        lines.append(line)
+    return lines or ['']
+
+def niceDistance(distance):
+    """Return a round distance (1, 2, or 5 times a power of 10) no larger than distance"""
+    power = 10 ** math.floor(math.log10(distance))
+    for step in (5, 2, 1):
+        if step * power <= distance:
+            return step * power
+    return power
+
+class MapPage(object):
+    """Shapes and text on the map page, in page points"""
+    def __init__(self):
+        self.shapes = []
+
+    def circle(self, x, y, radius, fill=None, stroke=black, stroke_width=0.75):
+        self.shapes.append(('circle', (x, y, radius), {'fill': fill, 'stroke': stroke, 'stroke_width': stroke_width}))
+
+    def polygon(self, points, fill=None, stroke=black, stroke_width=0.75):
+        self.shapes.append(('polygon', list(points), {'fill': fill, 'stroke': stroke, 'stroke_width': stroke_width}))
+
+    def line(self, points, stroke=black, stroke_width=0.75):
+        self.shapes.append(('line', list(points), {'fill': None, 'stroke': stroke, 'stroke_width': stroke_width}))
+
+    def rectangle(self, x, y, width, height, fill=None, stroke=black, stroke_width=0.75):
+        self.polygon([(x, y), (x, y + height), (x + width, y + height), (x + width, y)], fill, stroke, stroke_width)
+
+    def text(self, x, y, text, size=9, bold=False, anchor='start', colour=black):
+        """Add a line of text with its baseline at y.  anchor is 'start', 'middle', or 'end'."""
+        self.shapes.append(('text', (x, y, str(text)), {'size': size, 'bold': bold, 'anchor': anchor, 'colour': colour}))
+
+    def textBlock(self, x, y, text, size=9, bold=False, width=panel_width, leading=1.25):
+        """Add wrapped text starting with its first baseline at y and return the y below the last line"""
+        for line in wrapText(text, size, width, bold):
+            self.text(x, y, line, size, bold)
+            y -= size * leading
+        # end for
+        return y
+
+def layoutSaraMap(rings, sara_name, sara_address, patts, chem_info, facilities=(), map_date=None):
+    """Lay out the SARA risk radius map and return a MapPage
+
+       rings = risk rings (riskRings.py)
+       facilities = (layer name, x, y) of vulnerable facilities to draw
+       map_date = date shown on the map (today by default)
+    """
+    page = MapPage()
+    frame_x, frame_y, frame_width, frame_height = map_frame
+    # map scale - fit the largest risk radius with 10% padding, like the map document
+    ground_radius = (rings.max_radius or 1.0) * 1.1
+    points_per_unit = min(frame_width, frame_height) / (2.0 * ground_radius)
+    centre_x = frame_x + frame_width / 2.0
+    centre_y = frame_y + frame_height / 2.0
+    def toPage(x, y):
+        return centre_x + (x - rings.x) * points_per_unit, centre_y + (y - rings.y) * points_per_unit
+
+    page.rectangle(frame_x, frame_y, frame_width, frame_height, fill=white, stroke=black, stroke_width=1.0)
+    # largest risk radius first, so each smaller one is drawn on top
+    for index in reversed(range(len(rings))):
+        radius = float(rings.radii[index]) * points_per_unit
+        page.circle(centre_x, centre_y, radius, fill=ring_colours[min(index, len(ring_colours) - 1)], stroke=ring_outline, stroke_width=1.0)
+        page.text(centre_x, centre_y + radius + 3, '{} {}'.format(rings.distances[index], rings.units), 7, True, 'middle', ring_outline)
+    # end for
+
+    # vulnerable facilities, one colour for each layer
+    layer_colours = {}
+    for layer_name, x, y in facilities:
+        if layer_name not in layer_colours:
+            layer_colours[layer_name] = facility_colours[len(layer_colours) % len(facility_colours)]
+        page_x, page_y = toPage(x, y)
+        page.circle(page_x, page_y, 2.5, fill=layer_colours[layer_name], stroke=white, stroke_width=0.5)
+    # end for
+
+    # SARA facility
+    page.polygon([(centre_x, centre_y + 7), (centre_x - 6, centre_y - 4.5), (centre_x + 6, centre_y - 4.5)], fill=site_colour, stroke=black, stroke_width=0.75)
+
+    # north arrow
+    arrow_x = frame_x + frame_width - 24
+    arrow_y = frame_y + frame_height - 48
+    page.polygon([(arrow_x, arrow_y + 28), (arrow_x - 7, arrow_y), (arrow_x, arrow_y + 6), (arrow_x + 7, arrow_y)], fill=black, stroke=black, stroke_width=0.5)
+    page.text(arrow_x, arrow_y + 32, 'N', 10, True, 'middle')
+
+    # scale bar of about a quarter of the map width, in the risk radius units
+    unit_length = rings.max_radius / max(rings.distances) if len(rings) and max(rings.distances) > 0 else 1.0
+    bar_units = niceDistance(frame_width * 0.25 / points_per_unit / unit_length)
+    bar_length = bar_units * unit_length * points_per_unit
+    bar_x = frame_x + 14
+    bar_y = frame_y + 16
+    page.rectangle(bar_x, bar_y, bar_length / 2.0, 4, fill=black, stroke=black, stroke_width=0.5)
+    page.rectangle(bar_x + bar_length / 2.0, bar_y, bar_length / 2.0, 4, fill=white, stroke=black, stroke_width=0.5)
+    page.text(bar_x, bar_y + 7, '0', 7, anchor='middle')
+    page.text(bar_x + bar_length, bar_y + 7, '{:g} {}'.format(bar_units, rings.units), 7, anchor='middle')
+
+    # text panel
+    y = page_height - 48
+    y = page.textBlock(panel_left, y, map_title, 13, True) - 8
+    y = page.textBlock(panel_left, y, sara_name, 12, True)
+    y = page.textBlock(panel_left, y, sara_address, 10) - 4
+    y = page.textBlock(panel_left, y, 'PATTS: {}'.format(patts), 10)
+    y = page.textBlock(panel_left, y, 'Chemical: {}'.format(chem_info), 10) - 4
+    risk_radii_info = ''.join(['{}-{}; '.format(distance, rings.units) for distance in rings.distances])
+    y = page.textBlock(panel_left, y, 'Risk Radii Distances: {}'.format(risk_radii_info), 9) - 10
+
+    # legend
+    y = page.textBlock(panel_left, y, 'Legend', 11, True) - 2
+    page.polygon([(panel_left + 6, y + 7), (panel_left + 1, y - 2), (panel_left + 11, y - 2)], fill=site_colour, stroke=black, stroke_width=0.5)
+    page.text(panel_left + 18, y, 'SARA Facility', 9)
+    y -= 14
+    page.rectangle(panel_left, y - 2, 12, 9, fill=ring_colours[0], stroke=ring_outline, stroke_width=0.75)
+    page.text(panel_left + 18, y, 'Risk Radii', 9)
+    y -= 14
+    for layer_name in sorted(layer_colours):
+        page.circle(panel_left + 6, y + 2.5, 3, fill=layer_colours[layer_name], stroke=white, stroke_width=0.5)
+        page.text(panel_left + 18, y, layer_name.replace('_', ' '), 9)
+        y -= 12
+    # end for
+
+    # map details and disclaimer at the bottom of the panel
+    map_date = map_date or datetime.date.today()
+    # metres on the ground for each metre on the page
+    scale = int(round(rings.map_unit_meters / points_per_unit * 72.0 / 0.0254, -2))
+    details = ['Date: {}'.format(map_date.strftime("%m-%d-%Y")), prepared_by, 'Scale: 1:{:,}'.format(scale), projection_text]
+    disclaimer_lines = wrapText(disclaimer_text, 6.5, panel_width)
+    y = map_frame[1] + len(disclaimer_lines) * 8 + len(details) * 11 + 6
+    for line in details:
+        page.text(panel_left, y, line, 8)
+        y -= 11
+    # end for
+    y -= 6
+    for line in disclaimer_lines:
+        page.text(panel_left, y, line, 6.5, colour=grey)
+        y -= 8
+    # end for
+    return page
+
+def escapeXml(text):
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+    # characters outside ASCII as character references
+    return ''.join([c if ord(c) < 128 else '&#{};'.format(ord(c)) for c in text])
+
+def svgColour(colour):
+    return 'none' if colour is None else '#{:02x}{:02x}{:02x}'.format(*[int(round(value * 255)) for value in colour])
+
+def writeSvg(page, svg_file):
+    """Write the map page to an SVG file"""
+    elements = ['<svg xmlns="http://www.w3.org/2000/svg" width="{0}pt" height="{1}pt" viewBox="0 0 {0} {1}">'.format(page_width, page_height),
+                '<rect width="100%" height="100%" fill="#ffffff"/>']
+    for kind, geometry, style in page.shapes:
+        if kind == 'text':
+            x, y, text = geometry
+            elements.append('<text x="{:.2f}" y="{:.2f}" font-family="Helvetica, Arial, sans-serif" font-size="{}" font-weight="{}" text-anchor="{}" fill="{}">{}</text>'.format(
+                x, page_height - y, style['size'], 'bold' if style['bold'] else 'normal', style['anchor'], svgColour(style['colour']), escapeXml(text)))
+            continue
+        paint = 'fill="{}" stroke="{}" stroke-width="{}"'.format(svgColour(style['fill']), svgColour(style['stroke']), style['stroke_width'])
+        if kind == 'circle':
+            x, y, radius = geometry
+            elements.append('<circle cx="{:.2f}" cy="{:.2f}" r="{:.2f}" {}/>'.format(x, page_height - y, radius, paint))
+        else:
+            points = ' '.join(['{:.2f},{:.2f}'.format(x, page_height - y) for x, y in geometry])
+            elements.append('<{} points="{}" {}/>'.format('polygon' if kind == 'polygon' else 'polyline', points, paint))
+    # end for
+    elements.append('</svg>')
+    with open(svg_file, 'w') as f:
+        f.write('\n'.join(elements))
+
+def pdfString(text):
+    """Return text as a PDF string literal"""
+    return '({})'.format(text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)'))
+
+def pdfPath(kind, geometry):
+    """Return PDF path operators for a circle, polygon, or line"""
+    if kind == 'circle':
+        x, y, r = geometry
+        # four Bezier curves approximate a circle
+        k = 0.5523 * r
+        return ('{0:.2f} {1:.2f} m {2:.2f} {3:.2f} {4:.2f} {5:.2f} {6:.2f} {7:.2f} c {8:.2f} {9:.2f} {10:.2f} {11:.2f} {12:.2f} {13:.2f} c '
+                '{14:.2f} {15:.2f} {16:.2f} {17:.2f} {18:.2f} {19:.2f} c {20:.2f} {21:.2f} {22:.2f} {23:.2f} {0:.2f} {1:.2f} c h').format(
+                    x + r, y, x + r, y + k, x + k, y + r, x, y + r, x - k, y + r, x - r, y + k, x - r, y,
+                    x - r, y - k, x - k, y - r, x, y - r, x + k, y - r, x + r, y - k)
+    path = ['{:.2f} {:.2f} {}'.format(x, y, 'm' if index == 0 else 'l') for index, (x, y) in enumerate(geometry)]
+    if kind == 'polygon':
+        path.append('h')
+    return ' '.join(path)
+
+def writePdf(page, pdf_file):
+    """Write the map page to a PDF file"""
+    content = []
+    for kind, geometry, style in page.shapes:
+        if kind == 'text':
+            x, y, text = geometry
+            width = textWidth(text, style['size'], style['bold'])
+            if style['anchor'] == 'middle':
+                x -= width / 2.0
+            elif style['anchor'] == 'end':
+                x -= width
+            content.append('{:.3f} {:.3f} {:.3f} rg BT /{} {} Tf {:.2f} {:.2f} Td {} Tj ET'.format(
+                style['colour'][0], style['colour'][1], style['colour'][2], 'F2' if style['bold'] else 'F1', style['size'], x, y, pdfString(text)))
+            continue
+        operators = []
+        if style['fill'] is not None:
+            operators.append('{:.3f} {:.3f} {:.3f} rg'.format(*style['fill']))
+        if style['stroke'] is not None:
+            operators.append('{:.3f} {:.3f} {:.3f} RG {} w'.format(style['stroke'][0], style['stroke'][1], style['stroke'][2], style['stroke_width']))
+        operators.append(pdfPath(kind, geometry))
+        # fill and stroke, fill only, or stroke only
+        if style['fill'] is not None and style['stroke'] is not None:
+            operators.append('B')
+        elif style['fill'] is not None:
+            operators.append('f')
+        else:
+            operators.append('S')
+        content.append(' '.join(operators))
+    # end for
+    stream = '\n'.join(content).encode('latin-1', 'replace')
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {} {}] /Contents 4 0 R /Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> >>'.format(int(page_width), int(page_height)).encode('latin-1'),
+        '<< /Length {} >>\nstream\n'.format(len(stream)).encode('latin-1') + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>'
+    ]
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects):
+        offsets.append(len(pdf))
+        pdf += '{} 0 obj\n'.format(number + 1).encode('latin-1') + body + b'\nendobj\n'
+    # end for
+    xref = len(pdf)
+    pdf += 'xref\n0 {}\n0000000000 65535 f \n'.format(len(objects) + 1).encode('latin-1')
+    pdf += b''.join(['{:010d} 00000 n \n'.format(offset).encode('latin-1') for offset in offsets])
+    pdf += 'trailer\n<< /Size {} /Root 1 0 R >>\nstartxref\n{}\n%%EOF\n'.format(len(objects) + 1, xref).encode('latin-1')
+    with open(pdf_file, 'wb') as f:
+        f.write(pdf)
+
+def writePng(page, png_file, dpi=150):
+    """Write the map page to a PNG file (requires matplotlib)"""
+    if matplotlib is None:
+        raise ImportError('matplotlib is required to create png maps')
+    figure = pyplot.figure(figsize=(page_width / 72.0, page_height / 72.0), dpi=dpi)
+    try:
+        axes = figure.add_axes([0, 0, 1, 1])
+        axes.set_xlim(0, page_width)
+        axes.set_ylim(0, page_height)
+        axes.axis('off')
+        for kind, geometry, style in page.shapes:
+            if kind == 'text':
+                x, y, text = geometry
+                axes.text(x, y, text, fontsize=style['size'], fontweight='bold' if style['bold'] else 'normal', ha={'start': 'left', 'middle': 'center', 'end': 'right'}[style['anchor']],
+                          va='baseline', color=style['colour'], family='sans-serif')
+                continue
+            options = {'facecolor': style['fill'] or 'none', 'edgecolor': style['stroke'] or 'none', 'linewidth': style['stroke_width']}
+            if kind == 'circle':
+                axes.add_patch(patches.Circle(geometry[:2], geometry[2], **options))
+            else:
+                axes.add_patch(patches.Polygon(geometry, closed=kind == 'polygon', **options))
+        # end for
+        figure.savefig(png_file, dpi=dpi)
+    finally:
+        pyplot.close(figure)
+
+def renderSaraMap(rings, sara_name, sara_address, patts, chem_info, output_dir, formats=('pdf',), facilities=(), map_date=None):
+    """Draw the SARA risk radius map and return the files created
+
+       formats = any of 'pdf', 'svg', and 'png'
+       Other options are described in layoutSaraMap.
+    """
+    map_date = map_date or datetime.date.today()
+    page = layoutSaraMap(rings, sara_name, sara_address, patts, chem_info, facilities, map_date)
+    # same file name as the map document export
+    base_name = os.path.join(output_dir, '{} Risk Radius Map {}'.format(sara_name, map_date.strftime("%m-%d-%Y")))
+    writers = {'pdf': writePdf, 'svg': writeSvg, 'png': writePng}
+    map_files = []
+    for map_format in formats:
+        map_file = '{}.{}'.format(base_name, map_format)
+        writers[map_format](page, map_file)
+        map_files.append(map_file)
+    # end for
+    return map_files
+
+def renderJob(job):
+    """Draw one map from a dictionary of renderSaraMap arguments"""
+    return renderSaraMap(**job)
+
+def renderMaps(jobs, workers=None):
+    """Draw maps at the same time in worker processes and return the files created for each
+
+       jobs = list of dictionaries of renderSaraMap arguments
+    """
+    if not workers:
+        workers = max(1, min(len(jobs), multiprocessing.cpu_count()))
+    if workers == 1:
+        return [renderJob(job) for job in jobs]
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        return pool.map(renderJob, jobs)
+    finally:
+        pool.close()
+        pool.join()
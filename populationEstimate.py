@@ -9,11 +9,28 @@
 #
 #              The SARA risk radii layer is created in the previous module wihtin SARAReportTool.py (riskRadius.py)
 #
+#              Before clipping, a saved spatial index of the Census block envelopes (spatialIndex.py) is used to limit the Census blocks to
+#              those within the envelope of the largest risk radius.  With the reference data cache (dataCache.py), the envelopes are read
+#              from the Census block snapshot instead.
+#
+#              In nested-ring mode the Census blocks are clipped once to the largest risk radius, which is its estimate, and each smaller
+#              risk radius is clipped from that working set, so N risk radii take N clips.  The population and households between each
+#              pair of risk radii (annulus) are also written to the text file.
+#
+#              In single-pass mode each clipped layer is read once and the area ratio, population, and households are totalled in memory
+#              (with NumPy), rather than adding fields and creating summary tables.
+#
+#              In streaming mode the Census blocks near the risk radii are clipped in fixed-size batches to memory, and only running totals
+#              for each risk radius are kept, so memory and disk use stay the same for county or statewide Census blocks and large risk radii.
+#
+#              The Census population surface (populationSurface.py) estimates each risk radius in milliseconds.  Its estimate can be
+#              written next to the Census block estimate with the difference between them, or used in place of clipping the Census blocks.
+#
 # Author:      Patrick McKinney
 #
 # Created:     03/16/2016
 #
-# Updated:     5/13/2019
+# Updated:     10/18/2026
 #
 # Copyright:   (c) Cumberland County GIS 2019
 #
@@ -26,7 +43,10 @@
 #-----------------------------------------------------------------------------------------------------------------------------------------------------------#
 
 # Import modules
-import arcpy, os, errorLogger
+import arcpy, os, numpy, errorLogger, spatialIndex, dataCache, runProfile, riskRings, populationSurface
+
+# number of Census blocks clipped at a time in streaming mode
+stream_batch_size = 5000
 
 def updateProportionalValues(field_name, field_type, layer, message, calc_field):
     """add fields and calculate values for those created fields"""
@@ -41,70 +61,282 @@ def createSummaryTable(gdb, base_layer, table_name, summary_field, layer, messag
     arcpy.Statistics_analysis(layer, out_table, stats_fields)
     return out_table
 
-def estimateCensusPopulation(riskRadius, patts_id, output_dir, output_gdb, results_text_file):
-    """Calculate estimated population within each risk radius"""
+def summarizeClippedBlocks(clip_output_layer, output_gdb, output_layer_name, message_text):
+    """Calculate the proportional population and households for a layer of clipped Census blocks"""
+    # Add field to hold clip area to original area ratio
+    area_ratio_field_name = 'AREARATIO'
+    area_ratio_field_type = 'DOUBLE'
+    # Execut Add Field tool
+    arcpy.AddField_management(clip_output_layer, area_ratio_field_name, area_ratio_field_type)
+    # Calculate the new area to old area ratio for each Census Block
+    area_ratio_field_expression = '!Shape_Area! / !ORAREA!'
+    arcpy.CalculateField_management(clip_output_layer, 'AREARATIO', area_ratio_field_expression, 'PYTHON_9.3')
+    # Add field for Estimated Population and calculate value
+    updateProportionalValues('ESTPOP', 'LONG', clip_output_layer, message_text, 'POP10')
+    # Add field for Estimated Households and calculate value
+    updateProportionalValues('ESTHOUSEHOLDS', 'LONG', clip_output_layer, message_text, 'HOUSING10')
+    # create summary table for Estimated Population
+    est_pop_table = createSummaryTable(output_gdb, output_layer_name,'Sum_Population', 'ESTPOP', clip_output_layer, message_text)
+    # create summary table for Estimated Housholds
+    est_households_table = createSummaryTable(output_gdb, output_layer_name, 'Sum_Households', 'ESTHOUSEHOLDS' , clip_output_layer, message_text)
+    # read sums from summary tables
+    population = 0
+    with arcpy.da.SearchCursor(est_pop_table, ['SUM_ESTPOP']) as pop_cursor:
+        for line in pop_cursor:
+            population = int(line[0] or 0)
+    households = 0
+    with arcpy.da.SearchCursor(est_households_table, ['SUM_ESTHOUSEHOLDS']) as households_cursor:
+        for line in households_cursor:
+            households = int(line[0] or 0)
+    return population, households
+
+def aggregateClippedBlocks(clip_output_layer):
+    """Calculate the proportional population and households for a layer of clipped Census blocks in a single pass
+
+       Each block's estimate is rounded to a whole number before summing, as the LONG fields in summarizeClippedBlocks are.
+    """
+    fields = ['SHAPE@AREA', 'ORAREA', 'POP10', 'HOUSING10']
+    blocks = arcpy.da.FeatureClassToNumPyArray(clip_output_layer, fields, null_value=0)
+    if len(blocks) == 0:
+        return 0, 0
+    # ratio of clipped area to original area
+    original_area = blocks['ORAREA'].astype('float64')
+    area_ratio = numpy.where(original_area > 0, blocks['SHAPE@AREA'] / numpy.where(original_area > 0, original_area, 1), 0)
+    population = numpy.floor(blocks['POP10'] * area_ratio + 0.5).sum()
+    households = numpy.floor(blocks['HOUSING10'] * area_ratio + 0.5).sum()
+    return int(population), int(households)
+
+def streamRingPopulations(census_blocks, candidate_blocks, risk_radii, nested_rings=False, batch_size=None):
+    """Return the estimated population and households within each risk radius, clipping the Census blocks in batches
+
+       Each batch of Census blocks is clipped to memory, its estimates are added to running totals for each risk radius, and the clipped
+       blocks are deleted before the next batch.  Each block's estimate is rounded before summing (aggregateClippedBlocks), so the totals
+       are the same as clipping every Census block at once.
+
+       candidate_blocks = OBJECTIDs of the Census blocks near the risk radii
+       risk_radii = (OBJECTID, PATTS, BUFFDIST, UNITS) of each risk radius in the 'Buffer Layer' feature layer
+       batch_size = number of Census blocks clipped at a time (stream_batch_size by default)
+    """
+    if not risk_radii:
+        return []
+    batch_size = batch_size or stream_batch_size
+    totals = dict((row[0], [0, 0]) for row in risk_radii)
+    outer_ring = max(risk_radii, key=lambda row: row[2])
+    batch_count = (len(candidate_blocks) + batch_size - 1) // batch_size
+    for batch_number, start in enumerate(range(0, len(candidate_blocks), batch_size)):
+        arcpy.MakeFeatureLayer_management(census_blocks, 'Census Block Batch', spatialIndex.oidWhereClause(census_blocks, candidate_blocks[start:start + batch_size]))
+        clip_input_layer = 'Census Block Batch'
+        if nested_rings:
+            # clip the batch once to the largest risk radius, which is also the estimate for the largest risk radius, and each smaller
+            # risk radius from the clipped batch
+            arcpy.SelectLayerByAttribute_management('Buffer Layer', 'NEW_SELECTION', "OBJECTID = {}".format(outer_ring[0]))
+            clip_input_layer = arcpy.Clip_analysis('Census Block Batch', 'Buffer Layer', r'in_memory\Census_Block_Batch_Largest_Risk_Radius')
+        for row in risk_radii:
+            if nested_rings and row[0] == outer_ring[0]:
+                clip_output_layer = clip_input_layer
+            else:
+                arcpy.SelectLayerByAttribute_management('Buffer Layer', 'NEW_SELECTION', "OBJECTID = {}".format(row[0]))
+                clip_output_layer = arcpy.Clip_analysis(clip_input_layer, 'Buffer Layer', r'in_memory\Census_Block_Batch_Clip')
+            population, households = aggregateClippedBlocks(clip_output_layer)
+            totals[row[0]][0] += population
+            totals[row[0]][1] += households
+            if clip_output_layer is not clip_input_layer:
+                arcpy.Delete_management(r'in_memory\Census_Block_Batch_Clip')
+        # end for
+        if nested_rings:
+            arcpy.Delete_management(r'in_memory\Census_Block_Batch_Largest_Risk_Radius')
+        arcpy.Delete_management('Census Block Batch')
+        arcpy.AddMessage('\nClipped Census block batch {} of {}'.format(batch_number + 1, batch_count))
+    # end for
+    return [(row[2], row[3], totals[row[0]][0], totals[row[0]][1]) for row in risk_radii]
+
+def clipOutputLocation(row, output_gdb, single_pass, keep_block_outputs):
+    """Return the layer name and output location of the Census blocks clipped to a risk radius (OBJECTID, PATTS, BUFFDIST, UNITS)"""
+    # Replace . with _ in buffer distance
+    buffer_distance_replace = str(row[2]).replace('.', '_')
+    # Buffer units and distance
+    buffer_append_units = '{}_{}'.format(buffer_distance_replace, row[3])
+    # layer name for results of clip
+    output_layer_name = 'Estimated_Census_Data_PATTS_{}_{}'.format(row[1], buffer_append_units)
+    # clipped Census blocks are only written to the project geodatabase when they are kept
+    if single_pass and not keep_block_outputs:
+        return output_layer_name, r'in_memory\{}'.format(output_layer_name)
+    return output_layer_name, os.path.join(output_gdb, output_layer_name)
+
+def estimateRingPopulations(riskRadius, output_gdb, nested_rings=False, single_pass=False, keep_block_outputs=True, use_cache=False, distances=None, streaming=False):
+    """Return the estimated population and households within each risk radius as a list of (distance, units, population, households)
+
+       distances = only estimate the risk radii with these buffer distances (all risk radii by default)
+       Other options are described in estimateCensusPopulation.
+    """
+    # allow data to be overwritten
+    arcpy.env.overwriteOutput = True
+    # Regional U.S. Census Blocks - clipping feature
+    census_blocks = r'C:\GIS\Geodata.gdb\Regional_Census2010_Blocks_SPS'
+
+    # limit Census blocks to those within the envelope of the largest risk radius
+    radii_extent = arcpy.Describe(riskRadius).extent
+    if use_cache:
+        census_snapshot = dataCache.loadSnapshot(census_blocks)
+        candidate_indexes = census_snapshot.queryEnvelope(radii_extent.XMin, radii_extent.YMin, radii_extent.XMax, radii_extent.YMax)
+        if streaming:
+            # only Census blocks whose envelope is within the largest risk radius of the SARA facility
+            rings = riskRings.fromRiskRadiiLayer(riskRadius)
+            envelopes = census_snapshot.envelopes[candidate_indexes]
+            dx = numpy.maximum(numpy.maximum(envelopes[:, 0] - rings.x, rings.x - envelopes[:, 2]), 0)
+            dy = numpy.maximum(numpy.maximum(envelopes[:, 1] - rings.y, rings.y - envelopes[:, 3]), 0)
+            candidate_indexes = candidate_indexes[numpy.hypot(dx, dy) <= rings.max_radius + 1.0]
+        candidate_blocks = sorted([int(oid) for oid in census_snapshot.oids[candidate_indexes]])
+    else:
+        census_index = spatialIndex.loadIndex(census_blocks)
+        candidate_blocks = census_index.query(radii_extent.XMin, radii_extent.YMin, radii_extent.XMax, radii_extent.YMax)
+    # streaming mode selects the Census blocks one batch at a time
+    if not streaming:
+        arcpy.MakeFeatureLayer_management(census_blocks, 'Census Blocks', spatialIndex.oidWhereClause(census_blocks, candidate_blocks))
+    arcpy.AddMessage('\n{} Census blocks are within the envelope of the risk radii'.format(len(candidate_blocks)))
+
+    # make feature layer for risk radii buffer to enable select by attribute
+    arcpy.MakeFeatureLayer_management(riskRadius, 'Buffer Layer')
+    # fields for risk radius layer
+    riskRadiusFields = ['OBJECTID', 'PATTS', 'BUFFDIST', 'UNITS']
+    # read risk radii into a list so the largest risk radius can be found
+    with arcpy.da.SearchCursor(riskRadius, riskRadiusFields) as cursor:
+        risk_radii = [row for row in cursor if distances is None or row[2] in distances]
+    # end cursor
+    if streaming:
+        ring_estimates = streamRingPopulations(census_blocks, candidate_blocks, risk_radii, nested_rings)
+        for row in risk_radii:
+            arcpy.AddMessage('\nCompleted calculating estimated 2010 U.S. Census Population and Households for PATTS {} risk radius {}-{}'.format(row[1], row[2], row[3]))
+        # end for
+        return ring_estimates
+
+    # layer Census blocks are clipped from for each risk radius
+    clip_input_layer = 'Census Blocks'
+    outer_ring = None
+    if nested_rings and risk_radii:
+        # risk radii are concentric, so every smaller risk radius is within the largest one.  The Census blocks clipped to the largest
+        # risk radius are both its estimate and the working set each smaller risk radius is clipped from
+        outer_ring = max(risk_radii, key=lambda row: row[2])
+        arcpy.SelectLayerByAttribute_management('Buffer Layer', 'NEW_SELECTION', "OBJECTID = {}".format(outer_ring[0]))
+        # Clip US Census Blocks layer to largest risk radius
+        clip_input_layer = arcpy.Clip_analysis('Census Blocks', 'Buffer Layer', clipOutputLocation(outer_ring, output_gdb, single_pass, keep_block_outputs)[1])
+        arcpy.AddMessage('\nCensus blocks clipped to the largest risk radius ({}-{})'.format(outer_ring[2], outer_ring[3]))
+
+    # estimated population and households for each risk radius.  The largest risk radius is estimated last, after the smaller risk
+    # radii are clipped from it
+    estimates = {}
+    for row in [row for row in risk_radii if row is not outer_ring] + ([outer_ring] if outer_ring else []):
+        output_layer_name, clip_output_location = clipOutputLocation(row, output_gdb, single_pass, keep_block_outputs)
+        # Boiler place text for ArcPy message
+        message_text = 'PATTS {} risk radius {}-{}'.format(row[1], row[2], row[3])
+        if row is outer_ring:
+            # already clipped
+            clip_output_layer = clip_input_layer
+        else:
+            # where clause
+            whereClause = "OBJECTID = {}".format(row[0])
+            # select the current record from the buffer layer using OBJECTID
+            # this will set each select by location to be run against the current feature in the buffer layer
+            arcpy.SelectLayerByAttribute_management('Buffer Layer', 'NEW_SELECTION', whereClause)
+            # Clip US Census Blocks layer by SARA Facility record
+            clip_output_layer = arcpy.Clip_analysis(clip_input_layer, 'Buffer Layer', clip_output_location)
+            # Add message that Clip is completed
+            arcpy.AddMessage('\nCensus Blocks clipped for {}'.format(message_text))
+        # calculate estimated population and households
+        if single_pass:
+            population, households = aggregateClippedBlocks(clip_output_layer)
+            if not keep_block_outputs:
+                arcpy.Delete_management(clip_output_location)
+        else:
+            population, households = summarizeClippedBlocks(clip_output_layer, output_gdb, output_layer_name, message_text)
+        estimates[row[0]] = (row[2], row[3], population, households)
+        # Add Message
+        arcpy.AddMessage('\nCompleted calculating estimated 2010 U.S. Census Population and Households for {}'.format(message_text))
+    # end for
+    # estimates in the order of the risk radii layer
+    return [estimates[row[0]] for row in risk_radii]
+
+def differenceText(surface_value, block_value):
+    """Return the difference between a population surface estimate and a Census block estimate as text"""
+    if block_value:
+        return '{:+d}, {:+.1f}%'.format(surface_value - block_value, 100.0 * (surface_value - block_value) / block_value)
+    return '{:+d}'.format(surface_value - block_value)
+
+@runProfile.timedStage
+def estimateCensusPopulation(riskRadius, patts_id, output_dir, output_gdb, results_text_file, nested_rings=False, single_pass=False, keep_block_outputs=True, use_cache=False, results_cache=None,
+                             surface_estimate=False, surface_only=False, streaming=False):
+    """Calculate estimated population within each risk radius, and return the (distance, units, population, households) of each risk radius
+
+       nested_rings = clip the Census blocks once to the largest risk radius and clip each smaller risk radius from that working set.
+                      Estimates for each annulus (a risk radius minus the next smaller risk radius) are also reported.
+       single_pass = read each clipped layer once and total the estimates in memory, in place of adding fields and creating summary tables
+       keep_block_outputs = save the clipped Census blocks for each risk radius to the project geodatabase.  Only used with single_pass.
+       use_cache = find the Census blocks near the risk radii from the Census block snapshot (dataCache.py)
+       results_cache = saved results for the SARA facility (resultsCache.py).  Only risk radii without a saved estimate are calculated,
+                       and their clipped Census blocks are the only ones saved to the project geodatabase.
+       surface_estimate = also report the estimate from the Census population surface (populationSurface.py) and its difference
+                          from the Census block estimate
+       surface_only = estimate from the Census population surface without clipping the Census blocks
+       streaming = clip the Census blocks in batches of stream_batch_size and keep only the totals for each risk radius, for statewide
+                   Census blocks or large risk radii.  No clipped Census blocks are saved to the project geodatabase.
+    """
     try:
-        # allow data to be overwritten
-        arcpy.env.overwriteOutput = True
-        # Regional U.S. Census Blocks - clipping feature
-        census_blocks = r'C:\GIS\Geodata.gdb\Regional_Census2010_Blocks_SPS'
         # placeholder for contents of text file storing estimate population
         text_file_contents = ''
-
-        # make feature layer for risk radii buffer to enable select by attribute
-        arcpy.MakeFeatureLayer_management(riskRadius, 'Buffer Layer')
-        # fields for risk radius layer
-        riskRadiusFields = ['OBJECTID', 'PATTS', 'BUFFDIST', 'UNITS']
-        # Search cursor for SARA Facility Risk Radii
-        with arcpy.da.SearchCursor(riskRadius, riskRadiusFields) as cursor:
-            for row in cursor:
-                # where clause
-                whereClause = "OBJECTID = {}".format(row[0])
-                # select the current record from the buffer layer using OBJECTID
-                # this will set each select by location to be run against the current feature in the buffer layer
-                arcpy.SelectLayerByAttribute_management('Buffer Layer', 'NEW_SELECTION', whereClause)
-                # Replace . with _ in buffer distance
-                buffer_distance_replace = str(row[2]).replace('.', '_')
-                # Buffer units and distance
-                buffer_append_units = '{}_{}'.format(buffer_distance_replace, row[3])
-                # layer name for results of clip
-                output_layer_name = 'Estimated_Census_Data_PATTS_{}_{}'.format(row[1], buffer_append_units)
-                # Boiler place text for ArcPy message
-                message_text = 'PATTS {} risk radius {}-{}'.format(row[1], row[2], row[3])
-                # Clip US Census Blocks layer by SARA Facility record
-                clip_output_layer = arcpy.Clip_analysis(census_blocks, 'Buffer Layer', os.path.join(output_gdb, output_layer_name))
-                # Add message that Clip is completed
-                arcpy.AddMessage('\nCensus Blocks clipped for {}'.format(message_text))
-                # Add field to hold clip area to original area ratio
-                area_ratio_field_name = 'AREARATIO'
-                area_ratio_field_type = 'DOUBLE'
-                # Execut Add Field tool
-                arcpy.AddField_management(clip_output_layer, area_ratio_field_name, area_ratio_field_type)
-                # Calculate the new area to old area ratio for each Census Block
-                area_ratio_field_expression = '!Shape_Area! / !ORAREA!'
-                arcpy.CalculateField_management(clip_output_layer, 'AREARATIO', area_ratio_field_expression, 'PYTHON_9.3')
-                # Add field for Estimated Population and calculate value
-                updateProportionalValues('ESTPOP', 'LONG', clip_output_layer, message_text, 'POP10')
-                # Add field for Estimated Households and calculate value
-                updateProportionalValues('ESTHOUSEHOLDS', 'LONG', clip_output_layer, message_text, 'HOUSING10')
-                # create summary table for Estimated Population
-                est_pop_table = createSummaryTable(output_gdb, output_layer_name,'Sum_Population', 'ESTPOP', clip_output_layer, message_text)
-                # create summary table for Estimated Housholds
-                est_households_table = createSummaryTable(output_gdb, output_layer_name, 'Sum_Households', 'ESTHOUSEHOLDS' , clip_output_layer, message_text)
-                # Add Message
-                arcpy.AddMessage('\nCompleted calculating estimated 2010 U.S. Census Population and Households for {}'.format(message_text))
-                # write estimated population to text file
-                text_file_contents += '\nEstimated 2010 Census population within {}-{} risk radius is '.format(row[2],row[3])
-                with arcpy.da.SearchCursor(est_pop_table, ['SUM_ESTPOP']) as pop_cursor:
-                    for line in pop_cursor:
-                        text_file_contents += '{}\n'.format(int(line[0]))
-                # write estimated households to text file
-                text_file_contents += '\nEstimated 2010 Census households within {}-{} risk radius is '.format(row[2],row[3])
-                with arcpy.da.SearchCursor(est_households_table, ['SUM_ESTHOUSEHOLDS']) as households_cursor:
-                    for line in households_cursor:
-                        text_file_contents += '{}\n'.format(int(line[0]))
+        # estimates from the Census population surface for each risk radius distance
+        surface_estimates = {}
+        if surface_estimate or surface_only:
+            surface = populationSurface.loadSurface()
+            surface_rings = surface.estimateRings(riskRings.fromRiskRadiiLayer(riskRadius))
+            for estimate in surface_rings:
+                surface_estimates[estimate[0]] = estimate
+            # end for
+        # estimated population and households for each risk radius
+        if surface_only:
+            ring_estimates = list(surface_rings)
+            text_file_contents += '\nPopulation and households are estimated from the Census population surface ({} foot cells)\n'.format(surface.cell_size)
+        elif results_cache is None:
+            ring_estimates = estimateRingPopulations(riskRadius, output_gdb, nested_rings, single_pass, keep_block_outputs, use_cache, streaming=streaming)
+        else:
+            with arcpy.da.SearchCursor(riskRadius, ['BUFFDIST', 'UNITS']) as cursor:
+                risk_radii = [row for row in cursor]
+            # end cursor
+            saved_estimates = dict((row, results_cache.ringEstimate(row[0], row[1])) for row in risk_radii)
+            new_distances = [row[0] for row in risk_radii if saved_estimates[row] is None]
+            arcpy.AddMessage('\nUsing saved population estimates for {} of {} risk radii'.format(len(risk_radii) - len(new_distances), len(risk_radii)))
+            if new_distances:
+                new_estimates = estimateRingPopulations(riskRadius, output_gdb, nested_rings, single_pass, keep_block_outputs, use_cache, new_distances, streaming)
+                results_cache.storeRingEstimates(new_estimates)
+                for distance, units, population, households in new_estimates:
+                    saved_estimates[(distance, units)] = (population, households)
+                # end for
+            # estimates in the order of the risk radii layer
+            ring_estimates = [(row[0], row[1]) + tuple(saved_estimates[row]) for row in risk_radii]
+        # next smaller risk radius of each risk radius, for the population and households between them
+        inner_rings = {}
+        if nested_rings:
+            by_distance = sorted(ring_estimates, key=lambda estimate: estimate[0])
+            for inner, outer in zip(by_distance[:-1], by_distance[1:]):
+                inner_rings[outer[0]] = inner
             # end for
-        # end cursor
+        for distance, units, population, households in ring_estimates:
+            # write estimated population to text file
+            text_file_contents += '\nEstimated 2010 Census population within {}-{} risk radius is {}\n'.format(distance,units,population)
+            # write estimated households to text file
+            text_file_contents += '\nEstimated 2010 Census households within {}-{} risk radius is {}\n'.format(distance,units,households)
+            # estimate from the population surface, next to the Census block estimate
+            surface_ring = surface_estimates.get(float(distance))
+            if surface_estimate and not surface_only and surface_ring:
+                text_file_contents += '\nPopulation surface estimate within {}-{} risk radius is {} ({})\n'.format(distance,units,surface_ring[2],differenceText(surface_ring[2], population))
+                text_file_contents += '\nHouseholds surface estimate within {}-{} risk radius is {} ({})\n'.format(distance,units,surface_ring[3],differenceText(surface_ring[3], households))
+                arcpy.AddMessage('\nPopulation surface estimate within {}-{} risk radius is {} ({} from the Census block estimate)'.format(distance,units,surface_ring[2],differenceText(surface_ring[2], population)))
+            # population and households between this risk radius and the next smaller one
+            inner = inner_rings.get(distance)
+            if inner:
+                text_file_contents += '\nEstimated 2010 Census population between {}-{} and {}-{} risk radii is {}\n'.format(inner[0], inner[1], distance, units, population - inner[2])
+                text_file_contents += '\nEstimated 2010 Census households between {}-{} and {}-{} risk radii is {}\n'.format(inner[0], inner[1], distance, units, households - inner[3])
+        # end for
+        return ring_estimates
     # If an error occurs running geoprocessing tool(s) capture error and write message
     # handle error outside of Python system
     except EnvironmentError as e:
@@ -120,7 +352,5 @@ def estimateCensusPopulation(riskRadius, patts_id, output_dir, output_gdb, resul
         try:
             with open(results_text_file, 'a') as f:
                 f.write(str(text_file_contents))
-            if cursor:
-                del cursor
         except:
             arcpy.AddError('\nThere was an error writing the population and households results message to the project text file')
\ No newline at end of file
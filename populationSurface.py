@@ -0,0 +1,273 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Census Population Surface
+#
+# Purpose:     Spread the 2010 Census block population and households over a fine grid once for each version of the Census blocks, so the
+#              population and households within any risk radius can be estimated in milliseconds without clipping the Census blocks.
+#
+# Summary:     Each Census block's population and households are spread over the grid cells it covers in proportion to area, the same way
+#              the AREARATIO estimate in populationEstimate.py is (value x covered area / ORAREA).  The area of each block in each cell is
+#              measured along rows of sample lines through the cell.  The grids and their summed-area tables (the total of every cell below
+#              and to the left of each cell) are saved as NumPy (.npy) files in the cache folder and memory-mapped when loaded.
+#
+#              The estimate for a circle sums the cells fully inside the circle from the summed-area table, one box for each grid row, and
+#              weights each cell on the edge of the circle by the exact share of the cell's area inside the circle.  The estimate differs
+#              from the Census block clip by the rounding of each block, and because the population within an edge cell is treated as
+#              spread evenly over the cell rather than over each block.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, json, shutil, numpy, spatialIndex, dataCache, geometryArrays
+from numpy.lib import format as npy_format
+
+# Regional U.S. Census Blocks
+census_blocks = r'C:\GIS\Geodata.gdb\Regional_Census2010_Blocks_SPS'
+# fields spread over the grid, and the name of each grid
+surface_fields = [('POP10', 'POPULATION'), ('HOUSING10', 'HOUSEHOLDS')]
+# grid cell size (feet)
+cell_size = 50
+# sample lines through each row of cells when measuring the area of a block in each cell
+row_samples = 4
+# surfaces already loaded in this process
+loaded_surfaces = {}
+
+class PopulationSurface(object):
+    """Population and household grids and their summed-area tables"""
+    def __init__(self, folder, metadata):
+        self.folder = folder
+        self.xmin = metadata['xmin']
+        self.ymin = metadata['ymin']
+        self.cell_size = metadata['cell_size']
+        self.rows = metadata['rows']
+        self.columns = metadata['columns']
+        self.grids = dict((name, numpy.load(os.path.join(folder, '{}.npy'.format(name)), mmap_mode='r')) for field, name in surface_fields)
+        self.tables = dict((name, numpy.load(os.path.join(folder, 'SAT_{}.npy'.format(name)), mmap_mode='r')) for field, name in surface_fields)
+
+    def boxTotal(self, name, row_start, row_end, column_start, column_end):
+        """Return the total of the cells in rows row_start to row_end - 1 and columns column_start to column_end - 1 (arrays allowed)"""
+        table = self.tables[name]
+        return table[row_end, column_end] - table[row_start, column_end] - table[row_end, column_start] + table[row_start, column_start]
+
+    def circleTotals(self, x, y, radius):
+        """Return the estimated total of each grid within a circle as a dictionary"""
+        totals = dict((name, 0.0) for field, name in surface_fields)
+        size = float(self.cell_size)
+        first_row = max(int(numpy.floor((y - radius - self.ymin) / size)), 0)
+        last_row = min(int(numpy.floor((y + radius - self.ymin) / size)), self.rows - 1)
+        if radius <= 0 or first_row > last_row:
+            return totals
+        rows = numpy.arange(first_row, last_row + 1)
+        # bottom and top of each row, from the centre of the circle
+        bottom = self.ymin + rows * size - y
+        top = bottom + size
+        # half the width of the circle across the whole row (cells fully inside), and at its widest in the row (cells touched)
+        inner_width = numpy.sqrt(numpy.maximum(radius * radius - numpy.maximum(bottom * bottom, top * top), 0.0))
+        nearest = numpy.where((bottom <= 0) & (top >= 0), 0.0, numpy.minimum(bottom * bottom, top * top))
+        outer_width = numpy.sqrt(numpy.maximum(radius * radius - nearest, 0.0))
+        centre = (x - self.xmin) / size
+        # cells fully inside the circle are summed from the summed-area table
+        full_start = numpy.clip(numpy.ceil(centre - inner_width / size), 0, self.columns).astype('int64')
+        full_end = numpy.clip(numpy.floor(centre + inner_width / size), 0, self.columns).astype('int64')
+        has_full = full_end > full_start
+        # the other cells the circle touches, at each end of the full cells, are weighted by the share of the cell inside the circle
+        touched_start = numpy.clip(numpy.floor(centre - outer_width / size), 0, self.columns).astype('int64')
+        touched_end = numpy.clip(numpy.floor(centre + outer_width / size) + 1, 0, self.columns).astype('int64')
+        left_end = numpy.where(has_full, full_start, touched_end)
+        right_start = numpy.where(has_full, full_end, touched_end)
+        edge_rows, edge_columns = cellRanges(numpy.concatenate([rows, rows]), numpy.concatenate([touched_start, right_start]),
+                                             numpy.concatenate([left_end, touched_end]))
+        cell_x = self.xmin + edge_columns * size - x
+        cell_y = self.ymin + edge_rows * size - y
+        weights = (circleRectangleArea(cell_x, cell_y, cell_x + size, cell_y + size, radius) / (size * size)).clip(0.0, 1.0)
+        for field, name in surface_fields:
+            full = numpy.where(has_full, self.boxTotal(name, rows, rows + 1, full_start, numpy.maximum(full_end, full_start)), 0.0)
+            partial = self.grids[name][edge_rows, edge_columns] * weights
+            totals[name] = float(full.sum() + partial.sum())
+        # end for
+        return totals
+
+    def estimateRings(self, rings):
+        """Return the (distance, units, population, households) within each risk ring (riskRings.py), rounded to whole numbers"""
+        estimates = []
+        for distance, radius in zip(rings.distances, rings.radii):
+            totals = self.circleTotals(rings.x, rings.y, float(radius))
+            estimates.append((distance, rings.units, int(round(totals['POPULATION'])), int(round(totals['HOUSEHOLDS']))))
+        # end for
+        return estimates
+
+def cellRanges(rows, starts, ends):
+    """Return the row and column of every cell in the column ranges starts to ends - 1 of each row"""
+    counts = numpy.maximum(ends - starts, 0)
+    offsets = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    return numpy.repeat(rows, counts), numpy.repeat(starts, counts) + offsets
+
+def cornerArea(x, y, radius):
+    """Return the area of a circle centred on the origin within the rectangle from the origin to (x, y), negative when x or y is"""
+    a = numpy.minimum(numpy.abs(x), radius)
+    b = numpy.abs(y)
+    # the circle's edge is above b from the y axis to crossing
+    crossing = numpy.sqrt(numpy.maximum(radius * radius - b * b, 0.0))
+    def integral(t):
+        # area under the circle's edge from the y axis to t
+        return 0.5 * (t * numpy.sqrt(numpy.maximum(radius * radius - t * t, 0.0)) + radius * radius * numpy.arcsin(t / radius))
+    area = numpy.minimum(b, radius) * numpy.minimum(a, crossing) + integral(a) - integral(numpy.minimum(a, crossing))
+    return numpy.sign(x) * numpy.sign(y) * area
+
+def circleRectangleArea(x1, y1, x2, y2, radius):
+    """Return the area of a circle centred on the origin within each rectangle from (x1, y1) to (x2, y2)"""
+    return cornerArea(x2, y2, radius) - cornerArea(x1, y2, radius) - cornerArea(x2, y1, radius) + cornerArea(x1, y1, radius)
+
+def surfaceFolder(feature_class, signature, size):
+    """Return the cache folder for the surface of a version of the Census blocks"""
+    return os.path.join(spatialIndex.cache_dir, '{}_Surface_{}ft'.format(os.path.basename(feature_class), size), '{}_{}'.format(*signature))
+
+def blockCoverage(xy, part_offsets, feature_parts, xmin, ymin, size):
+    """Return the first row and column, and the fraction of each cell's area covered, for the cells a polygon's envelope crosses"""
+    starts, ends, features = geometryArrays.segments(xy, part_offsets, feature_parts)
+    first_row = int(numpy.floor((xy[:, 1].min() - ymin) / size))
+    last_row = int(numpy.floor((xy[:, 1].max() - ymin) / size))
+    first_column = int(numpy.floor((xy[:, 0].min() - xmin) / size))
+    last_column = int(numpy.floor((xy[:, 0].max() - xmin) / size))
+    coverage = numpy.zeros((last_row - first_row + 1, last_column - first_column + 2))
+    # horizontal sample lines through each row of cells
+    sample_rows = numpy.repeat(numpy.arange(first_row, last_row + 1), row_samples)
+    sample_y = ymin + (sample_rows + (numpy.tile(numpy.arange(row_samples), last_row - first_row + 1) + 0.5) / row_samples) * size
+    # where each sample line crosses each polygon edge
+    y1 = starts[:, 1][numpy.newaxis, :]
+    y2 = ends[:, 1][numpy.newaxis, :]
+    line_y = sample_y[:, numpy.newaxis]
+    crosses = (y1 <= line_y) != (y2 <= line_y)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        crossing_x = starts[:, 0] + (line_y - y1) * (ends[:, 0] - starts[:, 0]) / (y2 - y1)
+    crossing_x = numpy.sort(numpy.where(crosses, crossing_x, numpy.inf), axis=1)
+    if crossing_x.shape[1] % 2:
+        crossing_x = numpy.hstack([crossing_x, numpy.full((len(crossing_x), 1), numpy.inf)])
+    # inside the polygon between each pair of crossings (holes are outside by the even-odd rule)
+    span_start = crossing_x[:, 0::2]
+    span_end = crossing_x[:, 1::2]
+    valid = numpy.isfinite(span_start) & numpy.isfinite(span_end)
+    line_index, pair_index = numpy.nonzero(valid)
+    if len(line_index) == 0:
+        return first_row, first_column, coverage[:, :-1]
+    local_rows = sample_rows[line_index] - first_row
+    start = (span_start[line_index, pair_index] - xmin) / size - first_column
+    end = (span_end[line_index, pair_index] - xmin) / size - first_column
+    weight = 1.0 / row_samples
+    # full cells in each span, added as +1 at the first cell and -1 after the last cell and summed along the row
+    full_start = numpy.ceil(start).astype('int64')
+    full_end = numpy.floor(end).astype('int64')
+    has_full = full_end > full_start
+    runs = numpy.zeros(coverage.shape)
+    numpy.add.at(runs, (local_rows[has_full], full_start[has_full]), weight)
+    numpy.add.at(runs, (local_rows[has_full], full_end[has_full]), -weight)
+    coverage += numpy.cumsum(runs, axis=1)
+    # partly covered cells at each end of the span
+    start_cell = numpy.floor(start).astype('int64')
+    end_cell = numpy.floor(end).astype('int64')
+    same_cell = start_cell == end_cell
+    numpy.add.at(coverage, (local_rows, start_cell), numpy.where(same_cell, end - start, numpy.minimum(full_start, end) - start) * weight)
+    end_part = ~same_cell & (end_cell >= full_start)
+    numpy.add.at(coverage, (local_rows[end_part], end_cell[end_part]), (end - full_end)[end_part] * weight)
+    return first_row, first_column, coverage[:, :-1]
+
+def buildSurface(feature_class, snapshot, folder, size):
+    """Spread the Census block population and households over a grid and save the grids and summed-area tables to a cache folder"""
+    arcpy.AddMessage('\nCreating the Census population surface ({} foot cells)'.format(size))
+    envelopes = numpy.asarray(snapshot.envelopes)
+    xmin = numpy.floor(numpy.nanmin(envelopes[:, 0]) / size) * size
+    ymin = numpy.floor(numpy.nanmin(envelopes[:, 1]) / size) * size
+    columns = int(numpy.ceil((numpy.nanmax(envelopes[:, 2]) - xmin) / size)) + 1
+    rows = int(numpy.ceil((numpy.nanmax(envelopes[:, 3]) - ymin) / size)) + 1
+
+    temp_folder = '{}_{}.tmp'.format(folder, os.getpid())
+    if os.path.exists(temp_folder):
+        shutil.rmtree(temp_folder)
+    os.makedirs(temp_folder)
+    # grids are written straight to disk, so a large region doesn't have to fit in memory
+    grids = dict((name, npy_format.open_memmap(os.path.join(temp_folder, '{}.npy'.format(name)), mode='w+', dtype='float32', shape=(rows, columns)))
+                 for field, name in surface_fields)
+    original_area = numpy.asarray(snapshot.columns['ORAREA'], dtype='float64')
+    values = dict((name, numpy.asarray(snapshot.columns[field], dtype='float64')) for field, name in surface_fields)
+    for position in range(len(snapshot)):
+        if numpy.isnan(envelopes[position, 0]) or not original_area[position] > 0:
+            continue
+        if not any([values[name][position] for field, name in surface_fields]):
+            continue
+        xy, part_offsets, feature_parts = snapshot.featureGeometry([position])
+        first_row, first_column, coverage = blockCoverage(xy, part_offsets, feature_parts, xmin, ymin, size)
+        # share of the block in each cell, as the clipped area / ORAREA ratio
+        area_ratio = coverage * (size * size) / original_area[position]
+        rows_slice = slice(first_row, first_row + coverage.shape[0])
+        columns_slice = slice(first_column, first_column + coverage.shape[1])
+        for field, name in surface_fields:
+            if values[name][position]:
+                grids[name][rows_slice, columns_slice] += (area_ratio * values[name][position]).astype('float32')
+        # end for
+    # end for
+
+    # summed-area tables, one row at a time, with a row and column of zeros before the first cell
+    for field, name in surface_fields:
+        table = npy_format.open_memmap(os.path.join(temp_folder, 'SAT_{}.npy'.format(name)), mode='w+', dtype='float64', shape=(rows + 1, columns + 1))
+        table[0, :] = 0
+        table[:, 0] = 0
+        for row in range(rows):
+            table[row + 1, 1:] = table[row, 1:] + numpy.cumsum(grids[name][row], dtype='float64')
+        # end for
+        totals = float(table[rows, columns])
+        table.flush()
+        del table
+        arcpy.AddMessage('\nPopulation surface {} total is {}'.format(name.lower(), int(round(totals))))
+    # end for
+    for grid in grids.values():
+        grid.flush()
+    del grids
+    metadata = {'source': feature_class, 'snapshot': snapshot.folder, 'xmin': float(xmin), 'ymin': float(ymin), 'cell_size': size,
+                'rows': rows, 'columns': columns, 'row_samples': row_samples}
+    with open(os.path.join(temp_folder, 'surface.json'), 'w') as f:
+        json.dump(metadata, f)
+    try:
+        os.rename(temp_folder, folder)
+    except OSError:
+        # another process finished the same surface first
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+def loadSurface(feature_class=census_blocks, size=cell_size):
+    """Load the population surface for the current version of the Census blocks, building it if needed"""
+    signature = spatialIndex.dataSignature(feature_class)
+    key = (feature_class, size, signature)
+    if key in loaded_surfaces:
+        return loaded_surfaces[key]
+    folder = surfaceFolder(feature_class, signature, size)
+    if not os.path.exists(os.path.join(folder, 'surface.json')):
+        snapshot = dataCache.loadSnapshot(feature_class, ['POP10', 'HOUSING10', 'ORAREA'])
+        try:
+            os.makedirs(os.path.dirname(folder))
+        except OSError:
+            # folder already exists
+            pass
+        buildSurface(feature_class, snapshot, folder, size)
+        dataCache.removeOldSnapshots(folder)
+    with open(os.path.join(folder, 'surface.json')) as f:
+        surface = PopulationSurface(folder, json.load(f))
+    loaded_surfaces.clear()
+    loaded_surfaces[key] = surface
+    return surface
+
+if __name__ == '__main__':
+    # build the population surface after a Census block update, so the first SARA run doesn't have to
+    surface = loadSurface()
+    arcpy.AddMessage('\nPopulation surface has {} rows and {} columns of {} foot cells'.format(surface.rows, surface.columns, surface.cell_size))
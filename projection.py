@@ -0,0 +1,143 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        WGS 1984 to PA State Plane South Projection
+#
+# Purpose:     Project latitude and longitude to NAD 1983 PA State Plane South (feet) (EPSG:2272) and back, in memory, for any number of points.
+#
+# Summary:     The Lambert Conformal Conic (2SP) forward and inverse equations from EPSG Guidance Note 7-2 are applied to NumPy arrays.
+#              Coordinates are treated as NAD 1983, matching the NAD_1983_To_WGS_1984_1 transformation (no datum shift) used by the
+#              Project tool in earlier versions of riskRadius.py.
+#
+#              validateControlPoints() compares the equations against control points computed with PROJ (EPSG:4269 to EPSG:2272)
+#              and the Lambert Conformal Conic example from the EPSG Guidance Note.  All control points agree to within 0.01 feet.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import math, numpy
+
+# meters in a U.S. survey foot
+us_survey_foot = 1200.0 / 3937.0
+
+# NAD 1983 PA State Plane South (feet) - EPSG:2272
+pa_south = {
+    'semi_major_axis': 6378137.0,               # GRS 1980
+    'inverse_flattening': 298.257222101,
+    'standard_parallel_1': 40.0 + 58.0 / 60.0,
+    'standard_parallel_2': 39.0 + 56.0 / 60.0,
+    'latitude_of_origin': 39.0 + 20.0 / 60.0,
+    'central_meridian': -77.75,
+    'false_easting': 600000.0,                  # meters
+    'false_northing': 0.0,
+    'unit': us_survey_foot
+}
+
+# (longitude, latitude, x, y) computed with PROJ from EPSG:4269 to EPSG:2272
+control_points = [
+    (-77.75, 39.3333333333333, 1968500.000, 0.000),
+    (-77.1894, 40.2015, 2125090.837, 316757.879),
+    (-77.0, 40.0, 2178617.684, 243749.735),
+    (-76.8867, 40.2737, 2209383.852, 343739.923),
+    (-75.1652, 39.9526, 2693060.217, 236194.916),
+    (-80.0, 40.44, 1342290.930, 411122.417),
+    (-78.5, 39.75, 1757608.893, 152682.509),
+    (-77.75, 40.96666666666667, 1968500.000, 595020.224)
+]
+
+# Texas South Central (NAD 1927) example from EPSG Guidance Note 7-2, section 3.1.1.1
+epsg_example = {
+    'parameters': {
+        'semi_major_axis': 6378206.4,           # Clarke 1866
+        'inverse_flattening': 294.978698213898,
+        'standard_parallel_1': 28.0 + 23.0 / 60.0,
+        'standard_parallel_2': 30.0 + 17.0 / 60.0,
+        'latitude_of_origin': 27.0 + 50.0 / 60.0,
+        'central_meridian': -99.0,
+        'false_easting': 2000000.0 * us_survey_foot,
+        'false_northing': 0.0,
+        'unit': us_survey_foot
+    },
+    'point': (-96.0, 28.5, 2963503.91, 254759.80)
+}
+
+def coneConstants(parameters):
+    """Return the eccentricity, cone constant (n), mapping radius (a * F), and radius at the latitude of origin"""
+    a = parameters['semi_major_axis']
+    flattening = 1.0 / parameters['inverse_flattening']
+    e = math.sqrt(2 * flattening - flattening * flattening)
+    def m(latitude):
+        return math.cos(latitude) / math.sqrt(1 - e * e * math.sin(latitude) ** 2)
+    def t(latitude):
+        return math.tan(math.pi / 4 - latitude / 2) / ((1 - e * math.sin(latitude)) / (1 + e * math.sin(latitude))) ** (e / 2)
+    lat_1 = math.radians(parameters['standard_parallel_1'])
+    lat_2 = math.radians(parameters['standard_parallel_2'])
+    lat_0 = math.radians(parameters['latitude_of_origin'])
+    n = (math.log(m(lat_1)) - math.log(m(lat_2))) / (math.log(t(lat_1)) - math.log(t(lat_2)))
+    a_f = a * m(lat_1) / (n * t(lat_1) ** n)
+    r_0 = a_f * t(lat_0) ** n
+    return e, n, a_f, r_0
+
+def forward(lon, lat, parameters=pa_south):
+    """Project arrays of longitude and latitude (decimal degrees) to x and y in the units of the coordinate system"""
+    e, n, a_f, r_0 = coneConstants(parameters)
+    latitude = numpy.radians(numpy.asarray(lat, dtype='float64'))
+    longitude = numpy.radians(numpy.asarray(lon, dtype='float64'))
+    sin_lat = numpy.sin(latitude)
+    t = numpy.tan(numpy.pi / 4 - latitude / 2) / ((1 - e * sin_lat) / (1 + e * sin_lat)) ** (e / 2)
+    r = a_f * t ** n
+    theta = n * (longitude - math.radians(parameters['central_meridian']))
+    x = parameters['false_easting'] + r * numpy.sin(theta)
+    y = parameters['false_northing'] + r_0 - r * numpy.cos(theta)
+    return x / parameters['unit'], y / parameters['unit']
+
+def inverse(x, y, parameters=pa_south):
+    """Unproject arrays of x and y in the units of the coordinate system to longitude and latitude (decimal degrees)"""
+    e, n, a_f, r_0 = coneConstants(parameters)
+    easting = numpy.asarray(x, dtype='float64') * parameters['unit'] - parameters['false_easting']
+    northing = r_0 - (numpy.asarray(y, dtype='float64') * parameters['unit'] - parameters['false_northing'])
+    r = numpy.sign(n) * numpy.hypot(easting, northing)
+    theta = numpy.arctan2(numpy.sign(n) * easting, numpy.sign(n) * northing)
+    t = (r / a_f) ** (1 / n)
+    # latitude converges to well below a millimeter within a few iterations
+    latitude = numpy.pi / 2 - 2 * numpy.arctan(t)
+    for iteration in range(10):
+        sin_lat = e * numpy.sin(latitude)
+        latitude = numpy.pi / 2 - 2 * numpy.arctan(t * ((1 - sin_lat) / (1 + sin_lat)) ** (e / 2))
+    longitude = theta / n + math.radians(parameters['central_meridian'])
+    return numpy.degrees(longitude), numpy.degrees(latitude)
+
+def wgs84ToStatePlane(lon, lat):
+    """Project longitude and latitude to PA State Plane South (feet)"""
+    return forward(lon, lat, pa_south)
+
+def statePlaneToWgs84(x, y):
+    """Unproject PA State Plane South (feet) to longitude and latitude"""
+    return inverse(x, y, pa_south)
+
+def validateControlPoints():
+    """Return the largest difference in feet between the equations and the control points (forward and round trip)"""
+    points = numpy.array(control_points)
+    x, y = wgs84ToStatePlane(points[:, 0], points[:, 1])
+    errors = [numpy.hypot(x - points[:, 2], y - points[:, 3]).max()]
+    # round trip back to latitude and longitude, measured in feet
+    lon, lat = statePlaneToWgs84(points[:, 2], points[:, 3])
+    x_round, y_round = wgs84ToStatePlane(lon, lat)
+    errors.append(numpy.hypot(x_round - points[:, 2], y_round - points[:, 3]).max())
+    # EPSG Guidance Note example
+    lon, lat, example_x, example_y = epsg_example['point']
+    x, y = forward(lon, lat, epsg_example['parameters'])
+    errors.append(math.hypot(float(x) - example_x, float(y) - example_y))
+    return max(errors)
@@ -0,0 +1,124 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Vulnerable Facilities Proximity Analysis
+#
+# Purpose:     Find the features in a set of layers that are within the risk radii of a SARA facility, in one pass over each layer.
+#
+# Summary:     The SARA facility location and the risk radius distances are read from the risk radii layer created in riskRadius.py.
+#              Each layer is read once.  The distance from each feature to the SARA facility is calculated (vectorized with NumPy for
+#              point layers), and each feature is assigned to the smallest risk radius that contains it.  The results for all layers are
+#              returned as one table sorted by distance.
+#
+#              Layers can also be read from their snapshot (dataCache.py), in which case no feature layer is read at all.  Lines and
+#              polygons in a snapshot are first tested against simplified copies (generalizedGeometry.py), and only the features near a
+#              boundary are measured at full resolution.
+#
+#              The risk radii are represented analytically (riskRings.py): a feature is within a risk radius when its distance to the
+#              SARA facility is less than or equal to the radius, so no buffer polygons are needed.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, numpy, riskRings, generalizedGeometry
+
+# fields in the proximity results table
+results_dtype = [('LAYER', 'U64'), ('OID', 'i4'), ('BUFFDIST', 'f8'), ('UNITS', 'U16'), ('DISTANCE', 'f8')]
+# test lines and polygons against their generalized tiers before their full-resolution vertices (generalizedGeometry.py)
+use_generalized = True
+
+def snapshotDistances(snapshot, rings):
+    """Return arrays of OBJECTIDs and distances to the SARA facility for features in a layer snapshot within the largest risk radius"""
+    if snapshot.wkid != rings.wkid:
+        raise ValueError('The snapshot of {} is not in the coordinate system of the risk rings (WKID {})'.format(snapshot.source, rings.wkid))
+    candidates = snapshot.queryEnvelope(*rings.envelope())
+    if snapshot.shape_type == 'Point':
+        distances, ring_index = rings.classifyPoints(snapshot.x[candidates], snapshot.y[candidates])
+    elif use_generalized:
+        distances = generalizedGeometry.loadGeneralized(snapshot).featureDistances(rings.x, rings.y, candidates, rings.max_radius)
+        ring_index = rings.ringIndex(distances)
+    else:
+        xy, part_offsets, feature_parts = snapshot.featureGeometry(candidates)
+        distances, ring_index = rings.classifyFeatures(xy, part_offsets, feature_parts, snapshot.shape_type == 'Polygon')
+    oids = numpy.asarray(snapshot.oids[candidates], dtype='i4')
+    within = ring_index < len(rings)
+    return oids[within], distances[within]
+
+def layerDistances(layer, rings, spatial_reference):
+    """Return arrays of OBJECTIDs and distances to the SARA facility for features in a layer within the largest risk radius"""
+    if arcpy.Describe(layer).shapeType == 'Point':
+        # read every point at once and measure distances as arrays
+        points = arcpy.da.FeatureClassToNumPyArray(layer, ['OID@', 'SHAPE@X', 'SHAPE@Y'], spatial_reference=spatial_reference)
+        distances, ring_index = rings.classifyPoints(points['SHAPE@X'], points['SHAPE@Y'])
+        oids = points['OID@']
+    else:
+        # limit lines and polygons to those near the SARA facility, then measure the exact distance to each one
+        site = rings.siteGeometry()
+        arcpy.SelectLayerByLocation_management(layer, 'WITHIN_A_DISTANCE', site, '{} Feet'.format(rings.max_radius))
+        oids = []
+        distances = []
+        with arcpy.da.SearchCursor(layer, ['OID@', 'SHAPE@'], spatial_reference=spatial_reference) as cursor:
+            for row in cursor:
+                oids.append(row[0])
+                distances.append(row[1].distanceTo(site))
+            # end for
+        # end cursor
+        arcpy.SelectLayerByAttribute_management(layer, 'CLEAR_SELECTION')
+        oids = numpy.array(oids, dtype='i4')
+        distances = numpy.array(distances, dtype='f8')
+        ring_index = rings.ringIndex(distances)
+    within = ring_index < len(rings)
+    return oids[within], distances[within]
+
+def findFacilitiesWithinRiskRadii(layers, risk_radii, snapshots=None):
+    """Return a table of the features from each layer within the risk radii, sorted nearest first
+
+       layers = list of layer names to search
+       risk_radii = risk rings (riskRings.py) or the risk radii layer created in riskRadius.py
+       snapshots = optional dictionary of layer name to layer snapshot (dataCache.py) to read in place of the layer
+    """
+    snapshots = snapshots or {}
+    if isinstance(risk_radii, riskRings.RiskRings):
+        rings = risk_radii
+    else:
+        rings = riskRings.fromRiskRadiiLayer(risk_radii)
+    if not len(rings):
+        return numpy.zeros(0, dtype=results_dtype)
+    # results for each layer
+    tables = []
+    spatial_reference = None
+    for layer in layers:
+        if layer in snapshots:
+            oids, distances = snapshotDistances(snapshots[layer], rings)
+        else:
+            if spatial_reference is None:
+                spatial_reference = arcpy.SpatialReference(rings.wkid)
+            oids, distances = layerDistances(layer, rings, spatial_reference)
+        table = numpy.zeros(len(oids), dtype=results_dtype)
+        table['LAYER'] = layer
+        table['OID'] = oids
+        table['BUFFDIST'] = numpy.asarray(rings.distances, dtype='f8')[rings.ringIndex(distances)]
+        table['UNITS'] = rings.units
+        table['DISTANCE'] = distances
+        tables.append(table)
+    # end for
+    results = numpy.concatenate(tables) if tables else numpy.zeros(0, dtype=results_dtype)
+    # nearest features first
+    return results[numpy.argsort(results['DISTANCE'], kind='mergesort')]
+
+def featuresWithinRing(results, layer, buffer_distance):
+    """Return the OBJECTIDs of features from a layer within a risk radius, nearest first"""
+    matches = results[(results['LAYER'] == layer) & (results['BUFFDIST'] <= buffer_distance)]
+    return [int(oid) for oid in matches['OID']]
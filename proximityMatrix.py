@@ -0,0 +1,194 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Proximity Matrix
+#
+# Purpose:     Find the schools, daycares, assisted living, MHIDD, and health and medical sites within each standard risk radius of every
+#              SARA facility in the county at once, rather than running the vulnerable facilities analysis for one facility at a time.
+#
+# Summary:     The SARA facilities and the point vulnerable facility layers are read from their snapshots (dataCache.py).  A KD-tree is
+#              built over each layer and over the SARA facilities (scipy.spatial.cKDTree), and all pairs closer than the largest risk
+#              radius are found in one query for each layer.  Without SciPy, the points are sorted by x and compared in strips.
+#
+#              The result is a sparse table with one row for each SARA facility and vulnerable facility within the largest risk radius:
+#
+#              SARA_OID, PATTS, LAYER, OID, BUFFDIST (smallest risk radius containing the facility), UNITS, DISTANCE (feet)
+#
+#              Usage:  python proximityMatrix.py <output folder> [distances, for example 0.5;1;2;3] [units]
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, csv, datetime, numpy, errorLogger, dataCache, riskRings, vulnerableFacilities, csvFiles
+# optional KD-tree
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# file geodatabase containing the SARA facilities and vulnerable facilities
+geodata_gdb = r'C:\GIS\Geodata.gdb'
+# SARA facilities layer and its PATTS ID field
+sara_feature_class = 'EOC_SARA'
+patts_field = 'PATTS'
+# vulnerable facility layers in the matrix (layer names from vulnerableFacilities.py)
+matrix_layers = ['Schools', 'Daycares', 'Assisted_Living', 'MHIDD', 'Health_Medical']
+# standard risk radii
+standard_distances = [0.5, 1, 2, 3]
+standard_units = 'Miles'
+# number of point pairs compared at a time without SciPy
+block_size = 4000000
+# fields in the proximity matrix
+matrix_dtype = [('SARA_OID', 'i4'), ('PATTS', 'U32'), ('LAYER', 'U64'), ('OID', 'i4'), ('BUFFDIST', 'f8'), ('UNITS', 'U16'), ('DISTANCE', 'f8')]
+
+def pointArrays(snapshot):
+    """Return the OBJECTIDs and an (n, 2) array of coordinates of the points in a snapshot, leaving out features without a location"""
+    xy = numpy.column_stack([snapshot.x, snapshot.y])
+    located = numpy.isfinite(xy).all(axis=1)
+    return numpy.asarray(snapshot.oids, dtype='int64')[located], xy[located]
+
+def treePairs(site_xy, target_xy, max_distance):
+    """Return the site index, target index, and distance of every pair closer than a distance, using KD-trees"""
+    pairs = cKDTree(site_xy).sparse_distance_matrix(cKDTree(target_xy), max_distance, output_type='ndarray')
+    return pairs['i'].astype('int64'), pairs['j'].astype('int64'), pairs['v'].astype('float64')
+
+def stripPairs(site_xy, target_xy, max_distance):
+    """Return the site index, target index, and distance of every pair closer than a distance, comparing points in strips sorted by x"""
+    site_order = numpy.argsort(site_xy[:, 0], kind='mergesort')
+    target_order = numpy.argsort(target_xy[:, 0], kind='mergesort')
+    target_x = target_xy[target_order, 0]
+    site_index = []
+    target_index = []
+    pair_distances = []
+    start = 0
+    while start < len(site_order):
+        # widen the strip of sites until it holds about block_size pairs
+        stop = start + 1
+        while stop < len(site_order):
+            first = numpy.searchsorted(target_x, site_xy[site_order[start], 0] - max_distance, side='left')
+            last = numpy.searchsorted(target_x, site_xy[site_order[stop], 0] + max_distance, side='right')
+            if (stop + 1 - start) * (last - first) > block_size:
+                break
+            stop += 1
+        # end while
+        sites = site_order[start:stop]
+        first = numpy.searchsorted(target_x, site_xy[sites[0], 0] - max_distance, side='left')
+        last = numpy.searchsorted(target_x, site_xy[sites[-1], 0] + max_distance, side='right')
+        targets = target_order[first:last]
+        if len(targets):
+            distances = numpy.hypot(site_xy[sites, 0][:, None] - target_xy[targets, 0][None, :],
+                                    site_xy[sites, 1][:, None] - target_xy[targets, 1][None, :])
+            rows, columns = numpy.nonzero(distances <= max_distance)
+            site_index.append(sites[rows])
+            target_index.append(targets[columns])
+            pair_distances.append(distances[rows, columns])
+        start = stop
+    # end while
+    if not site_index:
+        return numpy.zeros(0, 'int64'), numpy.zeros(0, 'int64'), numpy.zeros(0, 'float64')
+    return numpy.concatenate(site_index), numpy.concatenate(target_index), numpy.concatenate(pair_distances)
+
+def pointPairs(site_xy, target_xy, max_distance):
+    """Return the site index, target index, and distance of every pair of points closer than a distance"""
+    if not len(site_xy) or not len(target_xy):
+        return numpy.zeros(0, 'int64'), numpy.zeros(0, 'int64'), numpy.zeros(0, 'float64')
+    if cKDTree is not None:
+        return treePairs(site_xy, target_xy, max_distance)
+    return stripPairs(site_xy, target_xy, max_distance)
+
+def buildProximityMatrix(distances=None, units=None, layers=None):
+    """Return the proximity matrix of every SARA facility and the vulnerable facilities within the largest risk radius, sorted by SARA
+       facility and distance
+
+       distances = risk radius distances (standard_distances by default)
+       units = units of the risk radius distances (standard_units by default)
+       layers = vulnerable facility layer names (matrix_layers by default).  Only point layers are used.
+    """
+    # risk radii centred on the origin; only the radii are used
+    rings = riskRings.RiskRings(0, 0, distances or standard_distances, units or standard_units)
+    layers = layers or matrix_layers
+    sara_path = os.path.join(geodata_gdb, sara_feature_class)
+    sara_fields = [patts_field] if patts_field in [field.name for field in arcpy.ListFields(sara_path)] else []
+    sara = dataCache.loadSnapshot(sara_path, fields=sara_fields)
+    sara_oids, sara_xy = pointArrays(sara)
+    if sara_fields:
+        located = numpy.isfinite(numpy.column_stack([sara.x, sara.y])).all(axis=1)
+        sara_patts = numpy.asarray(sara.loadArray('FIELD_{}'.format(patts_field)))[located].astype('U32')
+    else:
+        sara_patts = numpy.array([u''] * len(sara_oids), dtype='U32')
+    arcpy.AddMessage('\nFinding vulnerable facilities within {} {} of {} SARA facilities{}'.format(
+        rings.distances[-1], rings.units, len(sara_oids), '' if cKDTree is not None else ' (SciPy is not installed; comparing points in strips)'))
+    tables = []
+    for feature_class, layer_name, clause in vulnerableFacilities.vulnerable_layers:
+        if layer_name not in layers:
+            continue
+        snapshot = dataCache.loadSnapshot(os.path.join(geodata_gdb, feature_class), where_clause=clause)
+        if snapshot.shape_type != 'Point':
+            arcpy.AddWarning('\n{} is not a point layer and is left out of the proximity matrix'.format(layer_name))
+            continue
+        oids, xy = pointArrays(snapshot)
+        site_index, target_index, pair_distances = pointPairs(sara_xy, xy, rings.max_radius)
+        ring_index = rings.ringIndex(pair_distances)
+        table = numpy.zeros(len(site_index), dtype=matrix_dtype)
+        table['SARA_OID'] = sara_oids[site_index]
+        table['PATTS'] = sara_patts[site_index]
+        table['LAYER'] = layer_name
+        table['OID'] = oids[target_index]
+        table['BUFFDIST'] = numpy.asarray(rings.distances)[numpy.minimum(ring_index, len(rings) - 1)]
+        table['UNITS'] = rings.units
+        table['DISTANCE'] = pair_distances
+        tables.append(table)
+        arcpy.AddMessage('\nFound {} {} within the risk radii'.format(len(table), layer_name))
+    # end for
+    matrix = numpy.concatenate(tables) if tables else numpy.zeros(0, dtype=matrix_dtype)
+    # each SARA facility in turn, nearest features first
+    return matrix[numpy.lexsort((matrix['DISTANCE'], matrix['SARA_OID']))]
+
+def writeProximityMatrix(matrix, out_file):
+    """Write the proximity matrix to a csv file"""
+    with csvFiles.openCsvFile(out_file, 'w') as f:
+        writer = csv.writer(f)
+        writer.writerow([field[0] for field in matrix_dtype])
+        for row in matrix.tolist():
+            writer.writerow(row)
+        # end for
+    arcpy.AddMessage('\nWrote {} rows to {}'.format(len(matrix), out_file))
+    return out_file
+
+if __name__ == '__main__':
+    try:
+        # User entered variables from ArcGIS tool
+        # Output directory for the proximity matrix - folder
+        output_dir = arcpy.GetParameterAsText(0)
+        # Distances for risk radii - double, multiple values, optional
+        mrb_distances = arcpy.GetParameterAsText(1)
+        # Risk radius units - string, optional
+        mrb_units = arcpy.GetParameterAsText(2)
+
+        distances = [float(distance) for distance in mrb_distances.replace(',', ';').split(';') if distance.strip()] if mrb_distances else None
+        matrix = buildProximityMatrix(distances, mrb_units or None)
+        out_file = os.path.join(output_dir, 'SARA_Proximity_Matrix_{}.csv'.format(datetime.date.today().strftime("%Y-%m-%d")))
+        writeProximityMatrix(matrix, out_file)
+    # If an error occurs running geoprocessing tool(s) capture error and write message
+    # handle error outside of Python system
+    except EnvironmentError as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
+    # handle exception error
+    except Exception as e:
+        arcpy.AddError('\nAn error occured running this tool. Please provide the GIS Department the following error messages:')
+        # call error logger method
+        errorLogger.PrintException(e)
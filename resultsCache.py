@@ -0,0 +1,211 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Results Cache
+#
+# Purpose:     Keep the population, household, and vulnerable facility results for each SARA facility and risk radius, so running a facility
+#              again with an extra risk radius, or with a corrected name, address, or chemical, only computes what is new.
+#
+# Summary:     Results are saved in a folder named from the SARA facility's PA State Plane South coordinates and the version of the reference
+#              data (the modification time and feature count of each reference layer).  When any reference layer changes, the key changes
+#              and the results are computed again.
+#
+#              population.json holds the estimated population and households for each risk radius distance and units.
+#              facilities.json holds the distance to every vulnerable facility within the largest risk radius computed so far.  Any risk
+#              radius up to that distance is answered from the saved distances.
+#              Batch workers and the analysis service can save results for the same facility at the same time, so each file is read,
+#              updated, and written while holding a lock file (results.lock) in the facility's folder.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import os, time, json, hashlib, contextlib, numpy, spatialIndex, projection, proximityAnalysis, vulnerableFacilities
+
+# change when the layout of the saved results changes
+results_version = 1
+# reference layers the results depend on
+geodata_gdb = r'C:\GIS\Geodata.gdb'
+reference_layers = ['Regional_Census2010_Blocks_SPS', 'Building_Footprints_2008', 'FEMA_Floodplains_2009'] + [layer[0] for layer in vulnerableFacilities.vulnerable_layers]
+# seconds between attempts to take the lock file of a facility's results
+lock_poll_seconds = 0.05
+# seconds after which a lock file is treated as left behind by a stopped process and removed
+lock_timeout = 60
+
+def dataVersion():
+    """Return a value that changes whenever any of the reference layers change"""
+    signatures = []
+    for feature_class in reference_layers:
+        signatures.append('{}:{}:{}'.format(feature_class, *spatialIndex.dataSignature(os.path.join(geodata_gdb, feature_class))))
+    # end for
+    signatures.append('definition queries:{}'.format([layer[2] for layer in vulnerableFacilities.vulnerable_layers]))
+    return hashlib.md5('|'.join(signatures).encode('utf-8')).hexdigest()
+
+def ringKey(distance, units):
+    """Return the key for a risk radius distance and units"""
+    return '{:.6f} {}'.format(float(distance), str(units).upper())
+
+def readJson(json_file, default):
+    try:
+        with open(json_file) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return default
+
+def writeJson(json_file, content):
+    """Write a JSON file so other processes never read a partial file"""
+    temp_file = '{}.{}.tmp'.format(json_file, os.getpid())
+    with open(temp_file, 'w') as f:
+        json.dump(content, f)
+    if os.path.exists(json_file):
+        os.remove(json_file)
+    os.rename(temp_file, json_file)
+
+@contextlib.contextmanager
+def resultsLock(folder):
+    """Hold the lock file of a facility's results folder, so only one process at a time reads, updates, and writes its saved results"""
+    lock_file = os.path.join(folder, 'results.lock')
+    while True:
+        try:
+            lock = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except OSError:
+            try:
+                if time.time() - os.path.getmtime(lock_file) > lock_timeout:
+                    # the process holding the lock stopped before removing it
+                    os.remove(lock_file)
+                    continue
+            except OSError:
+                # the lock was released while it was being checked
+                continue
+            time.sleep(lock_poll_seconds)
+    # end while
+    try:
+        os.write(lock, str(os.getpid()).encode('utf-8'))
+        os.close(lock)
+        yield
+    finally:
+        try:
+            os.remove(lock_file)
+        except OSError:
+            pass
+
+class SiteResults(object):
+    """Saved results for one SARA facility location and version of the reference data"""
+    def __init__(self, folder, x, y):
+        self.folder = folder
+        self.x = x
+        self.y = y
+
+    def ringEstimate(self, distance, units):
+        """Return the saved (population, households) for a risk radius, or None"""
+        estimate = readJson(os.path.join(self.folder, 'population.json'), {}).get(ringKey(distance, units))
+        return tuple(estimate) if estimate else None
+
+    def storeRingEstimates(self, ring_estimates):
+        """Save the (distance, units, population, households) of each risk radius"""
+        population_file = os.path.join(self.folder, 'population.json')
+        with resultsLock(self.folder):
+            saved = readJson(population_file, {})
+            for distance, units, population, households in ring_estimates:
+                saved[ringKey(distance, units)] = [population, households]
+            # end for
+            writeJson(population_file, saved)
+
+    def facilityResults(self, rings):
+        """Return the vulnerable facilities within risk rings (riskRings.py) from the saved distances, or None if the rings are larger"""
+        saved = readJson(os.path.join(self.folder, 'facilities.json'), None)
+        if not saved or saved['radius'] < rings.max_radius:
+            return None
+        rows = [row for row in saved['facilities'] if row[2] <= rings.max_radius]
+        distances = numpy.array([row[2] for row in rows], dtype='f8')
+        ring_index = rings.ringIndex(distances)
+        results = numpy.array([(row[0], row[1], rings.distances[index], rings.units, row[2]) for row, index in zip(rows, ring_index)],
+                              dtype=proximityAnalysis.results_dtype)
+        # nearest features first
+        return results[numpy.argsort(results['DISTANCE'], kind='mergesort')]
+
+    def storeFacilityResults(self, results, rings):
+        """Save the distance to each vulnerable facility within the largest risk radius"""
+        facilities_file = os.path.join(self.folder, 'facilities.json')
+        facilities = [[str(row['LAYER']), int(row['OID']), float(row['DISTANCE'])] for row in results]
+        with resultsLock(self.folder):
+            saved = readJson(facilities_file, None)
+            # keep the larger of the saved and new searches
+            if saved and saved['radius'] >= rings.max_radius:
+                return
+            writeJson(facilities_file, {'radius': rings.max_radius, 'facilities': facilities})
+
+def siteFolder(x, y, version, cache_folder=None):
+    """Return the folder holding the results for a location (PA State Plane South feet, rounded to 0.01) and version of the reference data"""
+    if cache_folder is None:
+        cache_folder = os.path.join(spatialIndex.cache_dir, 'Results')
+    key = hashlib.md5('{}|{:.2f}|{:.2f}|{}'.format(results_version, x, y, version).encode('utf-8')).hexdigest()[:20]
+    return os.path.join(cache_folder, key)
+
+def siteCoordinates(lat, lon):
+    """Return the rounded PA State Plane South coordinates used to key the results of a SARA facility"""
+    x, y = projection.wgs84ToStatePlane(lon, lat)
+    return round(float(x), 2), round(float(y), 2)
+
+def loadSiteResults(lat, lon, cache_folder=None):
+    """Return the saved results for a SARA facility at a latitude and longitude, for the current version of the reference data
+
+       cache_folder = folder holding the results (Results in spatialIndex.cache_dir by default)
+    """
+    x, y = siteCoordinates(lat, lon)
+    version = dataVersion()
+    folder = siteFolder(x, y, version, cache_folder)
+    if not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except OSError:
+            # another process created the folder first
+            pass
+        writeJson(os.path.join(folder, 'site.json'), {'x': x, 'y': y, 'data_version': version, 'results_version': results_version})
+    return SiteResults(folder, x, y)
+
+def carryForwardResults(lat, lon, previous_version, keep_population, keep_facilities, max_radius, cache_folder=None):
+    """Copy the results saved for an earlier version of the reference data to the current version, when the changes to the data
+       did not reach the SARA facility (changeDetection.py).  Return True if any results were copied.
+
+       previous_version = dataVersion() when the results were saved
+       keep_population = copy the population estimates
+       keep_facilities = copy the vulnerable facility distances
+       max_radius = the distance (map units) the changes were checked to.  Vulnerable facilities further away are not copied.
+    """
+    x, y = siteCoordinates(lat, lon)
+    previous = SiteResults(siteFolder(x, y, previous_version, cache_folder), x, y)
+    if not os.path.exists(previous.folder):
+        return False
+    current = loadSiteResults(lat, lon, cache_folder)
+    copied = False
+    if keep_population:
+        saved = readJson(os.path.join(previous.folder, 'population.json'), {})
+        if saved:
+            with resultsLock(current.folder):
+                current_saved = readJson(os.path.join(current.folder, 'population.json'), {})
+                saved.update(current_saved)
+                writeJson(os.path.join(current.folder, 'population.json'), saved)
+            copied = True
+    if keep_facilities:
+        saved = readJson(os.path.join(previous.folder, 'facilities.json'), None)
+        if saved:
+            with resultsLock(current.folder):
+                if not readJson(os.path.join(current.folder, 'facilities.json'), None):
+                    radius = min(saved['radius'], max_radius)
+                    writeJson(os.path.join(current.folder, 'facilities.json'),
+                              {'radius': radius, 'facilities': [row for row in saved['facilities'] if row[2] <= radius]})
+                    copied = True
+    return copied
@@ -0,0 +1,182 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Results Database
+#
+# Purpose:     Keep the results of every SARA report in one SQLite database, so questions across facilities (for example, which facilities
+#              have a school within 1 mile) are answered with a query rather than by opening the text files and spreadsheets of each run.
+#
+# Summary:     Each run of the SARA Reporting Tool adds a row to the runs table, with a row for each risk radius (estimated population and
+#              households), the floodplain result, and a row for each vulnerable facility found.  Earlier runs are kept.  The latest_runs
+#              view holds the most recent run for each PATTS ID.
+#
+#              runs            run_id, patts, name, address, chemical, latitude, longitude, x, y, units, run_date, created, output_dir, text_file
+#              rings           run_id, distance, units, radius_feet, population, households
+#              floodplain      run_id, footprint_count, intersects_floodplain, flood_zones
+#              facility_hits   run_id, layer, oid, ring_distance, units, distance_feet
+#
+#              Usage:  python resultsDatabase.py <layer name> <distance> [units]
+#                      lists the facilities with a vulnerable facility in the layer within the distance, for example Schools 1 Miles
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import sys, sqlite3, datetime, riskRings
+
+# results database shared by all runs
+database_file = r'C:\GIS\Scripts\SARA\SARA_Results.sqlite'
+
+schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patts TEXT NOT NULL,
+    name TEXT,
+    address TEXT,
+    chemical TEXT,
+    latitude REAL,
+    longitude REAL,
+    x REAL,
+    y REAL,
+    units TEXT,
+    run_date TEXT,
+    created TEXT,
+    output_dir TEXT,
+    text_file TEXT
+);
+CREATE TABLE IF NOT EXISTS rings (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    distance REAL NOT NULL,
+    units TEXT,
+    radius_feet REAL,
+    population INTEGER,
+    households INTEGER,
+    PRIMARY KEY (run_id, distance)
+);
+CREATE TABLE IF NOT EXISTS floodplain (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (run_id),
+    footprint_count INTEGER,
+    intersects_floodplain INTEGER,
+    flood_zones TEXT
+);
+CREATE TABLE IF NOT EXISTS facility_hits (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    layer TEXT NOT NULL,
+    oid INTEGER NOT NULL,
+    ring_distance REAL,
+    units TEXT,
+    distance_feet REAL
+);
+CREATE INDEX IF NOT EXISTS runs_patts ON runs (patts, run_id);
+CREATE INDEX IF NOT EXISTS facility_hits_layer_distance ON facility_hits (layer, distance_feet, run_id);
+CREATE INDEX IF NOT EXISTS facility_hits_run ON facility_hits (run_id, layer);
+CREATE VIEW IF NOT EXISTS latest_runs AS
+    SELECT * FROM runs WHERE run_id IN (SELECT MAX(run_id) FROM runs GROUP BY patts);
+"""
+
+def connect(database=None):
+    """Open the results database, creating the tables when needed"""
+    # wait for other processes (batch workers) writing at the same time
+    connection = sqlite3.connect(database or database_file, timeout=60)
+    connection.executescript(schema)
+    return connection
+
+def recordRun(patts_id, sara_name, sara_address, chem_info, lat, lon, mrb_distances, mrb_units, output_dir, text_file='',
+              ring_estimates=(), floodplain=None, facility_results=None, database=None):
+    """Add the results of a SARA report to the results database and return the run ID
+
+       ring_estimates = (distance, units, population, households) of each risk radius (populationEstimate.py)
+       floodplain = (footprint count, intersects floodplain, flood zones) (floodplainAnalysis.py)
+       facility_results = vulnerable facility results table (proximityAnalysis.py)
+    """
+    # risk radii in PA State Plane South feet
+    rings = riskRings.fromLatLon(lat, lon, mrb_distances, mrb_units, patts_id)
+    estimates = dict((float(estimate[0]), estimate) for estimate in ring_estimates or [])
+    connection = connect(database)
+    try:
+        with connection:
+            cursor = connection.execute(
+                'INSERT INTO runs (patts, name, address, chemical, latitude, longitude, x, y, units, run_date, created, output_dir, text_file) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (str(patts_id), sara_name, sara_address, chem_info, lat, lon, rings.x, rings.y, mrb_units, datetime.date.today().isoformat(),
+                 datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), output_dir, text_file))
+            run_id = cursor.lastrowid
+            ring_rows = []
+            for distance, radius in zip(rings.distances, rings.radii):
+                estimate = estimates.get(distance)
+                ring_rows.append((run_id, distance, mrb_units, float(radius), estimate[2] if estimate else None, estimate[3] if estimate else None))
+            # end for
+            connection.executemany('INSERT INTO rings VALUES (?, ?, ?, ?, ?, ?)', ring_rows)
+            if floodplain is not None:
+                footprint_count, intersects_floodplain, flood_zones = floodplain
+                connection.execute('INSERT INTO floodplain VALUES (?, ?, ?, ?)', (run_id, int(footprint_count), int(bool(intersects_floodplain)), ', '.join(flood_zones or [])))
+            if facility_results is not None:
+                connection.executemany('INSERT INTO facility_hits VALUES (?, ?, ?, ?, ?, ?)',
+                                       [(run_id, str(row['LAYER']), int(row['OID']), float(row['BUFFDIST']), str(row['UNITS']), float(row['DISTANCE'])) for row in facility_results])
+        return run_id
+    finally:
+        connection.close()
+
+def facilitiesWithin(layer_name, distance, units='Miles', latest_only=True, database=None):
+    """Return (PATTS, name, number of features, nearest distance in feet) for each SARA facility with a feature of a vulnerable facility
+       layer within a distance, nearest first
+
+       latest_only = only use the most recent run of each SARA facility
+       Vulnerable facilities are only recorded within the largest risk radius of each run.
+    """
+    distance_feet = riskRings.distanceToMapUnits(distance, units)
+    connection = connect(database)
+    try:
+        return connection.execute(
+            'SELECT r.patts, r.name, COUNT(*), MIN(h.distance_feet) FROM facility_hits h JOIN {} r ON r.run_id = h.run_id '
+            'WHERE h.layer = ? AND h.distance_feet <= ? GROUP BY r.run_id ORDER BY MIN(h.distance_feet)'.format('latest_runs' if latest_only else 'runs'),
+            (layer_name, distance_feet)).fetchall()
+    finally:
+        connection.close()
+
+def runHistory(patts_id, database=None):
+    """Return (run ID, run date, output folder) of every run of a SARA facility, newest first"""
+    connection = connect(database)
+    try:
+        return connection.execute('SELECT run_id, run_date, output_dir FROM runs WHERE patts = ? ORDER BY run_id DESC', (str(patts_id),)).fetchall()
+    finally:
+        connection.close()
+
+def latestRuns(database=None):
+    """Return the most recent run of each SARA facility as a dictionary of the runs fields, with the risk radius distances and the
+       largest radius in feet"""
+    connection = connect(database)
+    try:
+        cursor = connection.execute('SELECT * FROM latest_runs ORDER BY run_id')
+        names = [column[0] for column in cursor.description]
+        runs = [dict(zip(names, row)) for row in cursor.fetchall()]
+        for run in runs:
+            rings = connection.execute('SELECT distance, radius_feet FROM rings WHERE run_id = ? ORDER BY distance', (run['run_id'],)).fetchall()
+            run['distances'] = [ring[0] for ring in rings]
+            run['radius_feet'] = max([ring[1] for ring in rings] or [0.0])
+        # end for
+        return runs
+    finally:
+        connection.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: python resultsDatabase.py <layer name> <distance> [units]')
+        sys.exit(1)
+    units = sys.argv[3] if len(sys.argv) > 3 else 'Miles'
+    matches = facilitiesWithin(sys.argv[1], float(sys.argv[2]), units)
+    for patts, name, count, nearest in matches:
+        print('PATTS {} {}: {} {} feature(s), nearest {} feet'.format(patts, name, count, sys.argv[1], round(nearest)))
+    # end for
+    print('{} SARA facilities have {} within {} {}'.format(len(matches), sys.argv[1], sys.argv[2], units))
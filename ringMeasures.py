@@ -0,0 +1,220 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Risk Radius Length and Area Measures
+#
+# Purpose:     Measure the stream miles, pipeline feet, and municipal area inside each risk radius of a SARA facility, and between each
+#              pair of risk radii, without creating clipped feature classes.
+#
+# Summary:     The risk radii are circles (riskRings.py), so each line segment is clipped to each circle analytically: the segment enters
+#              and leaves the circle where the quadratic for its distance from the SARA facility equals the radius.  The area of a polygon
+#              inside a circle is the sum, over its edges, of the area of the triangle from the SARA facility to the edge that is inside
+#              the circle.  The part of each edge inside the circle adds a triangle, and the parts outside add a circular sector.  Both are
+#              calculated with NumPy for every vertex of every feature at once, one risk radius at a time.
+#
+#              The result is a table with one row for each feature and risk radius:
+#
+#              LAYER, OID, BUFFDIST, UNITS, WITHIN (feet or square feet inside the risk radius),
+#              ANNULUS (feet or square feet between the risk radius and the next smaller one)
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, numpy, geometryArrays, spatialIndex
+
+# vulnerable facility layers that are measured (layer names from vulnerableFacilities.py), whether their length or area is measured,
+# and the units they are reported in
+measure_layers = [
+    ('Streams', 'length', 'Miles'),
+    ('Natural_Gas', 'length', 'Feet'),
+    ('Municipality', 'area', 'Square Miles')
+]
+# feet or square feet in each reporting unit
+unit_sizes = {'Feet': 1.0, 'Miles': 5280.0, 'Square Feet': 1.0, 'Square Miles': 5280.0 * 5280.0}
+# field holding the name of each feature in the text report, when the layer has it
+label_field = 'NAME'
+# fields in the measures table
+measures_dtype = [('LAYER', 'U64'), ('OID', 'i4'), ('BUFFDIST', 'f8'), ('UNITS', 'U16'), ('WITHIN', 'f8'), ('ANNULUS', 'f8')]
+
+def segmentCircleRange(starts, ends, radius):
+    """Return the fractions along each segment (from start to end) where it enters and leaves a circle centred on (0, 0), clamped to
+       the segment.  Both are 1 when the segment misses the circle."""
+    step = ends - starts
+    a = (step * step).sum(axis=1)
+    b = 2.0 * (starts * step).sum(axis=1)
+    c = (starts * starts).sum(axis=1) - radius * radius
+    discriminant = b * b - 4.0 * a * c
+    crosses = (a > 0) & (discriminant > 0)
+    root = numpy.sqrt(numpy.where(crosses, discriminant, 0.0))
+    safe_a = numpy.where(crosses, a, 1.0)
+    enter = numpy.where(crosses, numpy.clip((-b - root) / (2.0 * safe_a), 0.0, 1.0), 1.0)
+    leave = numpy.where(crosses, numpy.clip((-b + root) / (2.0 * safe_a), 0.0, 1.0), 1.0)
+    return enter, leave
+
+def segmentLengthsInCircle(starts, ends, radius):
+    """Return the length of each segment inside a circle centred on (0, 0)"""
+    enter, leave = segmentCircleRange(starts, ends, radius)
+    return numpy.hypot(ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1]) * (leave - enter)
+
+def sectorAreas(u, v, radius):
+    """Return the signed area of the circular sector swept from u to v"""
+    return 0.5 * radius * radius * numpy.arctan2(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0], (u * v).sum(axis=1))
+
+def edgeAreasInCircle(starts, ends, radius):
+    """Return the signed area of the triangle from (0, 0) to each polygon edge that is inside a circle centred on (0, 0)"""
+    enter, leave = segmentCircleRange(starts, ends, radius)
+    step = ends - starts
+    entry_point = starts + enter[:, None] * step
+    exit_point = starts + leave[:, None] * step
+    inside = 0.5 * (entry_point[:, 0] * exit_point[:, 1] - entry_point[:, 1] * exit_point[:, 0])
+    return sectorAreas(starts, entry_point, radius) + inside + sectorAreas(exit_point, ends, radius)
+
+def featureMeasures(xy, part_offsets, feature_parts, rings, polygons=False):
+    """Return an array (features, risk radii) of the length of each line, or the area of each polygon, inside each risk radius
+
+       rings = risk rings (riskRings.py)
+    """
+    feature_count = len(feature_parts) - 1
+    measures = numpy.zeros((feature_count, len(rings)))
+    starts, ends, segment_feature = geometryArrays.segments(xy, part_offsets, feature_parts)
+    if not len(segment_feature):
+        return measures
+    # vertices relative to the SARA facility
+    centre = numpy.array([rings.x, rings.y])
+    starts = starts - centre
+    ends = ends - centre
+    if polygons:
+        # rings may run either way round, so the sign of each polygon's area gives the sign of its area inside a circle
+        polygon_areas = numpy.bincount(segment_feature, weights=0.5 * (starts[:, 0] * ends[:, 1] - starts[:, 1] * ends[:, 0]), minlength=feature_count)
+        signs = numpy.sign(polygon_areas)
+    for ring, radius in enumerate(rings.radii):
+        if polygons:
+            values = numpy.bincount(segment_feature, weights=edgeAreasInCircle(starts, ends, radius), minlength=feature_count) * signs
+        else:
+            values = numpy.bincount(segment_feature, weights=segmentLengthsInCircle(starts, ends, radius), minlength=feature_count)
+        measures[:, ring] = numpy.maximum(values, 0.0)
+    # end for
+    return measures
+
+def measureFeatures(results, rings, snapshots):
+    """Return the measures table of the features of the measured layers in the proximity results (proximityAnalysis.py)
+
+       rings = risk rings (riskRings.py)
+       snapshots = dictionary of layer name to layer snapshot (dataCache.py) for each measured layer
+    """
+    tables = []
+    for layer_name, measure, units in measure_layers:
+        snapshot = snapshots.get(layer_name)
+        oids = numpy.asarray(results['OID'][results['LAYER'] == layer_name], dtype='i4')
+        if snapshot is None or not len(oids) or snapshot.shape_type == 'Point':
+            continue
+        if snapshot.wkid != rings.wkid:
+            raise ValueError('The snapshot of {} is not in the coordinate system of the risk rings (WKID {})'.format(snapshot.source, rings.wkid))
+        # position of each feature in the snapshot
+        order = numpy.argsort(snapshot.oids, kind='mergesort')
+        indexes = order[numpy.searchsorted(numpy.asarray(snapshot.oids)[order], oids)]
+        xy, part_offsets, feature_parts = snapshot.featureGeometry(indexes)
+        within = featureMeasures(xy, part_offsets, feature_parts, rings, measure == 'area')
+        annulus = numpy.diff(numpy.column_stack([numpy.zeros(len(oids)), within]), axis=1)
+        table = numpy.zeros(len(oids) * len(rings), dtype=measures_dtype)
+        table['LAYER'] = layer_name
+        table['OID'] = numpy.repeat(oids, len(rings))
+        table['BUFFDIST'] = numpy.tile(numpy.asarray(rings.distances, dtype='f8'), len(oids))
+        table['UNITS'] = rings.units
+        table['WITHIN'] = within.ravel()
+        table['ANNULUS'] = annulus.ravel()
+        tables.append(table)
+    # end for
+    return numpy.concatenate(tables) if tables else numpy.zeros(0, dtype=measures_dtype)
+
+def layerUnits(layer_name):
+    """Return the measure and reporting units of a measured layer, or None"""
+    for name, measure, units in measure_layers:
+        if name == layer_name:
+            return measure, units
+    # end for
+    return None
+
+def measureColumns(measures, layer_name):
+    """Return the column names and a dictionary of OBJECTID to column values (in reporting units) for the features of a measured layer,
+       with a column for each risk radius and each annulus"""
+    layer_units = layerUnits(layer_name)
+    layer_measures = measures[measures['LAYER'] == layer_name] if measures is not None and len(measures) else []
+    if layer_units is None or not len(layer_measures):
+        return [], {}
+    size = unit_sizes[layer_units[1]]
+    label = layer_units[1].upper().replace(' ', '_')
+    distances = sorted(set(float(distance) for distance in layer_measures['BUFFDIST']))
+    header = ['{}_WITHIN_{:g}'.format(label, distance) for distance in distances]
+    header += ['{}_{:g}_TO_{:g}'.format(label, inner, outer) for inner, outer in zip([0.0] + distances[:-1], distances)]
+    columns = {}
+    for row in layer_measures:
+        values = columns.setdefault(int(row['OID']), [0.0] * len(header))
+        ring = distances.index(float(row['BUFFDIST']))
+        values[ring] = round(float(row['WITHIN']) / size, 4)
+        values[len(distances) + ring] = round(float(row['ANNULUS']) / size, 4)
+    # end for
+    return header, columns
+
+def featureLabels(feature_class, oids):
+    """Return a dictionary of OBJECTID to the name of each feature, or to its OBJECTID when the layer has no name field"""
+    labels = dict((int(oid), 'OBJECTID {}'.format(int(oid))) for oid in oids)
+    if len(labels) and label_field in [field.name for field in arcpy.ListFields(feature_class)]:
+        with arcpy.da.SearchCursor(feature_class, ['OID@', label_field], spatialIndex.oidWhereClause(feature_class, sorted(labels))) as cursor:
+            for row in cursor:
+                if row[1]:
+                    labels[row[0]] = row[1]
+            # end for
+        # end cursor
+    return labels
+
+def measuresText(measures, rings, feature_classes):
+    """Return the text report of the measures: the total length inside each risk radius and annulus for line layers, and the area and
+       share of each risk radius and annulus for each polygon feature
+
+       feature_classes = dictionary of layer name to feature class, for the names of polygon features
+    """
+    text = ''
+    distances = list(rings.distances)
+    ring_areas = numpy.pi * numpy.asarray(rings.radii) ** 2
+    annulus_areas = numpy.diff(numpy.concatenate([[0.0], ring_areas]))
+    for layer_name, measure, units in measure_layers:
+        layer_measures = measures[measures['LAYER'] == layer_name] if len(measures) else measures
+        if not len(layer_measures):
+            continue
+        size = unit_sizes[units]
+        if measure == 'length':
+            for ring, distance in enumerate(distances):
+                ring_rows = layer_measures[layer_measures['BUFFDIST'] == distance]
+                text += '\nTotal {} length within {}-{} risk radius is {} {}\n'.format(layer_name, distance, rings.units, round(ring_rows['WITHIN'].sum() / size, 2), units.lower())
+                if ring > 0:
+                    text += '\nTotal {} length between {}-{} and {}-{} risk radii is {} {}\n'.format(layer_name, distances[ring - 1], rings.units, distance, rings.units,
+                                                                                                    round(ring_rows['ANNULUS'].sum() / size, 2), units.lower())
+            # end for
+            continue
+        labels = featureLabels(feature_classes.get(layer_name, layer_name), numpy.unique(layer_measures['OID']))
+        for ring, distance in enumerate(distances):
+            ring_rows = layer_measures[(layer_measures['BUFFDIST'] == distance) & (layer_measures['WITHIN'] > 0)]
+            for row in ring_rows[numpy.argsort(-ring_rows['WITHIN'], kind='mergesort')]:
+                text += '\n{} {} area within {}-{} risk radius is {} {} ({}% of the risk radius)\n'.format(layer_name, labels[int(row['OID'])], distance, rings.units,
+                                                                                                         round(row['WITHIN'] / size, 3), units.lower(), round(100.0 * row['WITHIN'] / ring_areas[ring], 1))
+                if ring > 0 and row['ANNULUS'] > 0:
+                    text += '\n{} {} area between {}-{} and {}-{} risk radii is {} {} ({}% of the annulus)\n'.format(layer_name, labels[int(row['OID'])], distances[ring - 1], rings.units,
+                                                                                                                    distance, rings.units, round(row['ANNULUS'] / size, 3), units.lower(),
+                                                                                                                    round(100.0 * row['ANNULUS'] / annulus_areas[ring], 1))
+            # end for
+        # end for
+    # end for
+    return text
@@ -6,14 +6,18 @@
 # Summary:     Latitude, longitude, PATTS ID, risk-radius distances, and risk radius units
 #              are entered in the ArcGIS tool run from SARAReportTool.py
 #
-#              A geometry point is created from latitude and longitude and converted to PA State Plane South (ft) (SPC).
+#              Latitude and longitude are projected to PA State Plane South (ft) (SPC) in memory (projection.py), and the SPC point is
+#              saved to the project geodatabase.
 #              The multi-ring buffer tool is run on the SPC point using the risk-radius distances and units.
 #
+#              Analyses that only need to know which features are within each risk radius can use riskRings.fromLatLon, which represents
+#              the risk radii as a centre point and radii without creating any polygons.
+#
 # Author:      Patrick McKinney
 #
 # Created:     07/26/2016
 #
-# Updated:     05/13/2019
+# Updated:     10/18/2026
 #
 # Copyright:   (c) Cumberland County GIS 2019
 #
@@ -26,16 +30,19 @@
 #-----------------------------------------------------------------------------------------------------------------------------------------------------------#
 
 # import modules
-import arcpy, os, errorLogger, floodplainAnalysis
+import arcpy, os, errorLogger, floodplainAnalysis, projection, runProfile
+
+@runProfile.timedStage
+def createRiskRadii(lat,lon,patts_id,mrb_distances,mrb_units,out_gbd,text_file,use_cache=False,use_flag_index=False,run_floodplain=True):
+    """Creates a multi-ring buffer for a SARA facility
 
-def createRiskRadii(lat,lon,patts_id,mrb_distances,mrb_units,out_gbd,text_file):
-    """Creates a multi-ring buffer for a SARA facility"""
+       use_cache = read building footprints for the floodplain analysis from the reference data cache (dataCache.py)
+       use_flag_index = look up the floodplain analysis in the precomputed floodplain flags (floodplainIndex.py)
+       run_floodplain = run the floodplain analysis after creating the risk radii.  The stage scheduler (stageScheduler.py) runs it separately.
+    """
     try:
         # allow data to be ovewritten
         arcpy.env.overwriteOutput = True
-        # Variables for Project tool
-        # WGS 1984 geographic coordinate system
-        sr_wgs_84 = arcpy.SpatialReference(4326)
         # PA State Plane South (feet) NAD 1983 projected coordinate system
         sr_spc = arcpy.SpatialReference(2272)
         # reprojected point output name
@@ -43,12 +50,12 @@ def createRiskRadii(lat,lon,patts_id,mrb_distances,mrb_units,out_gbd,text_file):
         # output layer
         output_spc = os.path.join(out_gbd,output_spc_name)
 
-        # create point from user entered latitude and longitude
-        point = arcpy.Point(lon, lat)
-        # create geometry point for use in buffer tool - WGS 1984
-        geometry_point = arcpy.PointGeometry(point, sr_wgs_84)
-        # Convert WGS 1984 layer to a NAD 1983 PA State Plane South layer
-        arcpy.Project_management(geometry_point, output_spc, sr_spc, "NAD_1983_To_WGS_1984_1", preserve_shape = "PRESERVE_SHAPE")
+        # project user entered latitude and longitude to PA State Plane South
+        spc_x, spc_y = projection.wgs84ToStatePlane(lon, lat)
+        # create geometry point for use in buffer tool - PA State Plane South
+        geometry_point = arcpy.PointGeometry(arcpy.Point(float(spc_x), float(spc_y)), sr_spc)
+        # save projected point to project geodatabase
+        arcpy.CopyFeatures_management(geometry_point, output_spc)
 
         # Multi-ring Buffer tool
         # Output layer
@@ -81,8 +88,9 @@ def createRiskRadii(lat,lon,patts_id,mrb_distances,mrb_units,out_gbd,text_file):
         arcpy.AddMessage('\nCompleted adding fields to Risk Radius/Radii map layer')
 
         # run floodplain analysis module
-        arcpy.AddMessage('\nPerforming analysis to see if SARA facility is within a floodplain')
-        floodplainAnalysis.intersectFloodplainTest(output_spc,lon,lat,text_file)
+        if run_floodplain:
+            arcpy.AddMessage('\nPerforming analysis to see if SARA facility is within a floodplain')
+            floodplainAnalysis.intersectFloodplainTest(output_spc,lon,lat,text_file,use_cache,use_flag_index)
 
         # make projected sara site and sara risk radii layer  available as input to other tools
         return output_spc, mrb_output
@@ -0,0 +1,142 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Analytic Risk Rings
+#
+# Purpose:     Represent the risk radii of a SARA facility as a centre point and a list of radii, rather than as buffer polygons.
+#
+# Summary:     A feature is within a risk radius when its distance to the SARA facility is less than or equal to the radius.  Points are
+#              classified with one distance calculation for all points, and lines and polygons with the exact distance from the SARA facility
+#              to their segments (geometryArrays.py).  Each feature is assigned to the smallest risk radius that contains it.
+#
+#              Polygon risk radii only need to be created when a map or feature class is wanted (toFeatureClass).
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import os, numpy, geometryArrays, projection
+
+# meters in each of the units available for the risk radii
+meters_per_unit = {
+    'INCHES': 0.0254,
+    'FEET': 0.3048,
+    'YARDS': 0.9144,
+    'MILES': 1609.344,
+    'NAUTICALMILES': 1852.0,
+    'CENTIMETERS': 0.01,
+    'METERS': 1.0,
+    'KILOMETERS': 1000.0
+}
+
+def distanceToMapUnits(distance, units, map_unit_meters=projection.us_survey_foot):
+    """Convert a risk radius distance to the units of a projected coordinate system"""
+    units_key = str(units).upper().replace(' ', '').replace('_', '')
+    # default units are the units of the coordinate system
+    if units_key not in meters_per_unit:
+        return float(distance)
+    return float(distance) * meters_per_unit[units_key] / map_unit_meters
+
+class RiskRings(object):
+    """Concentric risk radii around a SARA facility"""
+    def __init__(self, x, y, distances, units, patts='', map_unit_meters=projection.us_survey_foot, wkid=2272):
+        """x, y = SARA facility in map units
+           distances = risk radius distances
+           units = units of the risk radius distances
+           map_unit_meters = meters in one map unit (PA State Plane South feet by default)
+           wkid = spatial reference of x and y
+        """
+        self.x = float(x)
+        self.y = float(y)
+        self.units = units
+        self.patts = patts
+        self.wkid = wkid
+        self.map_unit_meters = map_unit_meters
+        self.distances = sorted([float(distance) for distance in distances])
+        # radius of each ring in map units, smallest first
+        self.radii = numpy.array([distanceToMapUnits(distance, units, map_unit_meters) for distance in self.distances])
+
+    def __len__(self):
+        return len(self.distances)
+
+    @property
+    def max_radius(self):
+        return float(self.radii[-1]) if len(self.radii) else 0.0
+
+    def envelope(self):
+        """Return the envelope of the largest risk radius"""
+        return (self.x - self.max_radius, self.y - self.max_radius, self.x + self.max_radius, self.y + self.max_radius)
+
+    def ringIndex(self, distances):
+        """Return the index of the smallest risk radius containing each distance (len(self) when outside all risk radii)"""
+        return numpy.searchsorted(self.radii, numpy.asarray(distances, dtype='float64'), side='left')
+
+    def classifyPoints(self, x, y):
+        """Return the distance to the SARA facility and risk radius index of each point"""
+        distances = numpy.hypot(numpy.asarray(x, dtype='float64') - self.x, numpy.asarray(y, dtype='float64') - self.y)
+        return distances, self.ringIndex(distances)
+
+    def classifyFeatures(self, xy, part_offsets, feature_parts, polygons=False):
+        """Return the distance to the SARA facility and risk radius index of each line or polygon feature"""
+        distances = geometryArrays.pointFeatureDistances(self.x, self.y, xy, part_offsets, feature_parts, polygons)
+        return distances, self.ringIndex(distances)
+
+    def siteGeometry(self):
+        """Return the SARA facility as an arcpy PointGeometry"""
+        import arcpy
+        return arcpy.PointGeometry(arcpy.Point(self.x, self.y), arcpy.SpatialReference(self.wkid))
+
+    def toFeatureClass(self, out_feature_class):
+        """Create polygon risk radii with the same fields as the multiple ring buffer in riskRadius.py"""
+        import arcpy
+        site = self.siteGeometry()
+        arcpy.CreateFeatureclass_management(os.path.dirname(out_feature_class), os.path.basename(out_feature_class), 'POLYGON', spatial_reference=site.spatialReference)
+        arcpy.AddField_management(out_feature_class, 'BUFFDIST', 'DOUBLE')
+        arcpy.AddField_management(out_feature_class, 'PATTS', 'TEXT')
+        arcpy.AddField_management(out_feature_class, 'UNITS', 'TEXT')
+        with arcpy.da.InsertCursor(out_feature_class, ['SHAPE@', 'BUFFDIST', 'PATTS', 'UNITS']) as cursor:
+            for distance, radius in zip(self.distances, self.radii):
+                cursor.insertRow([site.buffer(float(radius)), distance, str(self.patts), str(self.units)])
+            # end for
+        # end cursor
+        return out_feature_class
+
+def fromRiskRadiiLayer(risk_radii):
+    """Create risk rings from the risk radii layer created in riskRadius.py"""
+    import arcpy
+    spatial_reference = arcpy.Describe(risk_radii).spatialReference
+    center = None
+    distances = []
+    units = ''
+    patts = ''
+    with arcpy.da.SearchCursor(risk_radii, ['SHAPE@', 'BUFFDIST', 'UNITS', 'PATTS']) as cursor:
+        for row in cursor:
+            # risk radii are concentric around the SARA facility
+            if center is None:
+                center = row[0].trueCentroid
+            distances.append(row[1])
+            units = row[2]
+            patts = row[3]
+        # end for
+    # end cursor
+    if center is None:
+        return RiskRings(0, 0, [], units, patts, spatial_reference.metersPerUnit, spatial_reference.factoryCode)
+    return RiskRings(center.X, center.Y, distances, units, patts, spatial_reference.metersPerUnit, spatial_reference.factoryCode)
+
+def fromLatLon(lat, lon, distances, units, patts=''):
+    """Create risk rings in PA State Plane South (feet) from latitude and longitude, without creating any data"""
+    x, y = projection.wgs84ToStatePlane(lon, lat)
+    if hasattr(distances, 'split'):
+        distances = [distance for distance in distances.replace(',', ';').split(';') if distance.strip()]
+    return RiskRings(float(x), float(y), distances, units, patts)
@@ -0,0 +1,297 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Run Profile
+#
+# Purpose:     Record where a SARA report spends its time, so slow stages and the effect of growing reference data can be tracked.
+#
+# Summary:     While a run is being profiled, each analysis stage (timedStage) and each geoprocessing tool called through arcpy is timed.
+#              Wall time, CPU time, peak memory, and bytes written are recorded, along with the feature count of a stage that returns a
+#              single feature class.  Counting the features given to and made by every tool is a GetCount on each, and the input of a tool is
+#              often a full reference layer (for example the Census blocks given to Clip), so tool feature counts and stage input counts are
+#              only recorded when count_inputs is turned on.
+#              The run profile is saved as a JSON file next to the results text file.  Python's cProfile can also be turned on for a
+#              detailed listing of every function call (saved as a .prof file).
+#
+#              Peak memory and bytes written use psutil when it is installed.  Without psutil, peak memory uses the resource module (not
+#              available on Windows) and bytes written is the growth of the project folder during a stage.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, sys, json, time, datetime, functools, cProfile
+# psutil measures peak memory and bytes written when it is available
+try:
+    import psutil
+except ImportError:
+    psutil = None
+# resource measures peak memory on Linux and Mac when psutil is not available
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# text types for dataset paths and layer names
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+# run being profiled in this process (None when not profiling)
+current_run = None
+# arcpy tools are timed when their name ends with one of these toolbox aliases
+tool_suffixes = ('_management', '_analysis', '_conversion', '_cartography')
+# arcpy tools replaced by timed versions, by name
+original_tools = {}
+# tools whose input and output are not counted (counting would add time or has no meaning)
+uncounted_tools = ['GetCount_management', 'Delete_management', 'MakeFeatureLayer_management', 'CreateFileGDB_management']
+
+def cpuSeconds():
+    """Return the user and system CPU time used by this process"""
+    times = os.times()
+    return times[0] + times[1]
+
+def peakMemoryBytes():
+    """Return the largest amount of memory used by this process so far, or None when it can't be measured"""
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        # peak working set on Windows, current resident memory elsewhere
+        return int(getattr(info, 'peak_wset', 0) or info.rss)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on Mac
+        return int(peak if sys.platform == 'darwin' else peak * 1024)
+    return None
+
+def processBytesWritten():
+    """Return the bytes written to disk by this process so far, or None when it can't be measured"""
+    if psutil is None:
+        return None
+    try:
+        return int(psutil.Process().io_counters().write_bytes)
+    except (AttributeError, NotImplementedError, psutil.Error):
+        return None
+
+def folderSize(folder):
+    """Return the total size of the files in a folder"""
+    total = 0
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                # file removed while walking the folder
+                pass
+        # end for
+    # end for
+    return total
+
+def countFeatures(value):
+    """Return the number of features or rows in a dataset or layer, or None when the value isn't one"""
+    if hasattr(value, 'getOutput'):
+        value = value.getOutput(0)
+    if not isinstance(value, string_types) or not value:
+        # arrays and lists of results (proximityAnalysis.py) are counted by their length
+        if hasattr(value, '__len__') and not isinstance(value, (dict, string_types)):
+            return len(value)
+        return None
+    try:
+        get_count = original_tools.get('GetCount_management', arcpy.GetCount_management)
+        return int(get_count(value)[0])
+    except Exception:
+        return None
+
+class Measurement(object):
+    """Wall time, CPU time, and bytes written from when the measurement starts"""
+    def __init__(self, kind, name, folder=None):
+        self.kind = kind
+        self.name = name
+        self.folder = folder if folder and os.path.isdir(folder) else None
+        self.start_time = time.time()
+        self.start_cpu = cpuSeconds()
+        self.start_bytes = processBytesWritten()
+        self.start_folder_size = folderSize(self.folder) if self.start_bytes is None and self.folder else None
+
+    def finish(self, features_in=None, features_out=None, error=None):
+        """Return a record of the measurement"""
+        record = {
+            'type': self.kind,
+            'name': self.name,
+            'started': round(self.start_time, 3),
+            'wall_seconds': round(time.time() - self.start_time, 4),
+            'cpu_seconds': round(cpuSeconds() - self.start_cpu, 4),
+            'peak_memory_bytes': peakMemoryBytes(),
+            'features_in': features_in,
+            'features_out': features_out,
+            'bytes_written': None,
+            'process': os.getpid()
+        }
+        if self.start_bytes is not None:
+            record['bytes_written'] = processBytesWritten() - self.start_bytes
+        elif self.start_folder_size is not None:
+            record['bytes_written'] = folderSize(self.folder) - self.start_folder_size
+        if error:
+            record['error'] = error
+        return record
+
+class RunProfile(object):
+    """Stage and tool records for one SARA report"""
+    def __init__(self, output_folder=None, use_cprofile=False, count_inputs=False):
+        self.output_folder = output_folder
+        # count the features given to each tool and stage, which adds a GetCount of each input
+        self.count_inputs = count_inputs
+        self.measurement = Measurement('run', 'SARA report', output_folder)
+        self.stages = []
+        self.tools = []
+        # name of the stage running in this process
+        self.stage_name = None
+        self.profiler = cProfile.Profile() if use_cprofile else None
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.summary = self.measurement.finish()
+
+    def addRecords(self, stages, tools):
+        """Add the records from a run profiled in another process (stageScheduler.py)"""
+        self.stages.extend(stages)
+        self.tools.extend(tools)
+
+    def toolTotals(self):
+        """Return the calls, wall time, and CPU time of each tool, slowest first"""
+        totals = {}
+        for record in self.tools:
+            total = totals.setdefault(record['name'], {'name': record['name'], 'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+            total['calls'] += 1
+            total['wall_seconds'] += record['wall_seconds']
+            total['cpu_seconds'] += record['cpu_seconds']
+        # end for
+        for total in totals.values():
+            total['wall_seconds'] = round(total['wall_seconds'], 4)
+            total['cpu_seconds'] = round(total['cpu_seconds'], 4)
+        # end for
+        return sorted(totals.values(), key=lambda total: total['wall_seconds'], reverse=True)
+
+    def report(self):
+        return {
+            'created': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': sys.version.split()[0],
+            'run': self.summary,
+            'stages': sorted(self.stages, key=lambda record: record['started']),
+            'tool_totals': self.toolTotals(),
+            'tools': sorted(self.tools, key=lambda record: record['started'])
+        }
+
+    def save(self, profile_file):
+        """Write the run profile to a JSON file, and the cProfile statistics to a .prof file next to it"""
+        with open(profile_file, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        if self.profiler is not None:
+            self.profiler.dump_stats('{}.prof'.format(os.path.splitext(profile_file)[0]))
+
+def timedTool(name, tool):
+    """Return a version of an arcpy tool that is timed while a run is being profiled"""
+    @functools.wraps(tool)
+    def wrapper(*args, **kwargs):
+        run = current_run
+        if run is None:
+            return tool(*args, **kwargs)
+        measurement = Measurement('tool', name)
+        try:
+            result = tool(*args, **kwargs)
+        except Exception as e:
+            record = measurement.finish(error=str(e).strip())
+            record['stage'] = run.stage_name
+            run.tools.append(record)
+            raise
+        record = measurement.finish()
+        record['stage'] = run.stage_name
+        # count input and output after the tool is timed
+        if name not in uncounted_tools and run.count_inputs:
+            record['features_in'] = countFeatures(args[0]) if args else None
+            record['features_out'] = countFeatures(result)
+        run.tools.append(record)
+        return result
+    return wrapper
+
+def instrumentTools():
+    """Replace the arcpy geoprocessing tools with timed versions"""
+    for name in dir(arcpy):
+        if name.endswith(tool_suffixes) and not name.startswith('_') and name not in original_tools:
+            tool = getattr(arcpy, name)
+            if callable(tool):
+                original_tools[name] = tool
+                setattr(arcpy, name, timedTool(name, tool))
+    # end for
+
+def restoreTools():
+    """Put back the original arcpy geoprocessing tools"""
+    for name, tool in original_tools.items():
+        setattr(arcpy, name, tool)
+    # end for
+    original_tools.clear()
+
+def startRun(output_folder=None, use_cprofile=False, count_inputs=False):
+    """Start profiling a run in this process
+
+       output_folder = project folder, used to measure bytes written when psutil isn't installed
+       use_cprofile = also record every Python function call with cProfile
+       count_inputs = also count the features given to each stage, and given to and made by each tool (a GetCount of each, off in the tool form)
+    """
+    global current_run
+    instrumentTools()
+    current_run = RunProfile(output_folder, use_cprofile, count_inputs)
+    return current_run
+
+def finishRun():
+    """Stop profiling and return the run profile (None if no run was being profiled)"""
+    global current_run
+    run = current_run
+    current_run = None
+    restoreTools()
+    if run is not None:
+        run.stop()
+    return run
+
+def timedStage(function):
+    """Decorator recording the time taken by an analysis stage while a run is being profiled"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        run = current_run
+        if run is None:
+            return function(*args, **kwargs)
+        features_in = countFeatures(args[0]) if args and run.count_inputs else None
+        outer_stage = run.stage_name
+        run.stage_name = function.__name__
+        measurement = Measurement('stage', function.__name__, run.output_folder)
+        error = None
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            # includes sys.exit() from errorLogger
+            error = str(e).strip() or e.__class__.__name__
+            raise
+        finally:
+            record = measurement.finish(features_in, error=error)
+            # only a stage returning a single feature class has an output count (tuples of results and estimates are left as None)
+            if error is None and (isinstance(result, string_types) or hasattr(result, 'getOutput')):
+                record['features_out'] = countFeatures(result)
+            record['parent_stage'] = outer_stage
+            run.stages.append(record)
+            run.stage_name = outer_stage
+        return result
+    return wrapper
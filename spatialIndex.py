@@ -0,0 +1,150 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Spatial Index for Reference Layers
+#
+# Purpose:     Build a persistent grid index over the feature envelopes of a large reference layer (such as U.S. Census blocks) so an analysis
+#              only has to work with the features near a SARA facility.
+#
+# Summary:     The envelope of every feature is assigned to the cells of a regular grid.  Querying the index with an envelope returns the
+#              OBJECTIDs of features whose envelope intersects it.  The index is saved to the cache folder and reused until the source
+#              feature class is edited or the number of features changes, at which point it is rebuilt.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, math, pickle, fileGeodatabase
+
+# folder where indexes are saved between runs
+cache_dir = r'C:\GIS\Scripts\SARA\Cache'
+
+class GridIndex(object):
+    """Regular grid of cells, each holding the features whose envelope overlaps the cell"""
+    def __init__(self, cell_size, source='', signature=None):
+        self.cell_size = float(cell_size)
+        self.source = source
+        self.signature = signature
+        self.oids = []
+        self.envelopes = []
+        self.cells = {}
+
+    def cellRange(self, xmin, ymin, xmax, ymax):
+        """Return the column and row range of cells covering an envelope"""
+        return (int(math.floor(xmin / self.cell_size)), int(math.floor(ymin / self.cell_size)),
+                int(math.floor(xmax / self.cell_size)), int(math.floor(ymax / self.cell_size)))
+
+    def insert(self, oid, xmin, ymin, xmax, ymax):
+        """Add a feature envelope to the index"""
+        position = len(self.oids)
+        self.oids.append(oid)
+        self.envelopes.append((xmin, ymin, xmax, ymax))
+        col_min, row_min, col_max, row_max = self.cellRange(xmin, ymin, xmax, ymax)
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                self.cells.setdefault((col, row), []).append(position)
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """Return the sorted OBJECTIDs of features whose envelope intersects the envelope provided"""
+        positions = set()
+        col_min, row_min, col_max, row_max = self.cellRange(xmin, ymin, xmax, ymax)
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                positions.update(self.cells.get((col, row), []))
+        matches = []
+        for position in positions:
+            envelope = self.envelopes[position]
+            if envelope[0] <= xmax and envelope[2] >= xmin and envelope[1] <= ymax and envelope[3] >= ymin:
+                matches.append(self.oids[position])
+        return sorted(matches)
+
+    def save(self, index_file):
+        """Save the index to disk"""
+        with open(index_file, 'wb') as f:
+            # protocol 2 can be read by both Python 2 and Python 3
+            pickle.dump(self, f, 2)
+
+def tableModified(feature_class):
+    """Return the time the files of a feature class were last modified, or 0 when they are not found"""
+    # file geodatabase folder containing the feature class
+    gdb = fileGeodatabase.geodatabasePath(feature_class)
+    if gdb is None or not os.path.isdir(gdb):
+        return os.path.getmtime(feature_class) if os.path.exists(feature_class) else 0
+    try:
+        table_file = fileGeodatabase.tableFile(feature_class)
+    except (IOError, OSError, ValueError):
+        table_file = None
+    if table_file is not None:
+        # the table and its row offsets change when the feature class is edited
+        table_files = [table_file, os.path.splitext(table_file)[0] + '.gdbtablx']
+    else:
+        # ArcGIS writes lock files whenever the geodatabase is opened, so they are left out
+        table_files = [os.path.join(gdb, name) for name in os.listdir(gdb) if not name.lower().endswith('.lock')]
+    return max([os.path.getmtime(name) for name in table_files if os.path.exists(name)] or [0])
+
+def dataSignature(feature_class):
+    """Return a value that changes whenever a feature class is edited"""
+    modified = tableModified(feature_class)
+    # the rows of a file geodatabase table are counted from its files (fileGeodatabase.py), without arcpy
+    if fileGeodatabase.canRead(feature_class):
+        count = fileGeodatabase.rowCount(feature_class)
+    else:
+        count = int(arcpy.GetCount_management(feature_class)[0])
+    return (int(modified), count)
+
+def buildIndex(feature_class, cell_size, signature=None):
+    """Build a grid index from the envelope of every feature in a feature class"""
+    index = GridIndex(cell_size, feature_class, signature)
+    with arcpy.da.SearchCursor(feature_class, ['OID@', 'SHAPE@']) as cursor:
+        for row in cursor:
+            if row[1] is None:
+                continue
+            extent = row[1].extent
+            index.insert(row[0], extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+        # end for
+    # end cursor
+    return index
+
+def loadIndex(feature_class, cell_size=5280, index_dir=None):
+    """Load the saved index for a feature class, building and saving a new index if the data has changed"""
+    # cache folder is read when the function is called, so it can be changed after import
+    if index_dir is None:
+        index_dir = cache_dir
+    signature = dataSignature(feature_class)
+    index_file = os.path.join(index_dir, '{}.idx'.format(os.path.basename(feature_class)))
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, 'rb') as f:
+                index = pickle.load(f)
+            if index.source == feature_class and index.signature == signature and index.cell_size == float(cell_size):
+                return index
+        except Exception:
+            arcpy.AddWarning('\nUnable to read spatial index {}.  The index will be rebuilt'.format(index_file))
+    arcpy.AddMessage('\nBuilding spatial index for {}'.format(feature_class))
+    index = buildIndex(feature_class, cell_size, signature)
+    try:
+        if not os.path.exists(index_dir):
+            os.makedirs(index_dir)
+        index.save(index_file)
+    except EnvironmentError:
+        arcpy.AddWarning('\nUnable to save spatial index to {}.  The index will be rebuilt on the next run'.format(index_file))
+    return index
+
+def oidWhereClause(feature_class, oids):
+    """Create a where clause that selects a list of OBJECTIDs"""
+    oid_field = arcpy.AddFieldDelimiters(feature_class, arcpy.Describe(feature_class).OIDFieldName)
+    # no candidates - select nothing
+    if not oids:
+        return '{} < 0'.format(oid_field)
+    return '{} IN ({})'.format(oid_field, ','.join([str(oid) for oid in oids]))
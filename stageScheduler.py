@@ -0,0 +1,418 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        SARA Report Stage Scheduler
+#
+# Purpose:     Run the stages of a SARA report in worker processes, starting each stage as soon as the stages it depends on are finished.
+#
+# Summary:     Each stage declares the values it needs (inputs) and the values it creates (outputs).  Stages whose inputs are all available
+#              run at the same time, each in its own worker process with its own scratch workspace.  Each stage writes its part of the
+#              results text file to a separate file, and the parts are added to the results text file in the order the stages are listed,
+#              so the text file is the same no matter which stage finishes first.
+#
+#              When the run is being profiled (runProfile.py), each worker process profiles its stage and the records are added to the run profile.
+#
+#              The scheduler checks the running stages every poll_seconds.  A stage fails, rather than leaving the tool waiting, when its
+#              worker process stops (a crash or running out of memory), when its inputs or outputs cannot be passed between processes,
+#              or when it runs longer than stage_timeout.
+#
+#              With a run manifest, each completed stage is recorded with a hash of its inputs, its outputs (saved to the Checkpoints folder),
+#              and its part of the results text file.  A resumed run uses the saved results of the stages already completed with the same
+#              inputs and the same version of the reference data, and runs only the remaining stages.  After the reference data changes,
+#              a run can be updated with the stages the changes reach (changeDetection.py): those stages and the stages using their outputs
+#              run again, and the other stages use their saved results.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, time, json, pickle, hashlib, datetime, shutil, multiprocessing, errorLogger, runProfile
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+# seconds between checks of the stages running in worker processes
+poll_seconds = 0.5
+# seconds a stage may run before it is treated as failed (None for no limit)
+stage_timeout = 6 * 60 * 60
+# file in a stage's scratch folder holding the process ID of the worker process running it
+pid_file_name = 'stage.pid'
+
+class Stage(object):
+    """A step of the SARA report, the values it needs, and the values it creates
+
+       function = module level function called as function(values, text_file), where values is a dictionary of the stage inputs
+                  and text_file is the file for the stage's part of the results text file.  Returns a dictionary of the stage outputs.
+    """
+    def __init__(self, name, function, inputs=(), outputs=()):
+        self.name = name
+        self.function = function
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+class RunManifest(object):
+    """The completed stages of a run, saved to a JSON file next to a Checkpoints folder holding their outputs and text
+
+       manifest_file = run manifest JSON file
+       data_version = version of the reference data (resultsCache.dataVersion()).  Saved stages are only used for the same version.
+       resume = use the stages completed by an earlier run.  Otherwise the manifest is started again.
+       rerun_stages = names of the stages to run again because changes to the reference data reach them.  The other stages completed
+                      by an earlier run are used even though the reference data version is different.
+    """
+    def __init__(self, manifest_file, data_version=None, resume=False, rerun_stages=None):
+        self.manifest_file = manifest_file
+        self.checkpoint_dir = os.path.join(os.path.dirname(manifest_file), 'Checkpoints')
+        self.data_version = data_version
+        self.stages = {}
+        # stages completed with an earlier version of the reference data that the changes do not reach
+        self.carried_stages = set()
+        # hashes of the outputs of the stages completed in this run
+        self.value_hashes = {}
+        if resume and os.path.exists(manifest_file):
+            try:
+                with open(manifest_file) as f:
+                    content = json.load(f)
+                if content.get('data_version') == data_version:
+                    self.stages = content.get('stages', {})
+                elif rerun_stages is not None:
+                    self.stages = dict((name, entry) for name, entry in content.get('stages', {}).items() if name not in rerun_stages)
+                    self.carried_stages = set(self.stages)
+                else:
+                    arcpy.AddMessage('\nThe reference data has changed since the last run; running every stage again')
+            except (IOError, OSError, ValueError):
+                arcpy.AddWarning('\nThe run manifest "{}" could not be read; running every stage again'.format(manifest_file))
+
+    def inputsHash(self, stage, values):
+        """Return a hash of a stage's inputs.  Values created by earlier stages are hashed from those stages' inputs, so a
+           stage runs again when any stage before it was run with different inputs."""
+        parts = [stage.name]
+        for name in sorted(stage.inputs):
+            value_hash = self.value_hashes.get(name)
+            if value_hash is None:
+                try:
+                    value_hash = hashlib.md5(pickle.dumps(values[name], 2)).hexdigest()
+                except Exception:
+                    value_hash = hashlib.md5(repr(values[name]).encode('utf-8')).hexdigest()
+            parts.append('{}={}'.format(name, value_hash))
+        # end for
+        return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def setOutputHashes(self, stage, inputs_hash):
+        for name in stage.outputs:
+            self.value_hashes[name] = hashlib.md5('{}|{}'.format(inputs_hash, name).encode('utf-8')).hexdigest()
+        # end for
+
+    def savedOutputs(self, stage, values, text_file):
+        """Return the outputs of a stage completed with the same inputs and restore its part of the results text file, or None"""
+        inputs_hash = self.inputsHash(stage, values)
+        entry = self.stages.get(stage.name)
+        # a stage the reference data changes do not reach is used even though inputs like the saved results (resultsCache.py)
+        # are for the new version of the data
+        if not entry or (entry['inputs_hash'] != inputs_hash and stage.name not in self.carried_stages):
+            return None
+        try:
+            with open(os.path.join(self.checkpoint_dir, entry['outputs_file']), 'rb') as f:
+                outputs = pickle.load(f)
+            if entry.get('text_file'):
+                shutil.copyfile(os.path.join(self.checkpoint_dir, entry['text_file']), text_file)
+        except Exception:
+            return None
+        self.setOutputHashes(stage, inputs_hash)
+        # the stage is now recorded for this version of the reference data
+        if stage.name in self.carried_stages:
+            self.carried_stages.discard(stage.name)
+            entry['inputs_hash'] = inputs_hash
+            self.save()
+        return outputs
+
+    def record(self, stage, values, outputs, text_file, seconds):
+        """Save the outputs and text of a completed stage and add it to the manifest"""
+        inputs_hash = self.inputsHash(stage, values)
+        self.setOutputHashes(stage, inputs_hash)
+        try:
+            if not os.path.exists(self.checkpoint_dir):
+                os.makedirs(self.checkpoint_dir)
+            outputs_file = '{}.pkl'.format(stage.name)
+            with open(os.path.join(self.checkpoint_dir, outputs_file), 'wb') as f:
+                pickle.dump(outputs, f, 2)
+            saved_text = None
+            if os.path.exists(text_file):
+                saved_text = '{}.txt'.format(stage.name)
+                shutil.copyfile(text_file, os.path.join(self.checkpoint_dir, saved_text))
+        # the stage is complete; it is only left out of the manifest
+        except Exception as e:
+            arcpy.AddWarning('\nThe results of the {} stage could not be saved for resuming: {}'.format(stage.name, e))
+            return
+        self.stages[stage.name] = {'inputs_hash': inputs_hash, 'outputs': dict((name, describeValue(value)) for name, value in outputs.items()),
+                                   'outputs_file': outputs_file, 'text_file': saved_text, 'seconds': round(seconds, 1),
+                                   'completed': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        self.save()
+
+    def save(self):
+        """Write the manifest so other processes never read a partial file"""
+        temp_file = '{}.{}.tmp'.format(self.manifest_file, os.getpid())
+        with open(temp_file, 'w') as f:
+            json.dump({'data_version': self.data_version, 'stages': self.stages}, f, indent=2)
+        if os.path.exists(self.manifest_file):
+            os.remove(self.manifest_file)
+        os.rename(temp_file, self.manifest_file)
+
+def describeValue(value):
+    """Return a stage output for the run manifest: simple values as they are, others by type and length"""
+    if value is None or isinstance(value, (bool, int, float, type(u''), str)):
+        return value
+    try:
+        return '{} of {}'.format(type(value).__name__, len(value))
+    except TypeError:
+        return type(value).__name__
+
+def checkStages(stages, values):
+    """Raise an error if a stage needs a value that no earlier stage or starting value provides"""
+    available = set(values)
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(name in available for name in stage.inputs)]
+        if not ready:
+            missing = sorted(set(name for stage in remaining for name in stage.inputs) - available)
+            raise ValueError('Stages {} need values that are never created: {}'.format(', '.join(stage.name for stage in remaining), ', '.join(missing)))
+        for stage in ready:
+            available.update(stage.outputs)
+            remaining.remove(stage)
+        # end for
+
+def dependentStages(stages, names):
+    """Return the names of stages and of every stage that uses their outputs, directly or through other stages"""
+    names = set(names)
+    outputs = set(name for stage in stages if stage.name in names for name in stage.outputs)
+    added = True
+    while added:
+        added = False
+        for stage in stages:
+            if stage.name not in names and outputs.intersection(stage.inputs):
+                names.add(stage.name)
+                outputs.update(stage.outputs)
+                added = True
+        # end for
+    return names
+
+def initStageWorker():
+    """Set up a worker process so a failed stage raises an error instead of exiting Python"""
+    errorLogger.exit_on_error = False
+
+def runStage(args):
+    """Run one stage in a worker process and return its name, outputs, error message, elapsed seconds, and profile records"""
+    name, function, values, outputs, scratch_dir, text_file, profile = args
+    start_time = time.time()
+    stage_outputs = {}
+    error = None
+    # profile = (project folder, cProfile file) when the run is being profiled
+    if profile:
+        runProfile.startRun(profile[0], bool(profile[1]))
+    try:
+        if not os.path.exists(scratch_dir):
+            os.makedirs(scratch_dir)
+        # lets the scheduler find out if this process stops before the stage finishes
+        with open(os.path.join(scratch_dir, pid_file_name), 'w') as f:
+            f.write(str(os.getpid()))
+        arcpy.env.scratchWorkspace = scratch_dir
+        stage_outputs = function(values, text_file) or {}
+        missing = [output for output in outputs if output not in stage_outputs]
+        if missing:
+            raise ValueError('stage did not create {}'.format(', '.join(missing)))
+    # report the error to the scheduler
+    except Exception as e:
+        stage_outputs = {}
+        error = str(e).strip() or e.__class__.__name__
+    records = None
+    if profile:
+        run = runProfile.finishRun()
+        if profile[1]:
+            run.profiler.dump_stats(profile[1])
+        records = (run.stages, run.tools)
+    return name, stage_outputs, error, time.time() - start_time, records
+
+def stageWorkerPid(scratch_dir, start_time):
+    """Return the process ID of the worker process running a stage, or None if the stage has not started.  A process ID file
+       written before the stage was started is left over from another run and ignored."""
+    pid_file = os.path.join(scratch_dir, pid_file_name)
+    try:
+        # allow for file systems that store modification times to the nearest two seconds
+        if os.path.getmtime(pid_file) < start_time - 2:
+            return None
+        with open(pid_file) as f:
+            return int(f.read())
+    except (IOError, OSError, ValueError):
+        return None
+
+def waitForStage(running_stages):
+    """Wait for a stage running in a worker process to finish and return its runStage results.  A stage whose worker process
+       stopped, whose results could not be passed back, or that ran longer than stage_timeout is returned as failed.
+
+       running_stages = dictionary of stage name to (AsyncResult, scratch folder, start time)
+    """
+    while True:
+        # worker processes of the pool (child processes of this process) that are still running
+        worker_pids = set(process.pid for process in multiprocessing.active_children())
+        for name, (result, scratch_dir, start_time) in list(running_stages.items()):
+            seconds = time.time() - start_time
+            error = None
+            if result.ready():
+                try:
+                    return result.get()
+                except Exception as e:
+                    error = 'the stage could not be run in a worker process: {}'.format(str(e).strip() or e.__class__.__name__)
+            else:
+                worker_pid = stageWorkerPid(scratch_dir, start_time)
+                if worker_pid is not None and worker_pid not in worker_pids and not result.ready():
+                    error = 'the worker process running the stage stopped before the stage finished'
+                elif stage_timeout and seconds > stage_timeout:
+                    error = 'the stage did not finish in {} seconds'.format(stage_timeout)
+            if error:
+                return name, {}, error, seconds, None
+        # end for
+        time.sleep(poll_seconds)
+
+def mergeTextFiles(text_files, results_text_file):
+    """Add the text written by each stage to the results text file, in the order given"""
+    with open(results_text_file, 'a') as results:
+        for text_file in text_files:
+            if os.path.exists(text_file):
+                with open(text_file) as f:
+                    results.write(f.read())
+        # end for
+
+def runStages(stages, values, work_dir, results_text_file, workers=None, profile_file=None, parallel=True, manifest_file=None, data_version=None, resume=False, rerun_stages=None):
+    """Run stages in worker processes as their inputs become available and return the values created
+
+       stages = list of Stage objects.  Their parts of the results text file are written in this order.
+       values = dictionary of starting values
+       work_dir = folder for the scratch workspaces and text files of the stages (removed when finished)
+       workers = number of worker processes.  Defaults to one for each stage, up to the number of processors.
+       profile_file = run profile JSON file (runProfile.py).  When the run is being profiled, each stage's cProfile statistics
+                      are saved next to it as <profile file>_<stage>.prof.
+       parallel = run the stages in worker processes.  Otherwise they run one at a time in this process, in the order listed
+                  (for example inside a batch worker process, which cannot start its own workers).
+       manifest_file = run manifest JSON file recording each completed stage (RunManifest)
+       data_version = version of the reference data the stages are run with (resultsCache.dataVersion())
+       resume = skip the stages an earlier run completed with the same inputs, using their saved outputs
+       rerun_stages = names of the stages changes to the reference data reach (changeDetection.py).  With resume, these stages and the
+                      stages using their outputs run again, and the other stages completed by an earlier run use their saved outputs.
+    """
+    checkStages(stages, values)
+    values = dict(values)
+    if not workers:
+        workers = max(1, min(len(stages), multiprocessing.cpu_count()))
+    stage_dir = os.path.join(work_dir, 'Stages')
+    scratch_dir = os.path.join(work_dir, 'Scratch')
+    text_files = dict((stage.name, os.path.join(stage_dir, '{}.txt'.format(stage.name))) for stage in stages)
+    # text files and process ID files left by a run that was stopped are removed, so they are never read as this run's
+    for folder in [stage_dir, scratch_dir]:
+        shutil.rmtree(folder, ignore_errors=True)
+    # end for
+    os.makedirs(stage_dir)
+    if rerun_stages is not None:
+        rerun_stages = dependentStages(stages, rerun_stages)
+    manifest = RunManifest(manifest_file, data_version, resume, rerun_stages) if manifest_file else None
+
+    pending = list(stages)
+    running = set()
+    errors = []
+    finished = queue.Queue()
+    # AsyncResult, scratch folder, and start time of each stage running in a worker process
+    running_stages = {}
+    pool = multiprocessing.Pool(processes=workers, initializer=initStageWorker) if parallel else None
+    # stages run in this process change its scratch workspace, and raise errors in place of exiting Python
+    scratch_workspace = arcpy.env.scratchWorkspace
+    exit_on_error = errorLogger.exit_on_error
+    if not parallel:
+        initStageWorker()
+    try:
+        while pending or running:
+            # start every stage whose inputs are ready, unless a stage has failed
+            ready = [stage for stage in pending if all(name in values for name in stage.inputs)] if not errors else []
+            # one stage at a time in the order listed when not running in parallel
+            if not parallel:
+                ready = ready[:1] if ready and ready[0] is pending[0] else []
+            for stage in ready:
+                pending.remove(stage)
+                stage_values = dict((name, values[name]) for name in stage.inputs)
+                # stage completed by an earlier run
+                outputs = manifest.savedOutputs(stage, stage_values, text_files[stage.name]) if manifest else None
+                if outputs is not None:
+                    values.update(outputs)
+                    arcpy.AddMessage('\nUsing the results of the {} stage completed on {}'.format(stage.name, manifest.stages[stage.name]['completed']))
+                    continue
+                running.add(stage.name)
+                profile = None
+                if parallel and runProfile.current_run is not None:
+                    cprofile_file = None
+                    if runProfile.current_run.profiler is not None and profile_file:
+                        cprofile_file = '{}_{}.prof'.format(os.path.splitext(profile_file)[0], stage.name)
+                    profile = (work_dir, cprofile_file)
+                args = (stage.name, stage.function, stage_values, stage.outputs, os.path.join(scratch_dir, stage.name), text_files[stage.name], profile)
+                # the worker process writes its process ID once the stage starts
+                if os.path.exists(os.path.join(args[4], pid_file_name)):
+                    os.remove(os.path.join(args[4], pid_file_name))
+                if parallel:
+                    running_stages[stage.name] = (pool.apply_async(runStage, (args,)), args[4], time.time())
+                else:
+                    finished.put(runStage(args))
+            # end for
+            if not running:
+                # saved stages may have made more stages ready
+                if pending and not errors and ready:
+                    continue
+                break
+            # wait for the next stage to finish
+            if parallel:
+                name, outputs, error, seconds, records = waitForStage(running_stages)
+                del running_stages[name]
+            else:
+                name, outputs, error, seconds, records = finished.get()
+            running.remove(name)
+            if records and runProfile.current_run is not None:
+                runProfile.current_run.addRecords(*records)
+            if error:
+                errors.append('{} stage failed: {}'.format(name, error))
+                arcpy.AddError('\n{}'.format(errors[-1]))
+            else:
+                values.update(outputs)
+                arcpy.AddMessage('\nCompleted {} stage in {} seconds'.format(name, round(seconds, 1)))
+                if manifest:
+                    stage = [stage for stage in stages if stage.name == name][0]
+                    manifest.record(stage, dict((input_name, values[input_name]) for input_name in stage.inputs), outputs, text_files[name], seconds)
+        # end while
+
+        # text from each stage in the order the stages are listed
+        mergeTextFiles([text_files[stage.name] for stage in stages], results_text_file)
+    finally:
+        if pool is not None:
+            # a stage lost with its worker process is never finished, so the pool is stopped rather than waited for
+            if running_stages or errors:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+        else:
+            arcpy.env.scratchWorkspace = scratch_workspace
+            errorLogger.exit_on_error = exit_on_error
+        # the worker processes have stopped, so their files can be removed
+        for folder in [stage_dir, scratch_dir]:
+            shutil.rmtree(folder, ignore_errors=True)
+        # end for
+
+    if errors:
+        raise errorLogger.SaraToolError('\n'.join(errors))
+    return values
@@ -9,11 +9,19 @@
 #
 #              The SARA risk radii layer is created in a previous module wihtin SARAReportTool.py (riskRadius.py)
 #
+#              With the proximity engine (proximityAnalysis.py), each vulnerable facility layer is read once and every feature is assigned to
+#              the smallest risk radius that contains it.  The results are then split by risk radius for the excel spreadsheets, or written
+#              to one workbook for the SARA facility with a worksheet for each layer (workbookWriter.py).  The proximity engine can read the
+#              layers from their snapshots in the reference data cache (dataCache.py).
+#
+#              With ring measures, the stream miles, pipeline feet, and municipal area within each risk radius and between each pair of
+#              risk radii are measured from the snapshots (ringMeasures.py), added as columns to the workbook, and written to the text file.
+#
 # Author:      Patrick McKinney
 #
 # Created:     04/28/2016
 #
-# Updated:     05/22/2019
+# Updated:     10/18/2026
 #
 # Copyright:   (c) Cumberland County GIS 2019
 #
@@ -26,15 +34,87 @@
 #--------------------------------------------------------------------------------------------------------------------------------------------------------------#
 
 # Import modules
-import arcpy, os, errorLogger, exportLayersToExcel
+import arcpy, os, errorLogger, exportLayersToExcel, proximityAnalysis, workbookWriter, dataCache, riskRings, runProfile, ringMeasures
+
+# Vulnerable facility layers - feature class, layer name, definition query
+vulnerable_layers = [
+    # Assisted Living
+    ('EOC_AssistedLiving', 'Assisted_Living', ''),
+    # Daycares
+    ('EOC_Daycare', 'Daycares', ''),
+    # Health Medical Sites
+    ('Site_HealthMedical', 'Health_Medical', """FCode <> 80026"""),
+    # MHIDD Sites
+    ('EOC_MHIDD_Facility', 'MHIDD', ''),
+    # Schools
+    ('Site_Education', 'Schools', ''),
+    # Public Shelters
+    ('EOC_PublicShelters', 'Public_Shelters', ''),
+    # SARA Facilities
+    ('EOC_SARA', 'SARA', ''),
+    # Emergency Response / Law Enforcement
+    ('Site_EmergencyResponseLawEnforcement', 'Emergency_Response_Law_Enforcement', ''),
+    # Hydrography (NHD)
+    ('NHD_Streams', 'Streams', ''),
+    # Municipalities
+    ('Pennsylvania_Municipalities', 'Municipality', ''),
+    # Counties
+    ('Pennsylvania_Counties', 'County', ''),
+    # Water Filtration Plants
+    # ('', 'Water_Plants', ''),
+    # Natural Gas Facilities
+    ('NPMS_Pipelines', 'Natural_Gas', '')
+]
 
 # function to make feature layer
 def makeFeatureLayer(featureClass,layerName, clause=""):
    """ Creates a feature layer. Assumes all feature classes within same workspace """
    arcpy.MakeFeatureLayer_management(featureClass,layerName, where_clause=clause)
 
-def vulnerableFacilitiesAnalysis(riskRadius, output_dir):
-    """Select vulnerable facilities within risk radius"""
+def makeFeatureLayers(layer_names):
+    """Create the feature layers of a list of vulnerable facility layer names"""
+    for feature_class, layer_name, clause in vulnerable_layers:
+        if layer_name in layer_names:
+            makeFeatureLayer(feature_class, layer_name, clause)
+    # end for
+
+def facilityLocations(results):
+    """Return the (layer name, x, y) of each point vulnerable facility in the proximity results, for drawing on the map (mapRenderer.py)"""
+    locations = []
+    for feature_class, layer_name, clause in vulnerable_layers:
+        oids = results['OID'][results['LAYER'] == layer_name]
+        if not len(oids):
+            continue
+        snapshot = dataCache.loadSnapshot(os.path.join(r'C:\GIS\Geodata.gdb', feature_class), where_clause=clause)
+        # lines and polygons (streams, municipalities, counties) are not drawn
+        if snapshot.shape_type != 'Point':
+            continue
+        positions = dict((int(oid), position) for position, oid in enumerate(snapshot.oids))
+        for oid in oids:
+            position = positions.get(int(oid))
+            if position is not None:
+                locations.append((layer_name, float(snapshot.x[position]), float(snapshot.y[position])))
+        # end for
+    # end for
+    return locations
+
+@runProfile.timedStage
+def vulnerableFacilitiesAnalysis(riskRadius, output_dir, proximity_engine=False, export_formats=('xls',), use_cache=False, results_cache=None, ring_measures=False,
+                                 results_text_file=None):
+    """Select vulnerable facilities within risk radius
+
+       riskRadius = risk radii layer, or risk rings (riskRings.py) when proximity_engine is used
+       proximity_engine = read each layer once and assign features to risk radii by distance (proximityAnalysis.py),
+                          in place of a select by location for every layer and risk radius
+       export_formats = 'xls' writes a spreadsheet for each layer and risk radius.  With the proximity engine, 'xlsx', 'csv',
+                        and 'parquet' write one file (or one file for each layer) for the SARA facility (workbookWriter.py)
+       use_cache = read the vulnerable facility layers from the reference data cache (dataCache.py).  Only used with proximity_engine.
+       results_cache = saved results for the SARA facility (resultsCache.py).  The layers are only searched again when a risk radius
+                       is larger than any searched before.  Only used with proximity_engine.
+       ring_measures = measure the length or area of streams, pipelines, and municipalities within each risk radius (ringMeasures.py).
+                       Only used with proximity_engine.
+       results_text_file = text file the ring measures are written to
+    """
     try:
         # allow data to be ovewritten
         arcpy.env.overwriteOutput = True
@@ -43,43 +123,79 @@ def vulnerableFacilitiesAnalysis(riskRadius, output_dir):
         # add message
         arcpy.AddMessage('\nPerforming Vulnerable Facilities analysis\nResults of analysis will be located at {}'.format(output_dir))
         # create sub-directory to store results of vulnerable facilities anlaysis
-        os.mkdir(os.path.join(output_dir, 'Vulnerable Facilities Analysis Results'))
+        if not os.path.exists(os.path.join(output_dir, 'Vulnerable Facilities Analysis Results')):
+            os.mkdir(os.path.join(output_dir, 'Vulnerable Facilities Analysis Results'))
         # output directory for spreadsheets
         output_dir_xls = r'{}\{}'.format(output_dir,'Vulnerable Facilities Analysis Results')
         # Vulnerable Facilities Sites
-        # Create Feature Layers for analysis
-        # Assisted Living
-        makeFeatureLayer('EOC_AssistedLiving','Assisted_Living')
-        # Daycares
-        makeFeatureLayer('EOC_Daycare','Daycares')
-        # Health Medical Sites
-        makeFeatureLayer('Site_HealthMedical','Health_Medical', """FCode <> 80026""")
-        # MHIDD Sites
-        makeFeatureLayer('EOC_MHIDD_Facility','MHIDD')
-        # Schools
-        makeFeatureLayer('Site_Education','Schools')
-        # Public Shelters
-        makeFeatureLayer('EOC_PublicShelters', 'Public_Shelters')
-        # SARA Facilities
-        makeFeatureLayer('EOC_SARA', 'SARA')
-        # Emergency Response / Law Enforcement
-        makeFeatureLayer('Site_EmergencyResponseLawEnforcement', 'Emergency_Response_Law_Enforcement')
-        # Hydrography (NHD)
-        makeFeatureLayer('NHD_Streams', 'Streams')
-        # Municipalities
-        makeFeatureLayer('Pennsylvania_Municipalities', 'Municipality')
-        # Counties
-        makeFeatureLayer('Pennsylvania_Counties', 'County')
-        # Water Filtration Plants
-        # makeFeatureLayer('', 'Water_Plants')
-        # Natural Gas Facilities
-        makeFeatureLayer('NPMS_Pipelines', 'Natural_Gas')
+        layer_names = [layer[1] for layer in vulnerable_layers]
 
+        # fields for cursor
+        riskRadiusFields = ['OBJECTID', 'PATTS', 'BUFFDIST', 'UNITS']
+
+        if proximity_engine:
+            # risk radii as a centre point and radii
+            if isinstance(riskRadius, riskRings.RiskRings):
+                rings = riskRadius
+            else:
+                rings = riskRings.fromRiskRadiiLayer(riskRadius)
+            results = None
+            layers_made = False
+            if results_cache is not None:
+                results = results_cache.facilityResults(rings)
+                if results is not None:
+                    arcpy.AddMessage('\nUsing saved vulnerable facility distances for the risk radii')
+            if results is None:
+                # snapshots of the vulnerable facility layers
+                snapshots = {}
+                if use_cache:
+                    for feature_class, layer_name, clause in vulnerable_layers:
+                        snapshots[layer_name] = dataCache.loadSnapshot(os.path.join(arcpy.env.workspace, feature_class), where_clause=clause)
+                    # end for
+                else:
+                    # Create Feature Layers for analysis
+                    makeFeatureLayers(layer_names)
+                    layers_made = True
+                # distance to every vulnerable facility within the largest risk radius
+                results = proximityAnalysis.findFacilitiesWithinRiskRadii(layer_names, rings, snapshots)
+                if results_cache is not None:
+                    results_cache.storeFacilityResults(results, rings)
+            arcpy.AddMessage('\nFound {} vulnerable facilities within the risk radii'.format(len(results)))
+            measures = None
+            if ring_measures:
+                measure_snapshots = {}
+                feature_classes = {}
+                for feature_class, layer_name, clause in vulnerable_layers:
+                    if ringMeasures.layerUnits(layer_name) is not None:
+                        feature_classes[layer_name] = os.path.join(arcpy.env.workspace, feature_class)
+                        measure_snapshots[layer_name] = dataCache.loadSnapshot(feature_classes[layer_name], where_clause=clause)
+                # end for
+                measures = ringMeasures.measureFeatures(results, rings, measure_snapshots)
+                if results_text_file:
+                    with open(results_text_file, 'a') as f:
+                        f.write(str(ringMeasures.measuresText(measures, rings, feature_classes)))
+            # the files are written from feature layers, which are only needed for the layers with features found
+            if export_formats and not layers_made:
+                makeFeatureLayers(set(str(layer) for layer in results['LAYER']))
+            # split results by risk radius for reporting
+            if 'xls' in export_formats:
+                for distance in rings.distances:
+                    for layer_name in layer_names:
+                        oids = proximityAnalysis.featuresWithinRing(results, layer_name, distance)
+                        exportLayersToExcel.exportFeaturesToExcel(layer_name, oids, distance, rings.units, rings.patts, output_dir_xls)
+                    # end for
+                # end for
+            # one workbook (and/or csv and parquet files) for the SARA facility
+            workbook_formats = [export_format for export_format in export_formats if export_format != 'xls']
+            if workbook_formats:
+                workbookWriter.writeVulnerableFacilities(results, rings.patts, output_dir_xls, workbook_formats, measures=measures)
+            return results
+
+        # Create Feature Layers for analysis
+        makeFeatureLayers(layer_names)
         # make feature layer for risk radii buffer to enable select by attribute
         arcpy.MakeFeatureLayer_management(riskRadius, 'Buffer Layer')
 
-        # fields for cursor
-        riskRadiusFields = ['OBJECTID', 'PATTS', 'BUFFDIST', 'UNITS']
         # create search cursor on feature layer
         with arcpy.da.SearchCursor(riskRadius, riskRadiusFields) as cursor:
             for row in cursor:
@@ -88,32 +204,10 @@ def vulnerableFacilitiesAnalysis(riskRadius, output_dir):
                 # select the current record from the buffer layer using OBJECTID
                 # this will set each select by location to be run against the current feature in the buffer layer
                 arcpy.SelectLayerByAttribute_management('Buffer Layer', 'NEW_SELECTION', whereClause)
-                # Assisted Living
-                exportLayersToExcel.selectFeaturesExportToExcel('Assisted_Living', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Daycares
-                exportLayersToExcel.selectFeaturesExportToExcel('Daycares', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Health Medical Sites
-                exportLayersToExcel.selectFeaturesExportToExcel('Health_Medical', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # MHIDD Sites
-                exportLayersToExcel.selectFeaturesExportToExcel('MHIDD', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Schools
-                exportLayersToExcel.selectFeaturesExportToExcel('Schools', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Public Shelters
-                exportLayersToExcel.selectFeaturesExportToExcel('Public_Shelters', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # SARA
-                exportLayersToExcel.selectFeaturesExportToExcel('SARA', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Emergency Response / Law Enforcement
-                exportLayersToExcel.selectFeaturesExportToExcel('Emergency_Response_Law_Enforcement', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Hydrography
-                exportLayersToExcel.selectFeaturesExportToExcel('Streams', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Municipalities
-                exportLayersToExcel.selectFeaturesExportToExcel('Municipality', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Counties
-                exportLayersToExcel.selectFeaturesExportToExcel('County', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Water Filtration Plants
-                # selectFeaturesExportToExcel('Water_Plants', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
-                # Natural Gas Facilities
-                exportLayersToExcel.selectFeaturesExportToExcel('Natural_Gas', 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
+                # select and export each vulnerable facility layer
+                for layer_name in layer_names:
+                    exportLayersToExcel.selectFeaturesExportToExcel(layer_name, 'Buffer Layer', row[2], row[3], row[1], output_dir_xls)
+                # end for
             # end for
         # end with
     # If an error occurs running geoprocessing tool(s) capture error and write message
@@ -0,0 +1,237 @@
+#---------------------------------------------------------------------------------------------------------------------------------------------------------#
+# Name:        Vulnerable Facilities Workbook Writer
+#
+# Purpose:     Write the vulnerable facilities found by the proximity engine to one workbook per SARA facility, with a worksheet for each layer.
+#
+# Summary:     The attributes of the features in the proximity results table (proximityAnalysis.py) are read in chunks and streamed to an Excel
+#              workbook (.xlsx), with the risk radius and distance to the SARA facility added to each row.  Rows are written nearest first.
+#              Worksheets that reach the Excel row limit are continued on a new worksheet.  The same rows can also be written to a CSV file
+#              and a Parquet file for each layer.
+#
+#              Streams, pipelines, and municipalities can have the length or area of each feature within each risk radius, and between
+#              each pair of risk radii, added as columns (ringMeasures.py).
+#
+#              openpyxl is required for .xlsx output and pyarrow is required for Parquet output.  If openpyxl is not installed, CSV files are
+#              written instead of the workbook.
+#
+# Author:      Patrick McKinney
+#
+# Created:     10/18/2026
+#
+# Updated:     10/18/2026
+#
+# Copyright:   (c) Cumberland County GIS 2019
+#
+# Disclaimer:  CUMBERLAND COUNTY ASSUMES NO LIABILITY ARISING FROM USE OF THESE MAPS OR DATA. THE MAPS AND DATA ARE PROVIDED WITHOUT
+#              WARRANTY OF ANY KIND, EITHER EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#              FITNESS FOR A PARTICULAR PURPOSE.
+#              Furthermore, Cumberland County assumes no liability for any errors, omissions, or inaccuracies in the information provided regardless
+#              of the cause of such, or for any decision made, action taken, or action not taken by the user in reliance upon any maps or data provided
+#              herein. The user assumes the risk that the information may not be accurate.
+#-----------------------------------------------------------------------------------------------------------------------------------------------------------#
+
+# import modules
+import arcpy, os, csv, csvFiles, spatialIndex, ringMeasures
+# optional writers
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+try:
+    import pyarrow, pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# number of features read from a layer at a time
+chunk_size = 1000
+# data rows on an Excel worksheet (1,048,576 rows less the header row)
+max_sheet_rows = 1048575
+# fields added to each row from the proximity results
+result_fields = ['BUFFDIST', 'UNITS', 'DISTANCE']
+# field types that are not written
+skip_field_types = ['Geometry', 'Blob', 'Raster']
+
+def attributeFields(layer):
+    """Return the names and types of the attribute fields of a layer"""
+    return [(field.name, field.type) for field in arcpy.ListFields(layer) if field.type not in skip_field_types]
+
+def featureRows(layer, layer_results, field_names, measure_columns=None):
+    """Yield lists of rows for features in the proximity results, nearest first, reading chunk_size features at a time
+
+       measure_columns = optional dictionary of OBJECTID to values added to the end of each row (ringMeasures.py)
+    """
+    oid_field = arcpy.Describe(layer).OIDFieldName
+    # position of OBJECTID in each row
+    oid_position = field_names.index(oid_field) if oid_field in field_names else None
+    cursor_fields = field_names if oid_position is not None else field_names + [oid_field]
+    if oid_position is None:
+        oid_position = len(field_names)
+    for start in range(0, len(layer_results), chunk_size):
+        chunk = layer_results[start:start + chunk_size]
+        attributes = {}
+        with arcpy.da.SearchCursor(layer, cursor_fields, spatialIndex.oidWhereClause(layer, [int(oid) for oid in chunk['OID']])) as cursor:
+            for row in cursor:
+                attributes[row[oid_position]] = list(row[:len(field_names)])
+            # end for
+        # end cursor
+        rows = []
+        for result in chunk:
+            row = attributes.get(int(result['OID']))
+            if row is not None:
+                row = row + [float(result['BUFFDIST']), str(result['UNITS']), round(float(result['DISTANCE']), 2)]
+                if measure_columns is not None:
+                    row += measure_columns.get(int(result['OID']), [])
+                rows.append(row)
+        # end for
+        yield rows
+
+class WorkbookWriter(object):
+    """Streams rows to worksheets of an .xlsx workbook"""
+    def __init__(self, out_file):
+        self.out_file = out_file
+        # write-only workbooks keep memory flat no matter how many rows are written
+        self.workbook = openpyxl.Workbook(write_only=True)
+
+    def startLayer(self, layer, header, field_types):
+        self.layer = layer
+        self.header = header
+        self.sheet_count = 0
+        self.newSheet()
+
+    def newSheet(self):
+        self.sheet_count += 1
+        # worksheet names are limited to 31 characters
+        suffix = '' if self.sheet_count == 1 else ' ({})'.format(self.sheet_count)
+        self.sheet = self.workbook.create_sheet(self.layer[:31 - len(suffix)] + suffix)
+        self.sheet.append(self.header)
+        self.sheet_rows = 0
+
+    def writeRows(self, rows):
+        for row in rows:
+            if self.sheet_rows == max_sheet_rows:
+                self.newSheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def endLayer(self):
+        pass
+
+    def close(self):
+        self.workbook.save(self.out_file)
+        return [self.out_file]
+
+class CsvWriter(object):
+    """Streams rows to a CSV file for each layer"""
+    def __init__(self, out_location, file_label):
+        self.out_location = out_location
+        self.file_label = file_label
+        self.out_files = []
+
+    def startLayer(self, layer, header, field_types):
+        out_file = os.path.join(self.out_location, '{} {}.csv'.format(layer, self.file_label))
+        self.file = csvFiles.openCsvFile(out_file, 'w')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(header)
+        self.out_files.append(out_file)
+
+    def writeRows(self, rows):
+        self.writer.writerows(rows)
+
+    def endLayer(self):
+        self.file.close()
+
+    def close(self):
+        return self.out_files
+
+class ParquetWriter(object):
+    """Streams rows to a Parquet file for each layer"""
+    # arrow types for ArcGIS field types - other field types are written as text
+    arrow_types = {'OID': 'int64', 'Integer': 'int64', 'SmallInteger': 'int64', 'Double': 'float64', 'Single': 'float64'}
+
+    def __init__(self, out_location, file_label):
+        self.out_location = out_location
+        self.file_label = file_label
+        self.out_files = []
+
+    def startLayer(self, layer, header, field_types):
+        fields = []
+        for name, field_type in zip(header, field_types):
+            if field_type == 'Date':
+                fields.append(pyarrow.field(name, pyarrow.timestamp('ms')))
+            elif field_type in self.arrow_types:
+                fields.append(pyarrow.field(name, pyarrow.type_for_alias(self.arrow_types[field_type])))
+            else:
+                fields.append(pyarrow.field(name, pyarrow.string()))
+        self.schema = pyarrow.schema(fields)
+        self.text_columns = [index for index, field in enumerate(fields) if field.type == pyarrow.string()]
+        out_file = os.path.join(self.out_location, '{} {}.parquet'.format(layer, self.file_label))
+        self.writer = pyarrow.parquet.ParquetWriter(out_file, self.schema)
+        self.out_files.append(out_file)
+
+    def writeRows(self, rows):
+        if not rows:
+            return
+        columns = [list(column) for column in zip(*rows)]
+        for index in self.text_columns:
+            columns[index] = [None if value is None else str(value) for value in columns[index]]
+        self.writer.write_table(pyarrow.Table.from_arrays([pyarrow.array(column, type=field.type) for column, field in zip(columns, self.schema)], schema=self.schema))
+
+    def endLayer(self):
+        self.writer.close()
+
+    def close(self):
+        return self.out_files
+
+def writeVulnerableFacilities(results, patts, out_location, formats=('xlsx',), measures=None):
+    """Write the proximity results for a SARA facility to a workbook and/or CSV and Parquet files
+
+       results = proximity results table from proximityAnalysis.findFacilitiesWithinRiskRadii
+       patts = PATTS ID for SARA site
+       out_location = folder the files are written to
+       formats = any of 'xlsx', 'csv', and 'parquet'
+       measures = optional length and area of features within each risk radius (ringMeasures.py), added as columns for the measured layers
+    """
+    if len(results) == 0:
+        arcpy.AddWarning('\nNo vulnerable facilities are within the risk radii')
+        return []
+    file_label = 'Vulnerable Facilities PATTS {}'.format(patts)
+    formats = [output_format.lower() for output_format in formats]
+    if 'xlsx' in formats and openpyxl is None:
+        arcpy.AddWarning('\nopenpyxl is not installed.  Vulnerable facilities will be written to CSV files instead of a workbook')
+        formats = [output_format for output_format in formats if output_format != 'xlsx'] + ['csv']
+    if 'parquet' in formats and pyarrow is None:
+        arcpy.AddWarning('\npyarrow is not installed.  Vulnerable facilities will not be written to Parquet files')
+    writers = []
+    if 'xlsx' in formats:
+        writers.append(WorkbookWriter(os.path.join(out_location, '{}.xlsx'.format(file_label))))
+    if 'csv' in formats:
+        writers.append(CsvWriter(out_location, file_label))
+    if 'parquet' in formats and pyarrow is not None:
+        writers.append(ParquetWriter(out_location, file_label))
+
+    # layers in the order they were first found (nearest feature first)
+    layers = []
+    for layer in results['LAYER']:
+        if layer not in layers:
+            layers.append(layer)
+    for layer in layers:
+        layer_results = results[results['LAYER'] == layer]
+        fields = attributeFields(layer)
+        field_names = [field[0] for field in fields]
+        measure_header, measure_columns = ringMeasures.measureColumns(measures, str(layer))
+        header = field_names + result_fields + measure_header
+        field_types = [field[1] for field in fields] + ['Double', 'String', 'Double'] + ['Double'] * len(measure_header)
+        for writer in writers:
+            writer.startLayer(str(layer), header, field_types)
+        for rows in featureRows(str(layer), layer_results, field_names, measure_columns if measure_header else None):
+            for writer in writers:
+                writer.writeRows(rows)
+        for writer in writers:
+            writer.endLayer()
+        arcpy.AddMessage('\nWrote {} features from {} layer within the risk radii'.format(len(layer_results), layer))
+    # end for
+
+    out_files = []
+    for writer in writers:
+        out_files.extend(writer.close())
+    return out_files